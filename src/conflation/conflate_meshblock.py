@@ -1,13 +1,17 @@
 import click
 import fiona
 import geopandas as gpd
+import hashlib
 import logging
+import multiprocessing as mp
+import numpy as np
 import pandas as pd
+import pygeos
 import sys
-from operator import attrgetter, itemgetter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from shapely.ops import polygonize, unary_union
 from tabulate import tabulate
+from typing import Tuple
 
 filepath = Path(__file__).resolve()
 sys.path.insert(1, str(filepath.parents[1]))
@@ -23,24 +27,53 @@ handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s: %(message)s
 logger.addHandler(handler)
 
 
+def _intersect_worker(geoms: np.ndarray, geoms_ngd: np.ndarray, batch_size: int) -> np.ndarray:
+    """
+    Computes the intersection area of each pair of meshblock and ngd meshblock polygons.
+
+    \b
+    :param np.ndarray geoms: meshblock polygons.
+    :param np.ndarray geoms_ngd: ngd meshblock polygons, one per meshblock polygon.
+    :param int batch_size: number of intersections computed per batch.
+    :return np.ndarray: the area of each intersection.
+    """
+
+    # Compute intersection areas in batches.
+    areas = np.zeros(len(geoms))
+    for start in range(0, len(geoms), batch_size):
+        batch = slice(start, start + batch_size)
+        areas[batch] = pygeos.area(pygeos.intersection(geoms[batch], geoms_ngd[batch]))
+
+    return areas
+
+
 class CRNMeshblockConflation:
     """Defines the CRN meshblock conflation class."""
 
-    def __init__(self, source: str, threshold: int = 80) -> None:
+    def __init__(self, source: str, threshold: int = 80, cache: bool = True, incremental: bool = False,
+                 workers: int = 1) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
         :param int threshold: the percentage of area intersection which constitutes a match, default=80.
+        :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+        :param bool incremental: indicates if the meshblock and meshblock intersections are to be incrementally rebuilt
+            from the previous conflation state, and the state written, default False.
+        :param int workers: number of worker processes used to compute meshblock intersections, default 1.
         """
 
         self.source = source
         self.threshold = threshold / 100
+        self.incremental = incremental
+        self.workers = workers
+        self.batch_size = 100000
 
         self.src = Path(filepath.parents[2] / "data/crn.gpkg")
         self.dst = Path(filepath.parents[2] / "data/crn.gpkg")
         self.layer_arc = f"crn_{self.source}"
+        self.state = Path(filepath.parents[2] / f"data/state/conflation_{self.source}")
 
         self.src_ngd = Path(helpers.load_yaml("../config.yaml")["filepaths"]["ngd"])
         self.layer_meshblock_ngd = f"ngd_a_{self.source}"
@@ -56,22 +89,17 @@ class CRNMeshblockConflation:
             helpers.create_gpkg(self.dst)
             self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
 
-        # Load source data.
-        logger.info(f"Loading source data: {self.src}|layer={self.layer_arc}.")
-        df = gpd.read_file(self.src, layer=self.layer_arc)
-
-        # Standardize data and snap nodes.
-        df = helpers.standardize(df)
-        df = helpers.snap_nodes(df)
+        # Load and standardize source data and snap nodes.
+        self.crn = helpers.load_standardized(self.src, layer=self.layer_arc, snap=True, cache=cache)
 
         # Generate meshblock (all non-deadend arcs).
         logger.info(f"Generating meshblock from source data.")
 
-        nodes = df["geometry"].map(lambda g: itemgetter(0, -1)(attrgetter("coords")(g))).explode()
-        deadends = set(nodes.loc[~nodes.duplicated(keep=False)].index)
-        meshblock_input = df.loc[~df.index.isin(deadends)].copy(deep=True)
-        self.meshblock = gpd.GeoDataFrame(geometry=list(polygonize(unary_union(meshblock_input["geometry"].to_list()))),
-                                          crs=meshblock_input.crs)
+        network = helpers.Network(self.crn["geometry"])
+        meshblock_input = self.crn.loc[~network.deadend_edges()].copy(deep=True)
+        self._meshblock = helpers.Meshblock(meshblock_input["geometry"], state=self.state if self.incremental else None)
+        self.meshblock = gpd.GeoDataFrame(geometry=gpd.GeoSeries(self._meshblock.faces, crs=meshblock_input.crs))
+        self._pairs = None
 
         logger.info("Successfully loaded and generated meshblock from source data.")
 
@@ -80,67 +108,171 @@ class CRNMeshblockConflation:
         self.meshblock_ngd = gpd.read_file(self.src_ngd, layer=self.layer_meshblock_ngd).copy(deep=True)
         logger.info("Successfully loaded ngd meshblock data.")
 
-        # Export data.
-        helpers.export(df, dst=self.dst, name=self.layer_arc)
-
     def __call__(self) -> None:
         """Executes the CRN class."""
 
         self.conflation()
         self.output_results()
 
+        # Write conflation state.
+        if self.incremental:
+            self._write_state()
+
+    def _intersect(self, geoms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compiles the intersecting pairs of meshblock and ngd meshblock polygons and the area of each intersection,
+        optionally in a process pool. Intersecting pairs are queried from the ngd meshblock spatial index in a single
+        bulk query. For parallel execution, each pair is assigned to the spatial tile containing the representative
+        point of its meshblock polygon and the intersection areas of each tile are computed by a worker process.
+
+        \b
+        :param np.ndarray geoms: meshblock polygons.
+        :return Tuple[np.ndarray, np.ndarray]: (N, 2) array of (meshblock index, ngd meshblock index) positional pairs,
+            sorted by meshblock then ngd meshblock index, and the area of each intersection.
+        """
+
+        # Query ngd polygons intersecting each meshblock polygon.
+        pairs = helpers.query_pairs(geoms, tree=self.meshblock_ngd, predicate="intersects")
+        geoms_pairs, geoms_ngd = geoms[pairs[:, 0]], self.meshblock_ngd["geometry"].values.data[pairs[:, 1]]
+
+        if self.workers == 1 or len(pairs) < self.workers:
+            return pairs, _intersect_worker(geoms_pairs, geoms_ngd, self.batch_size)
+
+        # Assign pairs to tiles (a square grid of approximately 4 tiles per worker).
+        pts = pygeos.get_coordinates(pygeos.point_on_surface(geoms))[pairs[:, 0]]
+        cells = np.floor((pts - pts.min(axis=0)) / ((np.ptp(pts, axis=0) + 1) / np.ceil(np.sqrt(self.workers * 4))))\
+            .astype(np.int64)
+        tiles = [tile.values for tile in pd.Index(np.arange(len(pairs)))
+                 .groupby(cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]).values()]
+
+        logger.info(f"Computing meshblock intersections for {len(tiles):,d} tiles using {self.workers:,d} workers.")
+
+        # Configure process start method.
+        context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+
+        # Compute intersection areas per tile, in parallel.
+        areas = np.zeros(len(pairs))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tiles)), mp_context=context) as executor:
+            results = executor.map(_intersect_worker, [geoms_pairs[tile] for tile in tiles],
+                                   [geoms_ngd[tile] for tile in tiles], [self.batch_size] * len(tiles))
+
+            # Merge tile results.
+            for tile, tile_areas in zip(tiles, results):
+                areas[tile] = tile_areas
+
+        return pairs, areas
+
+    def _load_pairs(self) -> pd.DataFrame:
+        """
+        Loads the ngd meshblock intersections of each meshblock polygon from the previous conflation state, keyed by
+        the meshblock polygon fingerprint.
+
+        \b
+        :return pd.DataFrame: DataFrame of meshblock polygon fingerprints, ngd identifiers, and occupation areas.
+        """
+
+        pairs = pd.DataFrame({"hash": pd.Series(dtype="uint64"), "ngd_id": pd.Series(dtype="float64"),
+                              "occupation_area": pd.Series(dtype="float64")})
+
+        if self.incremental:
+
+            try:
+
+                df = pd.read_parquet(self.state / "pairs.parquet")
+                cols = {"version", *pairs.columns}
+                if not cols.issubset(df.columns) or (len(df) and df["version"].iloc[0] != self._state_version()):
+                    raise ValueError("Conflation state is incompatible with the current conflation.")
+                pairs = df[pairs.columns].copy(deep=True)
+
+            except (ImportError, OSError, ValueError) as e:
+                logger.warning(f"Unable to load conflation state: \"{self.state}\". {e}")
+
+        return pairs
+
+    def _state_version(self) -> str:
+        """
+        Generates the conflation state version, a hash of the conflation and helpers source code and the ngd meshblock
+        data.
+
+        \b
+        :return str: conflation state version.
+        """
+
+        h = hashlib.blake2b(filepath.read_bytes() + Path(helpers.__file__).read_bytes(), digest_size=16)
+        h.update(self.meshblock_ngd[self.id_meshblock_ngd].astype(str).str.cat(sep=",").encode())
+        h.update(helpers.hash_geometries(self.meshblock_ngd["geometry"]).tobytes())
+
+        return h.hexdigest()
+
+    def _write_state(self) -> None:
+        """Writes the meshblock and conflation state, used for incremental conflation."""
+
+        self._meshblock.write(self.state)
+
+        logger.info(f"Writing conflation state: \"{self.state}\".")
+
+        try:
+
+            # Compile state.
+            state = self._pairs.reset_index(drop=True)
+            state.insert(0, "version", self._state_version())
+
+            # Write state.
+            self.state.mkdir(parents=True, exist_ok=True)
+            state.to_parquet(self.state / "pairs.parquet")
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to write conflation state: \"{self.state}\". {e}")
+
     def conflation(self) -> None:
         """Performs the meshblock conflation."""
 
         logger.info("Performing meshblock conflation.")
 
-        meshblock = self.meshblock.copy(deep=True)
-
-        # Generate ngd meshblock lookup dictionaries.
-        ngd_idx_id_lookup = dict(zip(self.meshblock_ngd.index, self.meshblock_ngd[self.id_meshblock_ngd]))
-        ngd_id_poly_lookup = dict(zip(self.meshblock_ngd[self.id_meshblock_ngd], self.meshblock_ngd["geometry"]))
-
-        # Compile the index of each ngd polygon intersecting each crn polygon.
-        meshblock["ngd_id"] = meshblock["geometry"]\
-            .map(lambda g: self.meshblock_ngd.sindex.query(g, predicate="intersects"))
-
-        # Explode on ngd index groups.
-        meshblock = meshblock.explode(column="ngd_id")
-
-        # Compile identifier and poly associated with each ngd index.
-        meshblock["ngd_id"] = meshblock["ngd_id"].map(ngd_idx_id_lookup)
-        meshblock["ngd_poly"] = meshblock["ngd_id"].map(ngd_id_poly_lookup)
-
-        # Validate cardinality (valid: one-to-one and many-to-one based on crn-to-ngd direction).
-        meshblock["occupation_area"] = meshblock["geometry"].intersection(
-            gpd.GeoSeries(meshblock["ngd_poly"], crs=self.meshblock_ngd.crs)
-        ).area / meshblock.area
-
-        # Compile valid identifiers based on cardinality.
-        flag_valid = meshblock["occupation_area"] >= self.threshold
-        valid_meshblock_idx_ngd_id_lookup = dict(zip(meshblock.loc[flag_valid].index,
-                                                     meshblock.loc[flag_valid, "ngd_id"]))
-        valid_ngd_ids = set(valid_meshblock_idx_ngd_id_lookup.values())
-        valid_meshblock_idxs = set(valid_meshblock_idx_ngd_id_lookup)
-
-        # Compile maximum occupation percentage for each invalid ngd meshblock as a lookup dictionary.
-        flag_invalid = ~meshblock["ngd_id"].isin(valid_ngd_ids)
-        occupation_pct_ngd = pd.DataFrame({
-            "ngd_id": meshblock.loc[flag_invalid, "ngd_id"].values,
-            "occupation_pct": (meshblock.loc[flag_invalid, "occupation_area"] * 100).fillna(0).map(int).values})\
-            .sort_values(by=["ngd_id", "occupation_pct"])\
-            .drop_duplicates(subset="ngd_id", keep="last")
-        occupation_pct_ngd = dict(zip(occupation_pct_ngd["ngd_id"], occupation_pct_ngd["occupation_pct"]))
-
-        # Compile maximum occupation percentage for each invalid meshblock as a lookup dictionary.
-        flag_invalid = ~meshblock.index.isin(valid_meshblock_idxs)
-        occupation_pct_meshblock = pd.DataFrame({
-            "idx": meshblock.loc[flag_invalid].index.values,
-            "occupation_pct": (meshblock.loc[flag_invalid, "occupation_area"] * 100).fillna(0).map(int).values})\
-            .sort_values(by=["idx", "occupation_pct"])\
-            .drop_duplicates(subset="idx", keep="last")
-        occupation_pct_meshblock = dict(zip(occupation_pct_meshblock["idx"],
-                                            occupation_pct_meshblock["occupation_pct"]))
+        # Load the ngd meshblock intersections of unchanged meshblock polygons from the previous conflation state.
+        hashes = helpers.hash_geometries(self.meshblock["geometry"])
+        pairs = self._load_pairs()
+        flag_cached = pd.Series(hashes).isin(pairs["hash"]).values
+        cached = pd.DataFrame({"idx": self.meshblock.index[flag_cached], "hash": hashes[flag_cached]})\
+            .merge(pairs, on="hash", how="inner")
+
+        logger.info(f"Reused ngd meshblock intersections for {flag_cached.sum():,d} of {len(flag_cached):,d} "
+                    f"meshblock polygons.")
+
+        # Compute the ngd polygons intersecting each remaining meshblock polygon and the intersection areas, as a
+        # proportion of the meshblock polygon area (occupation area).
+        idxs = np.flatnonzero(~flag_cached)
+        geoms = self.meshblock["geometry"].values.data[idxs]
+        candidates, areas = self._intersect(geoms)
+        areas /= pygeos.area(geoms)[candidates[:, 0]]
+
+        # Compile intersections, including meshblock polygons without any intersections.
+        missing = np.setdiff1d(np.arange(len(idxs)), candidates[:, 0])
+        pair_idxs = idxs[np.concatenate([candidates[:, 0], missing])]
+        pairs = pd.concat([cached, pd.DataFrame({
+            "idx": self.meshblock.index[pair_idxs],
+            "hash": hashes[pair_idxs],
+            "ngd_id": np.concatenate([self.meshblock_ngd[self.id_meshblock_ngd].values[candidates[:, 1]],
+                                      np.full(len(missing), np.nan)]),
+            "occupation_area": np.concatenate([areas, np.full(len(missing), np.nan)])
+        })], ignore_index=True).sort_values(by="idx", kind="stable")
+        self._pairs = pairs[["hash", "ngd_id", "occupation_area"]]
+
+        # Compile valid identifiers based on cardinality (valid: one-to-one and many-to-one based on crn-to-ngd
+        # direction).
+        flag_valid = pairs["occupation_area"] >= self.threshold
+        valid_ngd_ids = pairs.loc[flag_valid].drop_duplicates(subset="idx", keep="last").set_index("idx")["ngd_id"]
+
+        # Compile occupation percentage of each intersection.
+        occupation_pct = (pairs["occupation_area"] * 100).fillna(0).astype(int)
+
+        # Compile maximum occupation percentage for each invalid ngd meshblock.
+        flag_invalid = ~pairs["ngd_id"].isin(valid_ngd_ids)
+        occupation_pct_ngd = occupation_pct.loc[flag_invalid].groupby(pairs.loc[flag_invalid, "ngd_id"]).max()
+
+        # Compile maximum occupation percentage for each invalid meshblock.
+        flag_invalid = ~pairs["idx"].isin(valid_ngd_ids.index)
+        occupation_pct_meshblock = occupation_pct.loc[flag_invalid].groupby(pairs.loc[flag_invalid, "idx"]).max()
 
         # Assign validity status and occupation percentage as attributes to ngd meshblock.
         self.meshblock_ngd["valid"] = self.meshblock_ngd[self.id_meshblock_ngd].isin(valid_ngd_ids)
@@ -149,20 +281,22 @@ class CRNMeshblockConflation:
 
         # Assign ngd bb identifier, validity status, and occupation percentage as attributes to meshblock.
         meshblock_index = pd.Series(self.meshblock.index, index=self.meshblock.index)
-        self.meshblock["valid"] = meshblock_index.isin(valid_meshblock_idxs)
+        self.meshblock["valid"] = meshblock_index.isin(valid_ngd_ids.index)
         self.meshblock["occupation_pct"] = meshblock_index.map(occupation_pct_meshblock).fillna(-1)
-        self.meshblock[self.id_meshblock_ngd] = meshblock_index\
-            .map(valid_meshblock_idx_ngd_id_lookup).fillna(-1).map(int)
+        self.meshblock[self.id_meshblock_ngd] = meshblock_index.map(valid_ngd_ids).fillna(-1).map(int)
 
     def output_results(self) -> None:
         """Outputs conflation results."""
 
         logger.info(f"Outputting results.")
 
-        # Export meshblock layers with conflation indicator.
-        for layer, df in {"meshblock": self.meshblock, "meshblock_ngd": self.meshblock_ngd}.items():
-            helpers.export(df[[self.id_meshblock_ngd, "valid", "occupation_pct", "geometry"]], dst=self.dst,
-                           name=f"{self.source}_{layer}")
+        # Export source data and meshblock layers with conflation indicator.
+        cols = [self.id_meshblock_ngd, "valid", "occupation_pct", "geometry"]
+        helpers.export_layers({
+            self.layer_arc: self.crn,
+            f"{self.source}_meshblock": self.meshblock[cols].copy(deep=True),
+            f"{self.source}_meshblock_ngd": self.meshblock_ngd[cols].copy(deep=True)
+        }, dst=self.dst)
 
         # Log conflation progress.
         count_ngd = sum(~self.meshblock_ngd["valid"])
@@ -177,19 +311,30 @@ class CRNMeshblockConflation:
 @click.argument("source", type=click.Choice(helpers.load_yaml("../config.yaml")["sources"], False))
 @click.option("--threshold", "-t", type=click.IntRange(min=60, max=99), default=80, show_default=True,
               help="The percentage of area intersection which constitutes a match.")
-def main(source: str, threshold: int = 80) -> None:
+@click.option("--cache/--no-cache", default=True, show_default=True,
+              help="Use the cache of standardized source data.")
+@click.option("--incremental", "-i", is_flag=True, default=False, show_default=True,
+              help="Rebuild only the meshblock polygons and intersections affected by changes since the previous "
+                   "incremental conflation and write the conflation state.")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=1, show_default=True,
+              help="The number of worker processes used to compute meshblock intersections.")
+def main(source: str, threshold: int = 80, cache: bool = True, incremental: bool = False, workers: int = 1) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
     :param int threshold: the percentage of area intersection which constitutes a match, default=80.
+    :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+    :param bool incremental: indicates if the meshblock and meshblock intersections are to be incrementally rebuilt
+        from the previous conflation state, and the state written, default False.
+    :param int workers: number of worker processes used to compute meshblock intersections, default 1.
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNMeshblockConflation(source, threshold)
+            crn = CRNMeshblockConflation(source, threshold, cache, incremental, workers)
             crn()
 
     except KeyboardInterrupt:
@@ -62,7 +62,6 @@ class CRNDeltas:
         self.radius = radius
 
         self.dst = Path(filepath.parents[2] / f"data/crn_deltas_{self.mode}_{self.source}_{self.vintage}.gpkg")
-        self.flag_new_gpkg = False
         self.delta_ids = {delta_type: set() for delta_type in ("ngd_add", "ngd_del", "nrn_mod")}
         self.export = dict.fromkeys(map(lambda name: f"{self.source}_{name}", ("ngd_add", "nrn_mod")))
 
@@ -105,7 +104,6 @@ class CRNDeltas:
                 sys.exit(1)
         else:
             helpers.create_gpkg(self.dst)
-            self.flag_new_gpkg = True
             self.src_crn = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn_finished"])
 
     def __call__(self) -> None:
@@ -149,11 +147,7 @@ class CRNDeltas:
         logger.info(f"Writing delta outputs.")
 
         # Export required datasets / execute required subprocesses.
-        if not self.flag_new_gpkg:
-            helpers.delete_layers(dst=self.dst, layers=self.export.keys())
-        for layer, df in {**self.crn_regions, **self.export}.items():
-            if isinstance(df, pd.DataFrame):
-                helpers.export(df, dst=self.dst, name=layer)
+        helpers.export_layers({**self.crn_regions, **self.export}, dst=self.dst)
 
         # Log results summary.
         summary = tabulate([["NGD Additions", len(self.delta_ids["ngd_add"]) if self.mode == "ngd" else "N/A"],
@@ -1,21 +1,24 @@
 import datetime
 import fiona
 import geopandas as gpd
+import hashlib
 import logging
+import numpy as np
+import os
 import pandas as pd
+import pygeos
+import re
 import sqlite3
-import string
 import sys
 import time
 import uuid
 import yaml
-from itertools import chain, compress, groupby
-from operator import attrgetter, itemgetter
+from contextlib import closing
+from operator import attrgetter
 from osgeo import ogr, osr
 from pathlib import Path
-from shapely.geometry import LineString, MultiLineString, Point
 from tqdm import tqdm
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Dict, List, Tuple, Union
 
 
 # Set logger.
@@ -31,6 +34,316 @@ logger.addHandler(handler)
 ogr.UseExceptions()
 
 
+class Meshblock:
+    """
+    Defines a meshblock, the polygons (faces) formed by the closed rings of LineString arcs, with arc-face adjacency.
+    The meshblock can be persisted as a state and incrementally rebuilt from it, such that only the faces adjacent to
+    or intersecting arcs changed (inserted, deleted, or modified) since the state are re-polygonized.
+
+    Attributes:
+        faces: (F,) array of face Polygon geometries.
+        adjacency: (A, 2) array of (arc index, face index) pairs for each arc covered by a face boundary. Only compiled
+            for incremental rebuilds or once the state is written, otherwise None.
+        new: (F,) boolean array flagging faces which were generated, rather than reused from the state.
+        changed_bounds: (K, 4) array of bounds of each face which was removed from or generated for the state.
+        incremental: indicates if the meshblock was incrementally rebuilt from the state.
+    """
+
+    def __init__(self, arcs: gpd.GeoSeries, state: Union[Path, None] = None) -> None:
+        """
+        Initializes the Meshblock class.
+
+        \b
+        :param gpd.GeoSeries arcs: LineString geometries, indexed by a unique identifier.
+        :param Union[Path, None] state: meshblock state directory from which to incrementally rebuild the meshblock,
+            default None (full build).
+        """
+
+        self.ids = arcs.index
+        self._geoms = arcs.values.data
+        self.incremental = False
+
+        # Build meshblock.
+        if state:
+
+            try:
+
+                self._build_incremental(state)
+                return
+
+            except (ImportError, OSError, ValueError, pygeos.GEOSException) as e:
+                logger.warning(f"Unable to incrementally rebuild meshblock from state: \"{state}\". Rebuilding "
+                               f"meshblock. {e}")
+
+        self._build()
+
+    def _adjacency(self, arc_idxs: np.ndarray, face_idxs: np.ndarray) -> np.ndarray:
+        """
+        Compiles the adjacency of arcs and faces, where an arc is covered by a face boundary.
+
+        \b
+        :param np.ndarray arc_idxs: arc indexes.
+        :param np.ndarray face_idxs: face indexes.
+        :return np.ndarray: (A, 2) array of (arc index, face index) pairs.
+        """
+
+        pairs = query_pairs(self._geoms[arc_idxs], tree=pygeos.boundary(self.faces[face_idxs]),
+                            predicate="covered_by")
+
+        return np.column_stack([arc_idxs[pairs[:, 0]], face_idxs[pairs[:, 1]]])
+
+    def _build(self) -> None:
+        """Builds the meshblock from all arcs."""
+
+        logger.info("Building meshblock.")
+
+        self.faces = polygonize_arcs(self._geoms)
+        self.new = np.ones(len(self.faces), dtype=bool)
+        self.changed_bounds = pygeos.bounds(self.faces).reshape(-1, 4)
+        self.adjacency = None
+
+    def _build_incremental(self, state: Path) -> None:
+        """
+        Incrementally rebuilds the meshblock from the state. Faces adjacent to deleted or modified arcs and faces
+        intersecting inserted or modified arcs are re-polygonized from all arcs intersecting them; all other faces are
+        reused. The result is verified to be complete using Euler's formula for planar graphs (bounded faces = edges -
+        nodes + connected components), which requires noded arcs.
+
+        \b
+        :param Path state: meshblock state directory.
+        """
+
+        logger.info(f"Incrementally rebuilding meshblock from state: \"{state}\".")
+
+        # Load state.
+        arcs = pd.read_parquet(state / "arcs.parquet")
+        if not len(arcs) or arcs["version"].iloc[0] != self._state_version():
+            raise ValueError("Meshblock state is incompatible with the current meshblock generation.")
+        faces = pygeos.from_wkb(pd.read_parquet(state / "faces.parquet")["geometry"].values)
+        adjacency = pd.read_parquet(state / "adjacency.parquet")
+
+        # Validate arcs are noded.
+        if len(self._geoms) and not pygeos.is_simple(pygeos.multilinestrings(self._geoms)):
+            raise ValueError("Arcs are not noded.")
+
+        # Detect inserted, deleted, and modified arcs.
+        fingerprints = pd.Series(hash_geometries(self._geoms), index=self.ids)
+        common = fingerprints.index.intersection(arcs.index)
+        modified = common[fingerprints.loc[common].values != arcs.loc[common, "fingerprint"].values]
+        changed_old = arcs.index.difference(fingerprints.index).union(modified)
+        changed_new = self.ids.get_indexer(fingerprints.index.difference(arcs.index).union(modified))
+
+        logger.info(f"Detected {len(changed_old.union(self.ids[changed_new])):,d} changed arcs since the previous "
+                    f"meshblock generation.")
+
+        # Compile affected faces (faces adjacent to deleted or modified arcs or intersecting inserted or modified arcs).
+        affected = np.zeros(len(faces), dtype=bool)
+        affected[adjacency.loc[adjacency["arc"].isin(changed_old), "face"].values] = True
+        affected[query_pairs(self._geoms[changed_new], tree=faces, predicate="intersects")[:, 1]] = True
+
+        # Compile candidate arcs (arcs intersecting affected faces and inserted or modified arcs).
+        candidates = np.zeros(len(self._geoms), dtype=bool)
+        candidates[query_pairs(faces[affected], tree=self._geoms, predicate="intersects")[:, 1]] = True
+        candidates[changed_new] = True
+        candidate_idxs = np.flatnonzero(candidates)
+
+        # Polygonize candidate arcs.
+        reused = faces[~affected]
+        faces_new = pygeos.get_parts(pygeos.polygonize(self._geoms[candidate_idxs])) if len(candidate_idxs) else \
+            np.array([], dtype=object)
+
+        # Remove generated faces which are identical to reused faces.
+        within = query_pairs(pygeos.point_on_surface(faces_new), tree=reused, predicate="within")
+        faces_new = faces_new[count_pairs(within, n=len(faces_new)) == 0]
+
+        # Validate generated faces (the interior of each face must not intersect any non-candidate arc).
+        pairs = query_pairs(faces_new, tree=self._geoms, predicate="intersects")
+        pairs = pairs[~candidates[pairs[:, 1]]]
+        if pygeos.relate_pattern(faces_new[pairs[:, 0]], self._geoms[pairs[:, 1]], "T********").any():
+            raise ValueError("Generated faces intersect non-candidate arcs.")
+
+        # Validate meshblock completeness.
+        network = Network(self._geoms)
+        count = len(self._geoms) - len(network.nodes) + len(np.unique(network.components()))
+        if len(reused) + len(faces_new) != count:
+            raise ValueError(f"Meshblock contains {len(reused) + len(faces_new):,d} faces, expected {count:,d}.")
+
+        # Compile meshblock.
+        self.faces = np.concatenate([reused, faces_new])
+        self.new = np.repeat([False, True], [len(reused), len(faces_new)])
+        self.changed_bounds = pygeos.bounds(np.concatenate([faces[affected], faces_new])).reshape(-1, 4)
+
+        # Compile adjacency, reusing the adjacency of reused faces.
+        face_idxs = np.full(len(faces), -1, dtype=np.int64)
+        face_idxs[~affected] = np.arange(len(reused))
+        adjacency = adjacency.loc[face_idxs[adjacency["face"].values] >= 0]
+        self.adjacency = np.concatenate([
+            np.column_stack([self.ids.get_indexer(adjacency["arc"]), face_idxs[adjacency["face"].values]]),
+            self._adjacency(candidate_idxs, np.arange(len(reused), len(self.faces)))
+        ])
+        self.incremental = True
+
+        logger.info(f"Reused {len(reused):,d} faces and generated {len(faces_new):,d} faces.")
+
+    @staticmethod
+    def _state_version() -> str:
+        """
+        Generates the meshblock state version, a hash of the helpers source code.
+
+        \b
+        :return str: meshblock state version.
+        """
+
+        return hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+
+    def write(self, state: Path) -> None:
+        """
+        Writes the meshblock state: the faces, the fingerprint of each arc, and the arc-face adjacency.
+
+        \b
+        :param Path state: meshblock state directory.
+        """
+
+        logger.info(f"Writing meshblock state: \"{state}\".")
+
+        try:
+
+            # Compile adjacency, if required.
+            if self.adjacency is None:
+                self.adjacency = self._adjacency(np.arange(len(self._geoms)), np.arange(len(self.faces)))
+
+            state.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame({"geometry": pygeos.to_wkb(self.faces)}).to_parquet(state / "faces.parquet")
+            pd.DataFrame({"version": self._state_version(), "fingerprint": hash_geometries(self._geoms)},
+                         index=self.ids).to_parquet(state / "arcs.parquet")
+            pd.DataFrame({"arc": self.ids[self.adjacency[:, 0]], "face": self.adjacency[:, 1]})\
+                .to_parquet(state / "adjacency.parquet")
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to write meshblock state: \"{state}\". {e}")
+
+
+class Network:
+    """
+    Defines a node-edge graph representation of LineString arcs (edges), based on integer node ids.
+
+    Attributes:
+        coords: (V, 2) array of vertex coordinates of all edges.
+        vertex_edge: (V,) array of the edge index of each vertex.
+        vertex_offsets: (E + 1,) CSR offsets of the vertices of each edge.
+        vertex_node: (V,) array of the node id of each vertex, or -1 if the vertex is not a node of any edge.
+        nodes: (N, 2) array of unique node coordinates, sorted by x then y.
+        edge_nodes: (E, 2) array of the start and end node ids of each edge.
+        degree: (N,) array of the number of edge endpoints at each node.
+        node_offsets: (N + 1,) CSR offsets of the edges of each node.
+        node_edges: array of the edge indexes of each node, see node_offsets.
+    """
+
+    def __init__(self, geoms: Union[gpd.GeoSeries, np.ndarray]) -> None:
+        """
+        Initializes the Network class.
+
+        \b
+        :param Union[gpd.GeoSeries, np.ndarray] geoms: LineString geometries.
+        """
+
+        if isinstance(geoms, gpd.GeoSeries):
+            geoms = geoms.values.data
+
+        # Compile vertices.
+        self.coords, self.vertex_edge = pygeos.get_coordinates(geoms, return_index=True)
+        self.vertex_offsets = np.zeros(len(geoms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.vertex_edge, minlength=len(geoms)), out=self.vertex_offsets[1:])
+
+        # Compile nodes and edge-node adjacency.
+        keys = self.coords[:, 0] + 1j * self.coords[:, 1]
+        node_keys, edge_nodes = np.unique(np.column_stack([keys[self.vertex_offsets[:-1]],
+                                                           keys[self.vertex_offsets[1:] - 1]]),
+                                          return_inverse=True)
+        self.nodes = np.column_stack([node_keys.real, node_keys.imag])
+        self.edge_nodes = edge_nodes.reshape(-1, 2)
+
+        # Compile node-edge adjacency.
+        self.degree = np.bincount(self.edge_nodes.ravel(), minlength=len(self.nodes))
+        self.node_offsets = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=self.node_offsets[1:])
+        self.node_edges = np.argsort(self.edge_nodes.ravel(), kind="stable") // 2
+
+        # Compile vertex-node lookup.
+        pos = np.searchsorted(node_keys, keys)
+        flag = pos < len(node_keys)
+        self.vertex_node = np.full(len(keys), -1, dtype=np.int64)
+        self.vertex_node[flag] = np.where(node_keys[pos[flag]] == keys[flag], pos[flag], -1)
+
+    def components(self) -> np.ndarray:
+        """
+        Labels the connected component of each node, via iterative label hooking and path compression.
+
+        \b
+        :return np.ndarray: (N,) array of component labels (the minimum node id of each component).
+        """
+
+        labels = np.arange(len(self.nodes))
+        starts, ends = self.edge_nodes.T
+
+        while True:
+
+            # Hook the larger label of each edge to the smaller label.
+            labels_start, labels_end = labels[starts], labels[ends]
+            flag = labels_start != labels_end
+            if not flag.any():
+                break
+            np.minimum.at(labels, np.maximum(labels_start, labels_end)[flag],
+                          np.minimum(labels_start, labels_end)[flag])
+
+            # Compress label paths.
+            while True:
+                labels_ = labels[labels]
+                if (labels_ == labels).all():
+                    break
+                labels = labels_
+
+        return labels
+
+    def deadend_edges(self) -> np.ndarray:
+        """
+        Flags edges with at least one deadend node (node of degree 1).
+
+        \b
+        :return np.ndarray: boolean array, one value per edge.
+        """
+
+        return (self.degree[self.edge_nodes] == 1).any(axis=1)
+
+    def is_vertex(self, edges: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+        """
+        Flags whether each node is a vertex (endpoint or interior vertex) of the corresponding edge.
+
+        \b
+        :param np.ndarray edges: edge indexes.
+        :param np.ndarray nodes: node ids, one per edge index.
+        :return np.ndarray: boolean array, one value per edge - node pair.
+        """
+
+        flag = self.vertex_node >= 0
+        keys = np.unique(self.vertex_edge[flag] * len(self.nodes) + self.vertex_node[flag])
+
+        return np.isin(np.asarray(edges) * len(self.nodes) + np.asarray(nodes), keys)
+
+    def node_points(self, nodes: Union[np.ndarray, None] = None) -> np.ndarray:
+        """
+        Generates Point geometries for nodes.
+
+        \b
+        :param Union[np.ndarray, None] nodes: node ids, default None (all nodes).
+        :return np.ndarray: array of Point geometries.
+        """
+
+        coords = self.nodes if nodes is None else self.nodes[nodes]
+
+        return pygeos.points(coords)
+
+
 class Timer:
     """Tracks stage runtime."""
 
@@ -60,6 +373,385 @@ class Timer:
         logger.info(f"Finished. Time elapsed: {delta}.")
 
 
+def _cache_key(src: Union[Path, str], layer: str, params: Dict[str, Any]) -> str:
+    """
+    Generates a content hash for a GeoPackage layer, the standardization parameters, and the helpers source code.
+    Content, rather than file metadata, is hashed since writing validation attributes or other layers modifies the
+    GeoPackage without affecting the standardized output. The feature id and any validation attributes (v#+) are
+    excluded for the same reason.
+
+    \b
+    :param Union[Path, str] src: source GeoPackage path.
+    :param str layer: layer name.
+    :param Dict[str, Any] params: standardization parameters.
+    :return str: hexadecimal content hash.
+    """
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(Path(__file__).read_bytes())
+    h.update(repr(sorted(params.items())).encode())
+
+    with closing(sqlite3.connect(f"{Path(src).resolve().as_uri()}?mode=ro", uri=True)) as con:
+
+        # Compile layer attributes.
+        cols = [row[1] for row in con.execute(f"PRAGMA table_info(\"{layer}\")")
+                if row[1] != "fid" and not re.search("v[0-9]+$", row[1])]
+        if not cols:
+            raise ValueError(f"Layer \"{layer}\" not found within source: \"{src}\".")
+        h.update(repr(cols).encode())
+
+        # Compile geometry attribute.
+        geom_col = con.execute("SELECT column_name FROM gpkg_geometry_columns WHERE table_name = ?", (layer,))\
+            .fetchone()
+        geom_col = geom_col[0] if geom_col else None
+
+        # Hash layer records in batches.
+        # Note: geometry blobs are hashed as raw bytes and attributes with vectorized pandas hashing, such that records
+        #       are never decoded to string representations.
+        cols_sql = ", ".join(f"\"{col}\"" for col in cols)
+        for df in pd.read_sql(f"SELECT {cols_sql} FROM \"{layer}\" ORDER BY rowid", con, chunksize=100000):
+            if geom_col in df.columns:
+                blobs = df.pop(geom_col).fillna(b"")
+                h.update(blobs.map(len).values.astype(np.int64).tobytes())
+                h.update(b"".join(blobs))
+            if len(df.columns):
+                h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+    return h.hexdigest()
+
+
+def _cache_metadata_key(src: Union[Path, str], layer: str, params: Dict[str, Any]) -> str:
+    """
+    Generates a metadata hash for a GeoPackage layer, the standardization parameters, and the helpers source code,
+    from the layer last change timestamp and the size and modification time of the GeoPackage (and any write-ahead log).
+    Unlike the content hash, the metadata hash is cheap to generate but changes with any write to the GeoPackage.
+
+    \b
+    :param Union[Path, str] src: source GeoPackage path.
+    :param str layer: layer name.
+    :param Dict[str, Any] params: standardization parameters.
+    :return str: hexadecimal metadata hash.
+    """
+
+    src = Path(src).resolve()
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(Path(__file__).read_bytes())
+    h.update(repr(sorted(params.items())).encode())
+
+    with closing(sqlite3.connect(f"{src.as_uri()}?mode=ro", uri=True)) as con:
+
+        # Compile layer last change timestamp.
+        last_change = con.execute("SELECT last_change FROM gpkg_contents WHERE table_name = ?", (layer,)).fetchone()
+        if not last_change:
+            raise ValueError(f"Layer \"{layer}\" not found within source: \"{src}\".")
+
+    # Compile GeoPackage file metadata.
+    stats = [(path.stat().st_size, path.stat().st_mtime_ns) for path in (src, Path(f"{src}-wal")) if path.exists()]
+    h.update(repr((str(src), layer, last_change[0], stats)).encode())
+
+    return h.hexdigest()
+
+
+def _evict_cache(cache_dir: Path, cache_size: int) -> None:
+    """
+    Deletes the least recently used cache files until the total cache size is within the given size, along with the
+    metadata keys of any deleted cache files.
+
+    \b
+    :param Path cache_dir: cache directory.
+    :param int cache_size: maximum cache size (MiB).
+    """
+
+    total = 0
+    for path in sorted(cache_dir.glob("*.parquet"), key=lambda f: f.stat().st_mtime, reverse=True):
+        total += path.stat().st_size
+        if total > cache_size * 1024 ** 2:
+            path.unlink()
+
+            logger.info(f"Evicted cache file: {path}.")
+
+    # Delete metadata keys of evicted cache files.
+    for path in cache_dir.glob("*.key"):
+        if not (cache_dir / f"{path.read_text()}.parquet").exists():
+            path.unlink()
+
+
+def _execute_sql(gpkg: ogr.DataSource, sql: str) -> None:
+    """
+    Executes an SQL statement against a GeoPackage, releasing any returned result set.
+
+    \b
+    :param ogr.DataSource gpkg: GeoPackage.
+    :param str sql: SQL statement.
+    """
+
+    result = gpkg.ExecuteSQL(sql)
+    if result is not None:
+        gpkg.ReleaseResultSet(result)
+
+
+def _gpkg_geometry(geoms: np.ndarray, srs_id: int) -> pd.Series:
+    """
+    Encodes geometries as hexadecimal GeoPackage binaries (header, XY envelope, and little-endian WKB).
+
+    \b
+    :param np.ndarray geoms: array of pygeos geometries.
+    :param int srs_id: GeoPackage spatial reference system identifier.
+    :return pd.Series: Series of hexadecimal strings.
+    """
+
+    # Construct headers: magic, version, flags (little-endian, XY envelope, empty geometry), srs_id, and envelope.
+    bounds = pygeos.bounds(geoms)
+    header = np.empty(len(geoms), dtype=[("magic", "S2"), ("version", "u1"), ("flags", "u1"), ("srs_id", "<i4"),
+                                         ("envelope", "<f8", 4)])
+    header["magic"] = b"GP"
+    header["version"] = 0
+    header["flags"] = np.where(pygeos.is_empty(geoms), 0b10011, 0b00011)
+    header["srs_id"] = srs_id
+    header["envelope"] = bounds[:, [0, 2, 1, 3]]
+
+    # Encode headers and geometries as hexadecimal strings.
+    header_hex = np.frombuffer(header.tobytes().hex().encode(), dtype=f"S{header.itemsize * 2}").astype(str)
+    wkb_hex = pygeos.to_wkb(geoms, hex=True, output_dimension=2, byte_order=1)
+
+    return pd.Series(header_hex, dtype=object) + pd.Series(wkb_hex, dtype=object)
+
+
+def _gpkg_srs_id(gpkg: ogr.DataSource, name: str) -> int:
+    """
+    Retrieves the spatial reference system identifier of a GeoPackage layer.
+
+    \b
+    :param ogr.DataSource gpkg: GeoPackage.
+    :param str name: GeoPackage layer name.
+    :return int: GeoPackage spatial reference system identifier.
+    """
+
+    result = gpkg.ExecuteSQL(f"SELECT srs_id FROM gpkg_geometry_columns WHERE lower(table_name) = lower('{name}')")
+    srs_id = result.GetNextFeature().GetField(0)
+    gpkg.ReleaseResultSet(result)
+
+    return srs_id
+
+
+def _round(vals: np.ndarray, precision: int) -> np.ndarray:
+    """
+    Rounds an array of floats to a non-negative decimal precision, producing results identical to the built-in round().
+    Values are scaled, rounded half to even, and unscaled. Values whose scaled product is too close to a rounding
+    midpoint to be resolved in floating point are rounded individually.
+
+    \b
+    :param np.ndarray vals: array of floats.
+    :param int precision: decimal precision to round values to.
+    :return np.ndarray: array of rounded floats.
+    """
+
+    # Round values.
+    factor = 10.0 ** precision
+    scaled = vals * factor
+    rounded = np.rint(scaled) / factor
+
+    # Flag and individually round ambiguous values.
+    with np.errstate(invalid="ignore"):
+        flag = (np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) <= 2 * np.spacing(np.abs(scaled))) | \
+               ~(np.abs(scaled) < 2 ** 52)
+    rounded[flag] = list(map(lambda val: round(val, precision), vals[flag].tolist()))
+
+    return rounded
+
+
+def _sql_values(df: Union[gpd.GeoDataFrame, pd.DataFrame], srs_id: Union[int, None]) -> str:
+    """
+    Compiles the records of a GeoDataFrame or DataFrame as an SQL VALUES list, column by column.
+
+    \b
+    :param Union[gpd.GeoDataFrame, pd.DataFrame] df: GeoDataFrame or DataFrame with boolean, integer, and object
+        attributes.
+    :param Union[int, None] srs_id: GeoPackage spatial reference system identifier, None for non-spatial tables.
+    :return str: SQL VALUES list.
+    """
+
+    # Compile geometry literals.
+    literals = []
+    if "geometry" in df.columns:
+        geoms = df["geometry"].values.data
+        vals = "X'" + _gpkg_geometry(geoms, srs_id=srs_id) + "'"
+        vals.loc[pygeos.is_missing(geoms)] = "NULL"
+        literals.append(vals)
+
+    # Compile attribute literals.
+    for col in df.columns.drop("geometry", errors="ignore"):
+        vals = df[col].reset_index(drop=True)
+        if vals.dtype.kind in "bi":
+            vals = vals.astype(int).astype(str)
+        else:
+            flag_null = vals.isna()
+            vals = "'" + vals.astype(str).str.replace("'", "''", regex=False) + "'"
+            vals.loc[flag_null] = "NULL"
+        literals.append(vals)
+
+    # Compile records.
+    rows = "(" + literals[0]
+    for vals in literals[1:]:
+        rows += "," + vals
+
+    return ",".join(rows + ")")
+
+
+def _standardize_attribute(s: pd.Series, domain: Union[Dict[str, Any], None], default: Any,
+                           dtype: type) -> Tuple[pd.Series, int]:
+    """
+    Enforces the domain and dtype of an attribute:
+    1) sets Nulls and values not within the domain (compared as strings) to the default value;
+    2) maps values via the domain;
+    3) casts values to the dtype, setting uncastable values to the default value.
+    Rules are resolved once per unique value and mapped back to all records.
+
+    \b
+    :param pd.Series s: Series.
+    :param Union[Dict[str, Any], None] domain: mapping of valid values (as strings) to domain values, if any.
+    :param Any default: default value.
+    :param type dtype: output dtype.
+    :return Tuple[pd.Series, int]: updated Series and the number of records with a modified value (compared as
+        strings).
+    """
+
+    def _resolve(val: Any) -> Any:
+        """Resolves the standardized value of a single value."""
+
+        if domain:
+            if str(val) not in domain:
+                val = default
+            if val not in domain.values():
+                val = domain[str(val)]
+
+        try:
+            return dtype(val)
+        except ValueError:
+            return default
+
+    # Classify Series.
+    flag_null = s.isna()
+    inferred = pd.api.types.infer_dtype(s, skipna=True)
+
+    # Resolve homogeneous columns which only require Null replacement and casting.
+    if not domain and ((dtype is int and s.dtype.kind in "iuf") or (dtype is str and inferred in {"empty", "string"})):
+        vals = s.where(~flag_null, default).astype(dtype)
+        flag_mod = ~flag_null & (s.dtype.kind == "f")
+        flag_mod.loc[flag_null] = s.loc[flag_null].map(str) != str(dtype(default))
+
+        return vals, int(flag_mod.sum())
+
+    # Compile unique values. Non-homogeneous columns are compared via their string representation, which is valid only
+    # for domain-based attributes; others are resolved individually.
+    if s.dtype.kind in "biuf" or inferred in {"empty", "string"}:
+        codes, uniques = pd.factorize(s)
+    elif domain:
+        codes, uniques = pd.factorize(s.astype(str).where(~flag_null))
+    else:
+        codes, uniques = np.arange(len(s)), s.where(~flag_null)
+        codes[flag_null.values] = -1
+
+    # Resolve standardized values and modifications for unique values and Nulls.
+    uniques_resolved = np.array([*map(_resolve, uniques), None], dtype=object)
+    uniques_resolved[-1] = _resolve(default)
+    uniques_mod = np.array([*map(lambda val, val_new: str(val) != str(val_new), uniques, uniques_resolved[:-1]),
+                            False])
+
+    # Map standardized values and modifications to records.
+    vals = pd.Series(uniques_resolved[codes], index=s.index).infer_objects()
+    flag_mod = uniques_mod[codes]
+    flag_mod[flag_null.values] = (s.loc[flag_null].map(str) != str(uniques_resolved[-1])).values
+
+    return vals, int(flag_mod.sum())
+
+
+def _write_layer(gpkg: ogr.DataSource, df: Union[gpd.GeoDataFrame, pd.DataFrame], name: str, batch_size: int,
+                 indexes: Union[List[str], None] = None) -> None:
+    """
+    Writes a GeoDataFrame to a new GeoPackage layer as columnar batches of SQL inserts, with geometries encoded in bulk
+    as GeoPackage binaries. A DataFrame without geometries is written as a non-spatial (attribute) table.
+
+    \b
+    :param ogr.DataSource gpkg: GeoPackage, opened in update mode.
+    :param Union[gpd.GeoDataFrame, pd.DataFrame] df: GeoDataFrame or DataFrame.
+    :param str name: output GeoPackage layer name.
+    :param int batch_size: number of features written per insert statement.
+    :param Union[List[str], None] indexes: attributes to be indexed, default None.
+    """
+
+    spatial = "geometry" in df.columns
+
+    # Create GeoPackage layer.
+    if spatial:
+
+        # Configure spatial reference system.
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(df.crs.to_epsg())
+
+        geom_type = attrgetter(f"wkb{df.geom_type.iloc[0]}")(ogr)
+        layer = gpkg.CreateLayer(name=name, srs=srs, geom_type=geom_type, options=["OVERWRITE=YES"])
+
+    else:
+        layer = gpkg.CreateLayer(name=name, geom_type=ogr.wkbNone, options=["OVERWRITE=YES"])
+
+    # Convert float fields to int.
+    for col in df.columns:
+        if df[col].dtype.kind == "f":
+            df.loc[df[col].isna(), col] = -1
+            df[col] = df[col].astype(int)
+
+    # Set field definitions.
+    ogr_field_map = {"b": ogr.OFTInteger, "i": ogr.OFTInteger, "O": ogr.OFTString}
+    for field_name, field_dtype in df.dtypes.to_dict().items():
+        if field_name != "geometry":
+            field_defn = ogr.FieldDefn(field_name, ogr_field_map[field_dtype.kind])
+            if field_dtype.kind == "b":
+                field_defn.SetSubType(ogr.OFSTBoolean)
+            layer.CreateField(field_defn)
+
+    # Create layer table and compile insert properties.
+    layer.SyncToDisk()
+    srs_id = _gpkg_srs_id(gpkg, name=name) if spatial else None
+    cols = ", ".join(f"\"{col}\"" for col in ([layer.GetGeometryColumn()] if spatial else []) +
+                     list(df.columns.drop("geometry", errors="ignore")))
+
+    # Write layer.
+    with tqdm(total=len(df), desc=f"Writing to file: {gpkg.GetName()}|layer={name}",
+              bar_format="{desc}: |{bar}| {percentage:3.0f}% {r_bar}") as progress:
+        for idx in range(0, len(df), batch_size):
+
+            # Insert batch of features.
+            batch = df.iloc[idx: idx + batch_size]
+            _execute_sql(gpkg, sql=f"INSERT INTO \"{name}\" ({cols}) VALUES {_sql_values(batch, srs_id=srs_id)}")
+
+            progress.update(len(batch))
+
+    # Create attribute indexes.
+    for col in indexes or []:
+        _execute_sql(gpkg, sql=f"CREATE INDEX \"idx_{name}_{col}\" ON \"{name}\" (\"{col}\")")
+
+    # Update layer metadata (extent and feature count).
+    if spatial:
+        _execute_sql(gpkg, sql=f"RECOMPUTE EXTENT ON \"{name}\"")
+    _execute_sql(gpkg, sql=f"UPDATE gpkg_ogr_contents SET feature_count = NULL "
+                           f"WHERE lower(table_name) = lower('{name}')")
+
+
+def count_pairs(pairs: np.ndarray, n: int) -> np.ndarray:
+    """
+    Counts the number of tree results for each input geometry of a spatial index query pair array.
+
+    \b
+    :param np.ndarray pairs: (N, 2) array of (input index, tree index) pairs, see query_pairs.
+    :param int n: number of input geometries.
+    :return np.ndarray: array of result counts, one per input geometry.
+    """
+
+    return np.bincount(pairs[:, 0], minlength=n)
+
+
 def create_gpkg(path: Union[Path, str]) -> None:
     """
     Creates a GeoPackage.
@@ -124,56 +816,55 @@ def enforce_suggested_snapping(df: gpd.GeoDataFrame, df_snapping: gpd.GeoDataFra
 
     # Snap bos to crn roads.
 
-    # Create lookup dict of source and target snapping points.
-    snapping_pts_lookup = dict(zip(df_snapping["geometry"].map(lambda g: itemgetter(0)(attrgetter("coords")(g))),
-                                   df_snapping["geometry"].map(lambda g: itemgetter(-1)(attrgetter("coords")(g)))))
+    # Create lookup of source and target snapping points.
+    snapping = df_snapping["geometry"].values.data
+    snapping_pts_lookup = pd.MultiIndex.from_arrays(pygeos.get_coordinates(pygeos.get_point(snapping, 0)).T)
+    flag = ~snapping_pts_lookup.duplicated(keep="last")
+    snapping_pts_lookup = snapping_pts_lookup[flag]
+    snapping_pts = pygeos.get_coordinates(pygeos.get_point(snapping, -1))[flag]
 
-    # Compile bo geometries.
-    bos = df.loc[df["segment_type"] == 2, "geometry"].map(lambda g: tuple(attrgetter("coords")(g))).copy(deep=True)
+    # Compile bo vertices and nodes.
+    bos = df.loc[df["segment_type"] == 2, "geometry"]
+    coords, idxs = pygeos.get_coordinates(bos.values.data, return_index=True)
+    ends = np.cumsum(np.bincount(idxs, minlength=len(bos))) - 1
+    nodes = np.concatenate([np.r_[0, ends[:-1] + 1], ends]) if len(bos) else np.array([], dtype=np.int64)
 
     # Replace bo nodes with snapping points.
-    flag_start = bos.map(lambda pts: pts[0] in snapping_pts_lookup)
-    flag_end = bos.map(lambda pts: pts[-1] in snapping_pts_lookup)
-    bos.loc[flag_start] = bos.loc[flag_start].map(lambda pts: (itemgetter(pts[0])(snapping_pts_lookup), *pts[1:]))
-    bos.loc[flag_end] = bos.loc[flag_end].map(lambda pts: (*pts[:-1], itemgetter(pts[-1])(snapping_pts_lookup)))
+    matches = snapping_pts_lookup.get_indexer(pd.MultiIndex.from_arrays(coords[nodes].T))
+    flag = matches >= 0
+    coords[nodes[flag]] = snapping_pts[matches[flag]]
+    bo_idxs = np.unique(idxs[nodes[flag]])
 
     # Update bo geometries in GeoDataFrame.
-    df.loc[bos.loc[flag_start | flag_end].index, "geometry"] = bos.loc[flag_start | flag_end].map(LineString)
+    df.loc[bos.index[bo_idxs], "geometry"] = gpd.GeoSeries(pygeos.linestrings(coords, indices=idxs)[bo_idxs],
+                                                           index=bos.index[bo_idxs], crs=df.crs)
 
-    logger.info(f"Snapped {sum(flag_start | flag_end)} BOs to CRN roads "
+    logger.info(f"Snapped {len(bo_idxs)} BOs to CRN roads "
                 f"(node={sum(df_snapping['snapping_type'] == 'node')}, "
                 f"edge={sum(df_snapping['snapping_type'] == 'edge')}).")
 
     # Split crn roads.
 
     # Compile target snapping points of type "edge".
-    snapping_pts = df_snapping.loc[df_snapping["snapping_type"] == "edge", "geometry"].map(
-        lambda g: itemgetter(-1)(attrgetter("coords")(g)))
-    snapping_pts = gpd.GeoDataFrame(geometry=list(snapping_pts.map(Point)), crs=df.crs)
+    snapping_pts = pygeos.get_point(snapping[df_snapping["snapping_type"].values == "edge"], -1)
     if len(snapping_pts):
 
-        # Compile crn road geometries and idx - index lookup.
-        roads = df.loc[df["segment_type"] == 1, "geometry"].copy(deep=True)
-        roads_idx_index_lookup = dict(zip(range(len(roads)), roads.index))
+        # Compile crn road geometries.
+        roads = df.loc[df["segment_type"] == 1, "geometry"]
 
         # Configure snapping point - road linkages.
-        snapping_pts["road_idx"] = (pd.Series(roads.sindex.nearest(snapping_pts["geometry"], max_distance=0.01,
-                                                                   return_all=False, return_distance=False)[1])
-                                    .map(roads_idx_index_lookup))
-        roads_index_pts_lookup = dict(snapping_pts.groupby(by="road_idx", axis=0, as_index=True)["geometry"].agg(tuple))
-
-        # Filter roads to those involved in snapping.
-        roads = roads.loc[roads.index.isin(roads_index_pts_lookup)].copy(deep=True)
+        pt_idxs, road_idxs = roads.sindex.nearest(snapping_pts, max_distance=0.01, return_all=False,
+                                                  return_distance=False)
+        road_idxs, line_idxs = np.unique(road_idxs, return_inverse=True)
 
-        # Compile inputs geometries and split roads by snapping points.
-        roads_ = pd.Series(tuple(roads.reset_index(drop=False)[["geometry", roads.index.name]].apply(
-            lambda row: (row[0], itemgetter(row[1])(roads_index_pts_lookup)), axis=1)), index=roads.index)
-        roads_ = roads_.map(lambda vals: split_lines(vals[0], vals[1]))
+        # Split roads by snapping points.
+        parts, part_idxs = split_lines(roads.values.data[road_idxs], pts=snapping_pts[pt_idxs], line_idxs=line_idxs)
 
         # Update road geometries in GeoDataFrame.
-        df.loc[roads_.index, "geometry"] = roads_
+        df.loc[roads.index[road_idxs], "geometry"] = gpd.GeoSeries(
+            pygeos.multilinestrings(parts, indices=part_idxs), index=roads.index[road_idxs], crs=df.crs)
 
-        logger.info(f"Split {len(roads)} CRN roads due to BO edge snapping.")
+        logger.info(f"Split {len(road_idxs)} CRN roads due to BO edge snapping.")
 
     return df.copy(deep=True)
 
@@ -208,7 +899,7 @@ def explode_geometry(df: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         return df.copy(deep=True)
 
 
-def export(df: gpd.GeoDataFrame, dst: Path, name: str) -> None:
+def export(df: gpd.GeoDataFrame, dst: Path, name: str, batch_size: int = 10000) -> None:
     """
     Exports a GeoDataFrame to a GeoPackage.
 
@@ -216,70 +907,243 @@ def export(df: gpd.GeoDataFrame, dst: Path, name: str) -> None:
     :param gpd.GeoDataFrame df: GeoDataFrame.
     :param Path dst: output GeoPackage path.
     :param str name: output GeoPackage layer name.
+    :param int batch_size: number of features written per insert statement, default=10000.
     """
 
+    export_layers({name: df}, dst=dst, batch_size=batch_size)
+
+
+def export_layers(layers: Dict[str, Union[gpd.GeoDataFrame, pd.DataFrame, None]], dst: Path, batch_size: int = 10000,
+                  cache_size: int = 1024, indexes: Union[Dict[str, List[str]], None] = None) -> None:
+    """
+    Exports one or more GeoDataFrames to a GeoPackage within a single session and transaction.
+    Existing layers sharing a name with any of the given layers are deleted. Layers without a GeoDataFrame are only
+    deleted. DataFrames without geometries are exported as non-spatial (attribute) tables.
+
+    \b
+    :param Dict[str, Union[gpd.GeoDataFrame, pd.DataFrame, None]] layers: mapping of output GeoPackage layer names to
+        GeoDataFrames or DataFrames.
+    :param Path dst: output GeoPackage path.
+    :param int batch_size: number of features written per insert statement, default=10000.
+    :param int cache_size: SQLite page cache size (MB) for the session, default=1024.
+    :param Union[Dict[str, List[str]], None] indexes: mapping of output GeoPackage layer names to attributes to be
+        indexed, default None.
+    """
+
+    gpkg = None
+    transaction = False
+
     try:
 
         # Open GeoPackage.
         driver = ogr.GetDriverByName("GPKG")
         gpkg = driver.Open(str(dst), update=1)
 
-        # Configure spatial reference system.
-        srs = osr.SpatialReference()
-        srs.ImportFromEPSG(df.crs.to_epsg())
+        # Configure session pragmas (must be set outside of a transaction).
+        # Note: the journal mode is left unchanged since GeoPackages are often held open by other readers (e.g. QGIS),
+        #       which would prevent restoring the default mode and leave write-ahead log files beside the GeoPackage.
+        for pragma in ("synchronous = NORMAL", f"cache_size = -{cache_size * 1024}"):
+            _execute_sql(gpkg, sql=f"PRAGMA {pragma}")
+
+        # Start transaction.
+        gpkg.StartTransaction()
+        transaction = True
+
+        # Delete existing layers.
+        existing = {gpkg.GetLayerByIndex(idx).GetName() for idx in range(gpkg.GetLayerCount())}
+        deletions = [name for name in layers if name in existing]
+        if len(deletions):
+            logger.info(f"Deleting layer(s): {', '.join(deletions)} from \"{dst}\".")
+            for name in deletions:
+                gpkg.DeleteLayer(name)
+
+        # Write layers.
+        for name, df in layers.items():
+            if isinstance(df, pd.DataFrame):
+                _write_layer(gpkg, df=df, name=name, batch_size=batch_size, indexes=(indexes or dict()).get(name))
+
+        gpkg.CommitTransaction()
+        transaction = False
+
+    except (KeyError, RuntimeError, ValueError, sqlite3.Error) as e:
+        logger.exception(f"Error raised when writing output: {dst}|layers={','.join(layers)}.")
+        logger.exception(e)
+        sys.exit(1)
 
-        # Create GeoPackage layer.
-        geom_type = attrgetter(f"wkb{df.geom_type.iloc[0]}")(ogr)
-        layer = gpkg.CreateLayer(name=name, srs=srs, geom_type=geom_type, options=["OVERWRITE=YES"])
+    finally:
 
-        # Convert float fields to int.
-        for col in df.columns:
-            if df[col].dtype.kind == "f":
-                df.loc[df[col].isna(), col] = -1
-                df[col] = df[col].astype(int)
+        if gpkg is not None:
 
-        # Set field definitions.
-        ogr_field_map = {"b": ogr.OFTInteger, "i": ogr.OFTInteger, "O": ogr.OFTString}
-        for field_name, field_dtype in df.dtypes.to_dict().items():
-            if field_name != "geometry":
-                field_defn = ogr.FieldDefn(field_name, ogr_field_map[field_dtype.kind])
-                if field_dtype.kind == "b":
-                    field_defn.SetSubType(ogr.OFSTBoolean)
-                layer.CreateField(field_defn)
+            # Roll back any uncommitted transaction.
+            if transaction:
+                gpkg.RollbackTransaction()
 
-        # Write layer.
-        layer.StartTransaction()
+            del gpkg
 
-        for feat in tqdm(df.itertuples(index=False), total=len(df),
-                         desc=f"Writing to file: {gpkg.GetName()}|layer={name}",
-                         bar_format="{desc}: |{bar}| {percentage:3.0f}% {r_bar}"):
 
-            # Instantiate feature.
-            feature = ogr.Feature(layer.GetLayerDefn())
+def group_pairs(pairs: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Groups the tree results of a spatial index query pair array by input geometry, in compressed sparse row format.
+    The tree results for input geometry i are: tree_idxs[offsets[i]: offsets[i + 1]].
 
-            # Compile feature properties.
-            properties = feat._asdict()
+    \b
+    :param np.ndarray pairs: (N, 2) array of (input index, tree index) pairs, sorted by input index, see query_pairs.
+    :param int n: number of input geometries.
+    :return Tuple[np.ndarray, np.ndarray]: array of group offsets (length n + 1) and array of tree indexes.
+    """
 
-            # Set feature geometry.
-            geom = ogr.CreateGeometryFromWkb(properties.pop("geometry").wkb)
-            feature.SetGeometry(geom)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(count_pairs(pairs, n=n), out=offsets[1:])
 
-            # Iterate and set feature properties (attributes).
-            for field_index, prop in enumerate(properties.items()):
-                feature.SetField(field_index, prop[-1])
+    return offsets, pairs[:, 1]
 
-            # Create feature.
-            layer.CreateFeature(feature)
 
-            # Clear pointer for next iteration.
-            feature = None
+def hash_geometries(geoms: Union[gpd.GeoSeries, np.ndarray]) -> np.ndarray:
+    """
+    Generates a 64-bit content hash (fingerprint) for each geometry, based on its WKB representation.
 
-        layer.CommitTransaction()
+    \b
+    :param Union[gpd.GeoSeries, np.ndarray] geoms: geometries.
+    :return np.ndarray: array of uint64 hashes.
+    """
 
-    except (KeyError, ValueError, sqlite3.Error) as e:
-        logger.exception(f"Error raised when writing output: {dst}|layer={name}.")
-        logger.exception(e)
-        sys.exit(1)
+    if isinstance(geoms, gpd.GeoSeries):
+        geoms = geoms.values.data
+
+    return pd.util.hash_array(pygeos.to_wkb(geoms).astype(object))
+
+
+def load_extent(src: Union[Path, str], layer: str, extent: Union[gpd.GeoDataFrame, gpd.GeoSeries], margin: float = 0,
+                columns: Union[List[str], None] = None) -> gpd.GeoDataFrame:
+    """
+    Loads the features of a GeoPackage layer intersecting the bounding box of the extent geometries, expanded by a
+    margin. The bounding box filter is resolved by the GeoPackage spatial index, such that only intersecting features
+    are read.
+
+    \b
+    :param Union[Path, str] src: source GeoPackage path.
+    :param str layer: layer name.
+    :param Union[gpd.GeoDataFrame, gpd.GeoSeries] extent: extent geometries.
+    :param float margin: distance by which the extent bounding box is expanded (in extent CRS units), default 0.
+    :param Union[List[str], None] columns: attributes to be loaded, default None (all attributes).
+    :return gpd.GeoDataFrame: GeoDataFrame of the intersecting features.
+    """
+
+    # Compile extent bounding box.
+    bounds = extent.total_bounds + np.array([-margin, -margin, margin, margin])
+    bbox = gpd.GeoSeries(pygeos.box(*bounds[:, None]), crs=extent.crs)
+
+    # Compile attributes to be ignored.
+    ignore_fields = None
+    if columns is not None:
+        with fiona.open(src, layer=layer) as f:
+            ignore_fields = [col for col in f.schema["properties"] if col not in set(columns)]
+
+    return gpd.read_file(src, layer=layer, bbox=bbox, ignore_fields=ignore_fields)
+
+
+def load_matching(src: Union[Path, str], layer: str, columns: List[str], keys: List[str],
+                  values: Union[np.ndarray, pd.Series]) -> pd.DataFrame:
+    """
+    Loads the attributes (excluding geometries) of the features of a GeoPackage layer for which any of the key
+    attributes has one of the given values. The filter is resolved by SQLite, such that only matching features are
+    read.
+
+    \b
+    :param Union[Path, str] src: source GeoPackage path.
+    :param str layer: layer name.
+    :param List[str] columns: attributes to be loaded.
+    :param List[str] keys: key attributes, any of which must match one of the values.
+    :param Union[np.ndarray, pd.Series] values: key values.
+    :return pd.DataFrame: DataFrame of the matching features.
+    """
+
+    with closing(sqlite3.connect(f"{Path(src).resolve().as_uri()}?mode=ro", uri=True)) as con:
+
+        # Compile key values as a temporary table.
+        con.execute("CREATE TEMPORARY TABLE matching_values (val PRIMARY KEY)")
+        con.executemany("INSERT OR IGNORE INTO matching_values VALUES (?)",
+                        ((val,) for val in pd.unique(values).tolist()))
+
+        # Load matching features.
+        cols_sql = ", ".join(f"\"{col}\"" for col in columns)
+        where_sql = " OR ".join(f"\"{key}\" IN (SELECT val FROM matching_values)" for key in keys)
+
+        return pd.read_sql_query(f"SELECT {cols_sql} FROM \"{layer}\" WHERE {where_sql}", con)
+
+
+def load_standardized(src: Union[Path, str], layer: str, snap: bool = False, cache: bool = True,
+                      cache_size: int = 2048) -> gpd.GeoDataFrame:
+    """
+    Loads a CRN GeoPackage layer and applies standardizations (and optionally node snapping).
+    Standardized layers are cached as Parquet files, keyed by a content hash of the source layer, the standardization
+    parameters, and the helpers source code, such that unedited layers skip both loading and standardization. The
+    content hash is only regenerated once the GeoPackage metadata changes. The cache is size-bounded by evicting the
+    least recently used files.
+
+    \b
+    :param Union[Path, str] src: source GeoPackage path.
+    :param str layer: layer name.
+    :param bool snap: indicates if nodes are to be snapped, default False.
+    :param bool cache: indicates if the cache is to be used, default True.
+    :param int cache_size: maximum cache size (MiB), default 2048.
+    :return gpd.GeoDataFrame: standardized GeoDataFrame.
+    """
+
+    cache_dir = Path(__file__).resolve().parents[1] / "data/cache"
+    path = None
+
+    # Load cached data.
+    if cache:
+
+        try:
+
+            # Resolve content hash from the metadata hash, if the GeoPackage is unchanged since it was last hashed.
+            params = {"snap": snap}
+            key = cache_dir / f"{_cache_metadata_key(src, layer=layer, params=params)}.key"
+            if key.exists():
+                path = cache_dir / f"{key.read_text()}.parquet"
+            else:
+                path = cache_dir / f"{_cache_key(src, layer=layer, params=params)}.parquet"
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                key.write_text(path.stem)
+
+            if path.exists():
+                df = gpd.read_parquet(path)
+                os.utime(path)
+
+                logger.info(f"Loaded standardized data from cache: {path}.")
+                return df
+
+        except (ImportError, OSError, ValueError, sqlite3.Error) as e:
+            logger.warning(f"Unable to use cache for source: {src}|layer={layer}. {e}")
+            path = None
+
+    # Load source data.
+    logger.info(f"Loading source data: {src}|layer={layer}.")
+    df = gpd.read_file(src, layer=layer)
+    logger.info("Successfully loaded source data.")
+
+    # Standardize data and snap nodes.
+    df = standardize(df)
+    if snap:
+        df = snap_nodes(df)
+
+    # Cache data.
+    if path:
+
+        try:
+
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+            _evict_cache(cache_dir, cache_size=cache_size)
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to write cache for source: {src}|layer={layer}. {e}")
+
+    return df
 
 
 def load_yaml(path: Union[Path, str]) -> Any:
@@ -303,6 +1167,53 @@ def load_yaml(path: Union[Path, str]) -> Any:
             logger.exception(f"Unable to load yaml: {path}.")
 
 
+def polygonize_arcs(geoms: Union[gpd.GeoSeries, np.ndarray]) -> np.ndarray:
+    """
+    Polygonizes LineString arcs into the polygons formed by their closed rings (meshblock).
+    Arcs which are already noded (only intersect at endpoints), as expected after topology validation, are
+    polygonized directly. Otherwise, arcs are first noded and dissolved via a unary union. Both methods produce the
+    same polygons.
+
+    \b
+    :param Union[gpd.GeoSeries, np.ndarray] geoms: LineString geometries.
+    :return np.ndarray: array of Polygon geometries.
+    """
+
+    if isinstance(geoms, gpd.GeoSeries):
+        geoms = geoms.values.data
+
+    if not len(geoms):
+        return np.array([], dtype=object)
+
+    # Node arcs if any arcs intersect at a non-endpoint.
+    if not pygeos.is_simple(pygeos.multilinestrings(geoms)):
+        logger.info("Arcs are not noded. Noding arcs prior to polygonization.")
+        geoms = pygeos.get_parts(pygeos.union_all(geoms))
+
+    return pygeos.get_parts(pygeos.polygonize(geoms))
+
+
+def query_pairs(geoms: Union[gpd.GeoSeries, np.ndarray], tree: Union[gpd.GeoDataFrame, gpd.GeoSeries, np.ndarray],
+                predicate: Union[str, None] = None) -> np.ndarray:
+    """
+    Queries the spatial index of a tree GeoDataFrame / GeoSeries with all input geometries in a single bulk query.
+    For a tree array of geometries, a temporary spatial index is generated.
+
+    \b
+    :param Union[gpd.GeoSeries, np.ndarray] geoms: input geometries.
+    :param Union[gpd.GeoDataFrame, gpd.GeoSeries, np.ndarray] tree: GeoDataFrame, GeoSeries, or array of geometries
+        whose spatial index is queried.
+    :param Union[str, None] predicate: binary predicate evaluated between input and tree geometries, default None
+        (bounding box intersection).
+    :return np.ndarray: (N, 2) array of (input index, tree index) positional pairs, sorted by input then tree index.
+    """
+
+    sindex = pygeos.STRtree(tree) if isinstance(tree, np.ndarray) else tree.sindex
+    pairs = sindex.query_bulk(geoms, predicate=predicate).T.astype(np.int64)
+
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
 def round_coordinates(df: gpd.GeoDataFrame, precision: int = 5) -> gpd.GeoDataFrame:
     """
     Rounds the LineString coordinates to a specified decimal precision.
@@ -323,16 +1234,22 @@ def round_coordinates(df: gpd.GeoDataFrame, precision: int = 5) -> gpd.GeoDataFr
         if len(set(df.geom_type) - {"LineString"}):
             raise TypeError("Non-LineString geometries detected for GeoDataFrame.")
 
-        # Round coordinates.
-        coords = df["geometry"].map(lambda g: map(
-            lambda pt: (round(itemgetter(0)(pt), precision), round(itemgetter(1)(pt), precision)),
-            attrgetter("coords")(g))).map(tuple)
+        if len(df):
+
+            # Compile 2-dimensional coordinates as a flat array with the geometry index of each vertex.
+            coords, idxs = pygeos.get_coordinates(df["geometry"].values.data, return_index=True)
+
+            # Round coordinates.
+            coords = _round(coords, precision=precision)
 
-        # Remove duplicated adjacent vertices.
-        flag = coords.map(set).map(len) >= 2
-        coords.loc[flag] = coords.loc[flag].map(lambda g: tuple(map(itemgetter(0), groupby(g))))
+            # Remove duplicated adjacent vertices (only for geometries with >= 2 unique vertices).
+            flag_dup = np.zeros(len(coords), dtype=bool)
+            flag_dup[1:] = (idxs[1:] == idxs[:-1]) & (coords[1:] == coords[:-1]).all(axis=1)
+            flag_unique = np.bincount(idxs[~flag_dup], minlength=len(df)) >= 2
+            flag_keep = ~(flag_dup & flag_unique[idxs])
 
-        df["geometry"] = coords.map(LineString)
+            df["geometry"] = gpd.GeoSeries(pygeos.linestrings(coords[flag_keep], indices=idxs[flag_keep]),
+                                           index=df.index, crs=df.crs)
 
         return df.copy(deep=True)
 
@@ -345,6 +1262,7 @@ def round_coordinates(df: gpd.GeoDataFrame, precision: int = 5) -> gpd.GeoDataFr
 def snap_nodes(df: gpd.GeoDataFrame, prox: float = 0.1, prox_boundary: float = 0.01) -> gpd.GeoDataFrame:
     """
     Snaps NGD arcs to NRN arcs (node-to-node) if they are <= the snapping proximity threshold.
+    Each NGD node is snapped to the nearest NRN node, with ties resolved by the lowest NRN node coordinates.
 
     \b
     :param gpd.GeoDataFrame df: GeoDataFrame containing both NRN and NGD arcs.
@@ -355,89 +1273,117 @@ def snap_nodes(df: gpd.GeoDataFrame, prox: float = 0.1, prox_boundary: float = 0
 
     logger.info(f"Snapping to NRN nodes.")
 
-    # Compile nodes.
-    nrn_flag = (df["segment_id_orig"].map(len) == 32) & (df["segment_type"] == 1)
-    nrn_nodes = set(df.loc[nrn_flag, "geometry"].map(
-        lambda g: set(itemgetter(0, -1)(attrgetter("coords")(g)))).explode())
-    ngd_nodes = df.loc[~nrn_flag, "geometry"].map(
-        lambda g: set(itemgetter(0, -1)(attrgetter("coords")(g)))).explode()
-    ngd_boundary_nodes = set(df.loc[(~nrn_flag) & (df["boundary"] == 1), "geometry"].map(
-        lambda g: set(itemgetter(0, -1)(attrgetter("coords")(g)))).explode())
-
-    # Compile snappable ngd nodes (ngd nodes not connected to an nrn node).
-    snap_nodes_ = ngd_nodes.loc[~ngd_nodes.isin(nrn_nodes)].copy(deep=True)
-    if len(snap_nodes_):
-
-        # Compile nrn nodes as Points.
-        nrn_nodes = gpd.GeoSeries(map(Point, set(nrn_nodes)), crs=df.crs)
-
-        # Generate simplified ngd node buffers using distance tolerance.
-        snap_node_buffers = snap_nodes_.map(
-            lambda pt: Point(pt).buffer({True: prox_boundary, False: prox}[pt in ngd_boundary_nodes], resolution=5))
-
-        # Query nrn node which intersect each ngd node buffer.
-        # Construct DataFrame containing results.
-        snap_features = pd.DataFrame({
-            "from_node": snap_nodes_,
-            "to_node": snap_node_buffers.map(lambda buffer: set(nrn_nodes.sindex.query(buffer, predicate="intersects")))
-        })
-
-        # Filter snappable nodes to those intersecting >= 1 nrn node.
-        snap_nodes_ = snap_features.loc[snap_features["to_node"].map(len) >= 1].copy(deep=True)
-        if len(snap_nodes_):
-
-            # Create idx-node lookup for target nodes.
-            to_node_idxs = set(chain.from_iterable(snap_nodes_["to_node"]))
-            to_nodes = nrn_nodes.loc[nrn_nodes.index.isin(to_node_idxs)]
-            to_node_lookup = dict(zip(to_nodes.index, to_nodes.map(lambda pt: itemgetter(0)(attrgetter("coords")(pt)))))
+    if not len(df):
+        return df.copy(deep=True)
 
-            # Replace target node indexes with actual nodes tuple of first result in each instance.
-            snap_nodes_["to_node"] = snap_nodes_["to_node"].map(lambda idxs: itemgetter(tuple(idxs)[0])(to_node_lookup))
+    # Compile coordinates and the coordinate positions, arc positions, and keys (complex x + yj) of each node.
+    coords, idxs = pygeos.get_coordinates(df["geometry"].values.data, return_index=True)
+    ends = np.cumsum(np.bincount(idxs, minlength=len(df))) - 1
+    node_pos = np.column_stack([np.r_[0, ends[:-1] + 1], ends]).ravel()
+    node_arc = np.repeat(np.arange(len(df)), 2)
+    node_keys = coords[node_pos, 0] + 1j * coords[node_pos, 1]
 
-            # Create node snapping lookup dictionary and update required arcs.
-            snap_nodes_lookup = dict(zip(snap_nodes_["from_node"], snap_nodes_["to_node"]))
-            snap_arc_ids = set(snap_nodes_.index)
-            df.loc[df.index.isin(snap_arc_ids), "geometry"] = df.loc[df.index.isin(snap_arc_ids), "geometry"].map(
-                lambda g: update_nodes(g, node_map=snap_nodes_lookup))
+    # Compile nodes.
+    nrn_flag = ((df["segment_id_orig"].str.len() == 32) & (df["segment_type"] == 1)).values[node_arc]
+    boundary_flag = (df["boundary"] == 1).values[node_arc]
+    nrn_keys = np.unique(node_keys[nrn_flag])
 
-            logger.info(f"Snapped {len(snap_nodes_)} non-NRN nodes to NRN nodes based on proximity={prox}.")
+    # Compile snappable ngd nodes (ngd nodes not connected to an nrn node).
+    snap_flag = ~nrn_flag & ~np.isin(node_keys, nrn_keys)
+    snap_keys = np.unique(node_keys[snap_flag])
+    if len(snap_keys) and len(nrn_keys):
+
+        # Compile distance tolerance of each snappable node.
+        tolerance = np.where(np.isin(snap_keys, node_keys[~nrn_flag & boundary_flag]), prox_boundary, prox)
+
+        # Query nearest nrn node(s) to each snappable node within the maximum distance tolerance.
+        nrn_nodes = gpd.GeoSeries(pygeos.points(nrn_keys.real, nrn_keys.imag), crs=df.crs)
+        (from_idxs, to_idxs), dists = nrn_nodes.sindex.nearest(
+            pygeos.points(snap_keys.real, snap_keys.imag), return_all=True, max_distance=max(prox, prox_boundary),
+            return_distance=True)
+
+        # Filter results to node-specific distance tolerance and select the nearest result (lowest nrn node index for
+        # ties, equivalent to the lowest coordinates since nrn node keys are sorted).
+        flag = dists <= tolerance[from_idxs]
+        from_idxs, to_idxs = from_idxs[flag], to_idxs[flag]
+        order = np.lexsort((to_idxs, from_idxs))
+        from_idxs, first = np.unique(from_idxs[order], return_index=True)
+        to_idxs = to_idxs[order][first]
+
+        if len(from_idxs):
+
+            # Update node coordinates of all arcs connected to a snapped node.
+            snap_map = pd.Series(nrn_keys[to_idxs], index=snap_keys[from_idxs])
+            update_flag = snap_flag & np.isin(node_keys, snap_map.index)
+            to_keys = snap_map.loc[node_keys[update_flag]].values
+            coords[node_pos[update_flag]] = np.column_stack([to_keys.real, to_keys.imag])
+
+            # Rebuild updated arcs.
+            arcs = np.unique(node_arc[update_flag])
+            flag_coords = np.isin(idxs, arcs)
+            geoms = df["geometry"].values.data.copy()
+            geoms[arcs] = pygeos.linestrings(coords[flag_coords], indices=np.searchsorted(arcs, idxs[flag_coords]))
+            df["geometry"] = gpd.GeoSeries(geoms, index=df.index, crs=df.crs)
+
+            # Count snapped nodes per arc (closed arcs count once).
+            count = update_flag.sum() - (update_flag[::2] & update_flag[1::2] &
+                                         (node_keys[::2] == node_keys[1::2])).sum()
+
+            logger.info(f"Snapped {count} non-NRN nodes to NRN nodes based on proximity={prox}.")
 
     return df.copy(deep=True)
 
 
-def split_lines(line: LineString, pts: Tuple[Point, ...]) -> MultiLineString:
+def split_lines(lines: np.ndarray, pts: np.ndarray, line_idxs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Splits a LineString on one or more Points.
+    Splits LineStrings on Points, in batch. Each split point is inserted into its LineString at its projected distance
+    along the LineString, using the cumulative distances of the LineString vertices.
 
-    :param LineString line: LineString to be split.
-    :param Tuple[Point, ...] pts: Point(s) to be used for splitting.
-    :return MultiLineString: split LineString.
+    \b
+    :param np.ndarray lines: LineString geometries to be split.
+    :param np.ndarray pts: Point geometries to be used for splitting.
+    :param np.ndarray line_idxs: index of the LineString to be split by each Point.
+    :return Tuple[np.ndarray, np.ndarray]: array of split LineString geometries and array of the index of the source
+        LineString of each split LineString, sorted by source LineString.
     """
 
-    # Compile LineString coordinates and calculate distances along LineString.
-    vertices = tuple(attrgetter("coords")(line))
-    dist = tuple(map(lambda pt: line.project(Point(pt)), vertices))
-    dist_vertices = tuple(zip(dist, vertices))
-
-    # Compile split point coordinates and calculate distances along LineString.
-    pts_ = tuple(map(lambda pt: itemgetter(0)(attrgetter("coords")(pt)), pts))
-    dist = tuple(map(lambda pt: line.project(pt), pts))
-    dist_pts = tuple(zip(dist, pts_))
-
-    # Combine all coordinates and distances then sort by distance, discarding the distances afterwards.
-    sorted_pts = sorted((*dist_vertices, *dist_pts), key=itemgetter(0))
-    sorted_pts = [vals[1] for vals in sorted_pts]
-
-    # Configure split indexes and pairs.
-    pts_ = set(pts_)
-    split_idxs = tuple(compress(range(len(sorted_pts)), map(lambda pt: pt in pts_, sorted_pts)))
-    split_idx_pairs = tuple(zip(chain([0], split_idxs), chain([i + 1 for i in split_idxs], [None])))
-
-    # Construct LineStrings using points and indexes.
-    pt_groups = (sorted_pts[start_idx: end_idx] for start_idx, end_idx in split_idx_pairs)
-    lines = MultiLineString(tuple(map(lambda pt_group: LineString(map(Point, pt_group)), pt_groups)))
-
-    return lines
+    # Compile split point coordinates, removing duplicates.
+    pts_coords = pygeos.get_coordinates(pts)
+    _, idxs = np.unique(np.column_stack([line_idxs, pts_coords]), axis=0, return_index=True)
+    pts, pts_coords, line_idxs = pts[idxs], pts_coords[idxs], np.asarray(line_idxs)[idxs]
+
+    # Compile vertices and calculate cumulative distances along LineStrings.
+    coords, vertex_idxs = pygeos.get_coordinates(lines, return_index=True)
+    dists = np.zeros(len(coords))
+    dists[1:] = np.hypot(*np.diff(coords, axis=0).T)
+    dists[np.r_[0, np.flatnonzero(np.diff(vertex_idxs)) + 1]] = 0
+    dists = np.cumsum(dists)
+    dists -= dists[np.searchsorted(vertex_idxs, vertex_idxs)]
+
+    # Remove vertices coincident with split points.
+    flag = ~pd.MultiIndex.from_arrays([vertex_idxs, *coords.T])\
+        .isin(pd.MultiIndex.from_arrays([line_idxs, *pts_coords.T]))
+    coords, vertex_idxs, dists = coords[flag], vertex_idxs[flag], dists[flag]
+
+    # Combine vertices and split points (as the end of one part and the start of the next part), sorted by distance.
+    pts_dists = pygeos.line_locate_point(lines[line_idxs], pts)
+    coords = np.concatenate([coords, pts_coords, pts_coords])
+    idxs = np.concatenate([vertex_idxs, line_idxs, line_idxs])
+    dists = np.concatenate([dists, pts_dists, pts_dists])
+    codes = np.repeat([0, 1, 2], [len(vertex_idxs), len(line_idxs), len(line_idxs)])
+    order = np.lexsort((codes, dists, idxs))
+    coords, idxs, codes = coords[order], idxs[order], codes[order]
+
+    # Assign part indexes, starting a new part at the start of each LineString and at each split point.
+    parts = np.cumsum((codes == 2) | np.r_[True, idxs[1:] != idxs[:-1]]) - 1
+
+    # Construct LineStrings, discarding parts with fewer than 2 vertices.
+    counts = np.bincount(parts)
+    flag = counts[parts] >= 2
+    part_idxs, parts = np.unique(parts[flag], return_inverse=True)
+    lines = pygeos.linestrings(coords[flag], indices=parts)
+
+    return lines, idxs[flag][np.searchsorted(parts, np.arange(len(part_idxs)))]
 
 
 def standardize(df: gpd.GeoDataFrame, round_coords: bool = True) -> gpd.GeoDataFrame:
@@ -492,19 +1438,22 @@ def standardize(df: gpd.GeoDataFrame, round_coords: bool = True) -> gpd.GeoDataF
         if sum(flag_null_len):
 
             # Compile valid coordinates for flagged geometries.
-            df_ = df.loc[flag_null_len].copy(deep=True)
-            df_["valid_coords"] = df_["geometry"].map(
-                lambda g: tuple(filter(lambda pt: not (pd.isna(pt[0]) or pd.isna(pt[1])), attrgetter("coords")(g))))
+            index = df.index[flag_null_len]
+            coords, idxs = pygeos.get_coordinates(df.loc[flag_null_len, "geometry"].values.data, return_index=True)
+            flag_valid = ~np.isnan(coords).any(axis=1)
 
             # Flag geometries with valid (non-null) coordinates.
-            flag_has_valid_coords = df_["valid_coords"].map(len) >= 2
+            flag_has_valid_coords = np.bincount(idxs[flag_valid], minlength=len(index)) >= 2
+            flag_valid &= flag_has_valid_coords[idxs]
 
             # Update geometries - Has valid coordinates: Replace geometry.
-            df.loc[df_.loc[flag_has_valid_coords].index, "geometry"] = \
-                df_.loc[flag_has_valid_coords, "valid_coords"].map(LineString)
+            if flag_has_valid_coords.any():
+                df.loc[index[flag_has_valid_coords], "geometry"] = gpd.GeoSeries(
+                    pygeos.linestrings(coords[flag_valid], indices=np.unique(idxs[flag_valid], return_inverse=True)[1]),
+                    index=index[flag_has_valid_coords], crs=df.crs)
 
             # Update geometries - No valid coordinates: Drop geometry.
-            df = df.loc[~df.index.isin(df_.loc[~flag_has_valid_coords].index)].copy(deep=True)
+            df = df.loc[~df.index.isin(index[~flag_has_valid_coords])].copy(deep=True)
 
             logger.warning(f"Removed null coordinates from {sum(flag_null_len)} geometries: geometries updated = "
                            f"{sum(flag_has_valid_coords)}, geometries dropped = {sum(~flag_has_valid_coords)}.")
@@ -539,45 +1488,17 @@ def standardize(df: gpd.GeoDataFrame, round_coords: bool = True) -> gpd.GeoDataF
         # Iterate attribute specifications.
         for col, params in specs.items():
 
-            # Copy original series as object dtype.
-            s_orig = df[col].copy(deep=True).astype(object)
-
-            # Set Nulls to default value.
-            flag_null = df[col].isna()
-            df.loc[flag_null, col] = params["default"]
-
-            # Set invalid values (not within domain) to default value.
-            if params["domain"]:
-                flag_domain = ~df[col].astype(str).isin(params["domain"])
-                df.loc[flag_domain, col] = params["default"]
-
-            # Map values via domain.
-            if params["domain"]:
-                flag_cast = ~df[col].isin(params["domain"].values())
-                df.loc[flag_cast, col] = df.loc[flag_cast, col].astype(str).map(params["domain"])
-
-            # Cast dtype.
-            def _cast_dtype(val):
-                try:
-                    return params["dtype"](val)
-                except ValueError:
-                    return params["default"]
-
-            df[col] = df[col].map(_cast_dtype)
+            # Enforce domain and dtype.
+            df[col], count = _standardize_attribute(df[col], **params)
 
             # Log results.
-            flag_invalid = pd.Series(s_orig.map(str) != df[col].map(str))
-            if sum(flag_invalid):
-                logger.warning(f"Standardized domain and dtype for {sum(flag_invalid)} records for \"{col}\".")
+            if count:
+                logger.warning(f"Standardized domain and dtype for {count} records for \"{col}\".")
 
         # Standardize domain - identifier.
 
-        # Flag invalid identifiers.
-        hexdigits = set(string.hexdigits)
-        flag_len = df[identifier].map(len) != 32
-        flag_non_hex = df[identifier].map(lambda val: not set(val).issubset(hexdigits))
-        flag_dups = df[identifier].duplicated(keep=False)
-        flag_invalid = flag_len | flag_non_hex | flag_dups
+        # Flag invalid identifiers (non-32 digit hexadecimal or duplicated).
+        flag_invalid = ~df[identifier].str.fullmatch(r"[0-9a-fA-F]{32}") | df[identifier].duplicated(keep=False)
 
         # Resolve invalid identifiers and assign attribute as index.
         if sum(flag_invalid):
@@ -605,15 +1526,16 @@ def standardize(df: gpd.GeoDataFrame, round_coords: bool = True) -> gpd.GeoDataF
         # iii) NRN record integrity.
 
         # Standardize NRN identifier.
-        flag_invalid = (df[nrn_identifier].map(len) != 32) & (df[nrn_identifier] != specs[nrn_identifier]["default"])
+        flag_invalid = (df[nrn_identifier].str.len() != 32) & (df[nrn_identifier] != specs[nrn_identifier]["default"])
         if sum(flag_invalid):
             df.loc[flag_invalid, nrn_identifier] = specs[identifier]["default"]
 
             logger.warning(f"Resolved {sum(flag_invalid)} invalid NRN identifiers for \"segment_id_orig\".")
 
         # Revert modified attributes.
+        flag_nrn = df[nrn_identifier].str.len() == 32
         for col, domain in {"bo_new": {0}, "boundary": {0}, "segment_type": {1}}.items():
-            flag_invalid = (df[nrn_identifier].map(len) == 32) & (~df[col].isin(domain))
+            flag_invalid = flag_nrn & (~df[col].isin(domain))
             if sum(flag_invalid):
                 df.loc[flag_invalid, col] = specs[col]["default"]
 
@@ -639,24 +1561,68 @@ def standardize(df: gpd.GeoDataFrame, round_coords: bool = True) -> gpd.GeoDataF
         sys.exit(1)
 
 
-def update_nodes(g: LineString, node_map: Dict[tuple, tuple]) -> LineString:
+def write_flags(dst: Path, name: str, flags: Dict[str, set], key: str, batch_size: int = 10000) -> None:
     """
-    Updates one or both nodes in the LineString.
+    Writes integer flag attributes (1 = flagged, 0 = not flagged) to an existing GeoPackage layer in place, without
+    rewriting the layer. Records are flagged by the values of a key attribute.
 
     \b
-    :param LineString g: LineString to be updated.
-    :param Dict[tuple, tuple] node_map: mapping of from and to nodes.
-    :return LineString: updated LineString.
+    :param Path dst: output GeoPackage path.
+    :param str name: GeoPackage layer name.
+    :param Dict[str, set] flags: mapping of flag attribute names to the set of key values of flagged records.
+    :param str key: key attribute.
+    :param int batch_size: number of key values written per insert statement, default=10000.
     """
 
-    # Compile coordinates.
-    coords = list(attrgetter("coords")(g))
+    gpkg = None
+    transaction = False
 
-    # Conditionally update nodes.
-    for idx in (0, -1):
-        try:
-            coords[idx] = itemgetter(coords[idx])(node_map)
-        except KeyError:
-            pass
+    try:
+
+        # Open GeoPackage and layer.
+        driver = ogr.GetDriverByName("GPKG")
+        gpkg = driver.Open(str(dst), update=1)
+        layer = gpkg.GetLayerByName(name)
+        if layer is None:
+            raise ValueError(f"Layer \"{name}\" does not exist in \"{dst}\".")
+        defn = layer.GetLayerDefn()
+
+        # Start transaction.
+        gpkg.StartTransaction()
+        transaction = True
+
+        # Create flag attributes.
+        existing = {defn.GetFieldDefn(idx).GetName() for idx in range(defn.GetFieldCount())}
+        for col in flags:
+            if col not in existing:
+                layer.CreateField(ogr.FieldDefn(col, ogr.OFTInteger))
+
+        # Compile flagged key values as a temporary table.
+        _execute_sql(gpkg, sql="CREATE TEMPORARY TABLE flags (col TEXT, key TEXT)")
+        df = pd.DataFrame([(col, str(val)) for col, vals in flags.items() for val in vals], columns=["col", "key"])
+        for idx in range(0, len(df), batch_size):
+            _execute_sql(gpkg, sql=f"INSERT INTO flags VALUES {_sql_values(df.iloc[idx: idx + batch_size], None)}")
+
+        # Write flags.
+        for col in flags:
+            _execute_sql(gpkg, sql=f"UPDATE \"{name}\" SET \"{col}\" = "
+                                   f"\"{key}\" IN (SELECT key FROM flags WHERE col = '{col}')")
+        _execute_sql(gpkg, sql="DROP TABLE flags")
+
+        gpkg.CommitTransaction()
+        transaction = False
+
+    except (RuntimeError, ValueError, sqlite3.Error) as e:
+        logger.exception(f"Error raised when writing flags: {dst}|layer={name}.")
+        logger.exception(e)
+        sys.exit(1)
+
+    finally:
+
+        if gpkg is not None:
+
+            # Roll back any uncommitted transaction.
+            if transaction:
+                gpkg.RollbackTransaction()
 
-    return LineString(coords)
+            del gpkg
@@ -2,10 +2,9 @@ import click
 import fiona
 import geopandas as gpd
 import logging
+import numpy as np
 import pandas as pd
 import sys
-from itertools import chain
-from operator import itemgetter
 from pathlib import Path
 
 filepath = Path(__file__).resolve()
@@ -25,20 +24,24 @@ logger.addHandler(handler)
 class CRNArcLinkage:
     """Defines the CRN arc linkage class."""
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, normalized: bool = False) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
+        :param bool normalized: indicates if the linkage is to be output as a normalized table instead of
+            comma-delimited arc attributes, default False.
         """
 
         self.source = source
+        self.normalized = normalized
 
         self.src = Path(filepath.parents[2] / "data/crn.gpkg")
         self.dst = Path(filepath.parents[2] / "data/crn.gpkg")
         self.layer_arc = f"crn_{self.source}"
         self.layer_meshblock = f"meshblock_{self.source}"
+        self.layer_linkage = f"linkage_{self.source}"
 
         self.src_ngd = Path(helpers.load_yaml("../config.yaml")["filepaths"]["ngd"])
         self.layer_arc_ngd = f"ngd_al_{self.source.split('_')[0]}"
@@ -48,6 +51,7 @@ class CRNArcLinkage:
         self.id_meshblock_ngd = "bb_uid"
         self.id_meshblock_l_ngd = "bb_uid_l"
         self.id_meshblock_r_ngd = "bb_uid_r"
+        self.arc_linkage = None
 
         # Configure src / dst paths and layer names.
         if self.src.exists():
@@ -70,7 +74,7 @@ class CRNArcLinkage:
 
         # Load ngd data.
         logger.info(f"Loading ngd data: {self.src_ngd}|layers={self.layer_arc_ngd}.")
-        self.arcs_ngd = gpd.read_file(self.src_ngd, layer=self.layer_arc_ngd)
+        self.arcs_ngd = self._load_arcs_ngd()
         logger.info("Successfully loaded ngd data.")
 
     def __call__(self) -> None:
@@ -79,75 +83,106 @@ class CRNArcLinkage:
         self.linkage()
         self.output_results()
 
+    def _load_arcs_ngd(self) -> pd.DataFrame:
+        """
+        Loads the identifiers of the ngd arcs bounding any ngd meshblock linked to the meshblock. Ngd arcs are selected
+        by their ngd meshblock identifiers, rather than by extent, since ngd meshblocks can extend well beyond the
+        meshblock extent.
+
+        \b
+        :return pd.DataFrame: DataFrame of ngd arc and left and right ngd meshblock identifiers.
+        """
+
+        bb_uids = self.meshblock.loc[self.meshblock[self.id_meshblock_ngd] != -1, self.id_meshblock_ngd]
+
+        return helpers.load_matching(self.src_ngd, layer=self.layer_arc_ngd,
+                                     columns=[self.id_arc_ngd, self.id_meshblock_l_ngd, self.id_meshblock_r_ngd],
+                                     keys=[self.id_meshblock_l_ngd, self.id_meshblock_r_ngd], values=bb_uids)
+
     def linkage(self) -> None:
         """Performs the arc linkage."""
 
         logger.info(f"Performing arc linkage.")
 
-        # Define linkage attribution.
-        for new_col in ("meshblock_idx", f"{self.id_meshblock_ngd}_linked", f"{self.id_arc_ngd}_linked"):
-            self.arcs[new_col] = ((-1,),) * len(self.arcs)
-
         # Compile the meshblock index associated with each arc - an arc will be covered by or contained by a polygon.
-        meshblock_boundaries = self.meshblock.boundary
-        self.arcs["meshblock_idx"] = self.arcs["geometry"].map(
-            lambda g: set(meshblock_boundaries.sindex.query(g, predicate="covered_by")))
-        self.arcs.loc[self.arcs["meshblock_idx"].map(len) == 0, "meshblock_idx"] = \
-            self.arcs.loc[self.arcs["meshblock_idx"].map(len) == 0, "geometry"].map(
-                lambda g: set(self.meshblock.sindex.query(g, predicate="within")))
-
-        # Retrieve the ngd meshblock identifier linking to each new meshblock.
-        meshblock_idx_ngd_id = dict(zip(self.meshblock.index, self.meshblock[self.id_meshblock_ngd]))
-        self.arcs[f"{self.id_meshblock_ngd}_linked"] = self.arcs["meshblock_idx"]\
-            .map(lambda idxs: itemgetter(*idxs)(meshblock_idx_ngd_id))\
-            .map(lambda vals: vals if isinstance(vals, tuple) else (vals,)).map(set).map(tuple)
-
-        # Create ngd meshblock - arc identifiers lookup. Add -1 to dict for non linkages.
-        arcs_ngd_both_sides = pd.DataFrame().append([
+        pairs = helpers.query_pairs(self.arcs["geometry"], tree=self.meshblock.boundary, predicate="covered_by")
+        idxs = np.setdiff1d(np.arange(len(self.arcs)), pairs[:, 0])
+        pairs_within = helpers.query_pairs(self.arcs["geometry"].iloc[idxs], tree=self.meshblock, predicate="within")
+        pairs_within[:, 0] = idxs[pairs_within[:, 0]]
+
+        # Retrieve the ngd meshblock identifier linking to each new meshblock. Add -1 for non linkages.
+        pairs = np.concatenate([pairs, pairs_within])
+        idxs = np.setdiff1d(np.arange(len(self.arcs)), pairs[:, 0])
+        linkage = pd.DataFrame({
+            "arc_idx": np.concatenate([pairs[:, 0], idxs]),
+            self.id_meshblock_ngd: np.concatenate([self.meshblock[self.id_meshblock_ngd].values[pairs[:, 1]],
+                                                   np.full(len(idxs), -1)])
+        }).drop_duplicates()
+
+        # Compile ngd meshblock - arc identifier pairs, excluding non linkages (-1) such that unlinked arcs remain -1.
+        arcs_ngd_both_sides = pd.concat([
             self.arcs_ngd[[self.id_arc_ngd, self.id_meshblock_l_ngd]]
                 .rename(columns={self.id_meshblock_l_ngd: self.id_meshblock_ngd}),
             self.arcs_ngd[[self.id_arc_ngd, self.id_meshblock_r_ngd]]
                 .rename(columns={self.id_meshblock_r_ngd: self.id_meshblock_ngd})
-        ])
-        ngd_meshblock_id_to_arc_ids = arcs_ngd_both_sides.groupby(
-            by=self.id_meshblock_ngd, axis=0, as_index=True)[self.id_arc_ngd].agg(tuple).to_dict()
-        ngd_meshblock_id_to_arc_ids[-1] = (-1,)
+        ]).drop_duplicates()
+        arcs_ngd_both_sides = arcs_ngd_both_sides.loc[arcs_ngd_both_sides[self.id_meshblock_ngd] != -1]
+
+        # Compile ngd arc identifiers associated with each linked ngd meshblock. Add -1 for non linkages.
+        linkage = linkage.merge(arcs_ngd_both_sides, on=self.id_meshblock_ngd, how="left")
+        linkage[self.id_arc_ngd] = linkage[self.id_arc_ngd].fillna(-1).astype(int)
 
-        # Compile ngd arc identifiers associated with each linked ngd meshblock.
-        self.arcs[f"{self.id_arc_ngd}_linked"] = self.arcs[f"{self.id_meshblock_ngd}_linked"]\
-            .map(lambda ids: itemgetter(*ids)(ngd_meshblock_id_to_arc_ids))\
-            .map(lambda vals: tuple(chain.from_iterable(vals) if isinstance(vals[0], tuple) else vals))
+        # Compile arc - ngd meshblock - ngd arc identifier linkages.
+        linkage[self.id_arc] = self.arcs[self.id_arc].values[linkage["arc_idx"]]
+        self.arc_linkage = linkage.sort_values(by=["arc_idx", self.id_meshblock_ngd, self.id_arc_ngd])\
+            [[self.id_arc, self.id_meshblock_ngd, self.id_arc_ngd]].reset_index(drop=True)
 
     def output_results(self) -> None:
         """Outputs linkage results."""
 
         logger.info(f"Outputting results.")
 
-        # Delete temporary attributes.
-        self.arcs.drop(columns=["meshblock_idx"], inplace=True)
+        cols_linked = [f"{col}_linked" for col in (self.id_meshblock_ngd, self.id_arc_ngd)]
+
+        # Export arcs and the linkage as a normalized table, indexed on each identifier.
+        if self.normalized:
+            self.arcs.drop(columns=cols_linked, inplace=True, errors="ignore")
+            helpers.export_layers({self.layer_arc: self.arcs, self.layer_linkage: self.arc_linkage}, dst=self.dst,
+                                  indexes={self.layer_linkage: list(self.arc_linkage.columns)})
+
+        else:
 
-        # Convert list-like attributes to comma-delimited strings.
-        for col in (f"{self.id_meshblock_ngd}_linked", f"{self.id_arc_ngd}_linked"):
-            self.arcs[col] = self.arcs[col].map(lambda vals: ",".join(map(str, vals)))
+            # Compile linked ngd meshblock and arc identifiers as comma-delimited strings.
+            for col, col_linked in zip((self.id_meshblock_ngd, self.id_arc_ngd), cols_linked):
+                vals = self.arc_linkage[[self.id_arc, col]].drop_duplicates()
+                idxs = pd.Index(self.arcs[self.id_arc]).get_indexer(vals[self.id_arc])
+                offsets, _ = helpers.group_pairs(np.column_stack([idxs, idxs]), n=len(self.arcs))
+                vals = vals[col].astype(str).values
+                self.arcs[col_linked] = [",".join(vals[start: end]) for start, end in zip(offsets[:-1], offsets[1:])]
 
-        # Export arcs with linked ngd meshblock and arc identifiers.
-        helpers.export(self.arcs, dst=self.dst, name=self.layer_arc)
+            # Export arcs with linked ngd meshblock and arc identifiers, and delete any normalized linkage table.
+            helpers.export_layers({self.layer_arc: self.arcs, self.layer_linkage: None}, dst=self.dst)
 
 
 @click.command()
 @click.argument("source", type=click.Choice(helpers.load_yaml("../config.yaml")["sources"], False))
-def main(source: str) -> None:
+@click.option("--normalized", "-n", is_flag=True, default=False, show_default=True,
+              help="Output the linkage as a normalized table (linkage_<source>) instead of comma-delimited arc "
+                   "attributes.")
+def main(source: str, normalized: bool = False) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
+    :param bool normalized: indicates if the linkage is to be output as a normalized table instead of comma-delimited
+        arc attributes, default False.
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNArcLinkage(source)
+            crn = CRNArcLinkage(source, normalized)
             crn()
 
     except KeyboardInterrupt:
@@ -1,15 +1,15 @@
 import click
 import fiona
 import geopandas as gpd
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
+import pygeos
 import sys
-from copy import deepcopy
 from itertools import chain
-from operator import attrgetter, itemgetter
 from pathlib import Path
-from shapely.geometry import LineString, Point
-from shapely.ops import polygonize, unary_union
+from shapely.geometry import Point
 from tabulate import tabulate
 
 filepath = Path(__file__).resolve()
@@ -28,22 +28,26 @@ logger.addHandler(handler)
 class CRNMeshblockCreation:
     """Defines the CRN meshblock creation class."""
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, cache: bool = True, incremental: bool = False) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
+        :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+        :param bool incremental: indicates if the meshblock and meshblock validations are to be incrementally rebuilt
+            from the previous validation state, and the state written, default False.
         """
 
         self.source = source
+        self.incremental = incremental
         self.layer = f"crn_{source}"
         self.id = "segment_id"
         self.bo_id = "ngd_uid"
         self.src = Path(filepath.parents[2] / "data/crn.gpkg")
         self.src_restore = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
         self.dst = Path(filepath.parents[2] / "data/crn.gpkg")
-        self.flag_new_gpkg = False
+        self.state = Path(filepath.parents[2] / f"data/state/meshblock_{source}")
         self.errors = dict()
         self.export = {
             f"{self.source}_deadends": None,
@@ -52,12 +56,14 @@ class CRNMeshblockCreation:
         }
 
         self.meshblock_ = None
+        self._meshblock = None
         self._meshblock_input = None
+        self._affected = None
+        self._state_flags = None
         self.meshblock_progress = {k: 0 for k in ("Valid", "Invalid", "Invalid (Missing BO)", "Excluded")}
-        self._crn_roads_nodes = pd.Series(dtype=object)
-        self._crn_bos_nodes = pd.Series(dtype=object)
-        self._crn_bos_nodes_lookup = dict()
-        self._crn_bos_nodes_unintegrated = pd.Series(dtype=object)
+        self.network = None
+        self._crn_roads_nodes = np.array([], dtype=np.int64)
+        self._crn_bos_nodes_unintegrated = np.array([], dtype=np.int64)
         self._deadends = pd.Series(dtype=object)
 
         # Configure src / dst paths and layer name.
@@ -66,23 +72,16 @@ class CRNMeshblockCreation:
                 self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
         else:
             helpers.create_gpkg(self.dst)
-            self.flag_new_gpkg = True
             self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
 
-        # Load source data.
-        logger.info(f"Loading source data: {self.src}|layer={self.layer}.")
-        self.crn = gpd.read_file(self.src, layer=self.layer)
-        logger.info("Successfully loaded source data.")
+        # Load and standardize source data and snap nodes.
+        self.crn = helpers.load_standardized(self.src, layer=self.layer, snap=True, cache=cache)
 
         # Load source restoration data.
         logger.info(f"Loading source restoration data: {self.src_restore}|layer={self.layer}.")
         self.crn_restore = gpd.read_file(self.src_restore, layer=self.layer)
         logger.info("Successfully loaded source restoration data.")
 
-        # Standardize data and snap nodes.
-        self.crn = helpers.standardize(self.crn)
-        self.crn = helpers.snap_nodes(self.crn)
-
         # Enforce suggested snapping.
         if f"{self.source}_suggested_snapping" in fiona.listlayers(self.dst):
             df_snapping = gpd.read_file(self.dst, layer=f"{self.source}_suggested_snapping")
@@ -92,9 +91,8 @@ class CRNMeshblockCreation:
                 self.crn = helpers.standardize(self.crn)
                 self.crn = helpers.snap_nodes(self.crn)
 
-        # Separate crn bos and roads.
+        # Separate crn roads.
         self.crn_roads = self.crn.loc[self.crn["segment_type"] == 1].copy(deep=True)
-        self.crn_bos = self.crn.loc[self.crn["segment_type"] == 2].copy(deep=True)
 
         logger.info("Configuring validations.")
 
@@ -120,13 +118,53 @@ class CRNMeshblockCreation:
         self._write_errors()
 
         # Export required datasets.
-        if not self.flag_new_gpkg:
-            helpers.delete_layers(dst=self.dst, layers=self.export.keys())
-        for layer, df in {self.layer: self.crn, **self.export}.items():
-            if isinstance(df, pd.DataFrame):
-                helpers.export(df, dst=self.dst, name=layer)
+        helpers.export_layers({self.layer: self.crn, **self.export}, dst=self.dst)
+
+        # Write meshblock and validation state.
+        if self.incremental:
+            self._write_state()
+
+    def _compile_affected(self) -> None:
+        """
+        Compiles the arcs whose meshblock validations are to be recomputed and the previous validation flags of all
+        other arcs. For an incrementally rebuilt meshblock, these are the arcs whose validation attributes changed or
+        which are within the extent of a changed (removed or generated) face; otherwise, these are all arcs.
+        """
+
+        self._affected = np.ones(len(self.crn), dtype=bool)
+        self._state_flags = pd.DataFrame(0, index=self.crn.index, columns=["v201", "v202"])
+
+        if not self._meshblock.incremental:
+            return
+
+        # Load previous validation state.
+        try:
+
+            state = pd.read_parquet(self.state / "validations.parquet")
+            attrs = self._validation_attributes()
+            cols = {"version", *attrs.columns, *self._state_flags.columns}
+            if not cols.issubset(state.columns) or (len(state) and state["version"].iloc[0] != self._state_version()):
+                raise ValueError("Validation state is incompatible with the current validations.")
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to load validation state: \"{self.state}\". Applying full meshblock validations. "
+                           f"{e}")
+            return
 
-    def _gen_suggested_snapping(self):
+        # Flag arcs with changed validation attributes.
+        state = state.reindex(self.crn.index)
+        self._affected = ~(state[attrs.columns] == attrs).all(axis=1).values
+
+        # Flag arcs within the extent of changed faces.
+        boxes = pygeos.box(*self._meshblock.changed_bounds.T)
+        self._affected[np.unique(helpers.query_pairs(boxes, tree=self.crn)[:, 1])] = True
+
+        # Compile previous validation flags.
+        self._state_flags = state[self._state_flags.columns].fillna(0).astype(int)
+
+        logger.info(f"Applying meshblock validations to {self._affected.sum():,d} affected arcs.")
+
+    def _gen_suggested_snapping(self) -> None:
         """
         Generates reference LineString dataset containing suggested snapping from unintegrated bo nodes to closest
         crn node or edge.
@@ -134,76 +172,63 @@ class CRNMeshblockCreation:
 
         logger.info(f"Generating suggested snapping dataset for unintegrated BO nodes.")
 
-        # Suggested snapping type: nodes.
-        roads_nodes = pd.Series(tuple(set(self._crn_roads_nodes)))
-        roads_nodes_g = gpd.GeoSeries(roads_nodes.map(Point), crs=self.crn.crs)
-        roads_idx_node_lookup = dict(zip(range(len(roads_nodes)), roads_nodes))
-
-        # Develop inclusive and exclusive bo node buffers.
-        node_buffers_incl = self._crn_bos_nodes_unintegrated.map(
-            lambda node: Point(node).buffer(self.suggested_snapping_incl, resolution=5))
-        node_buffers_excl = self._crn_bos_nodes_unintegrated.map(
-            lambda node: Point(node).buffer(self.suggested_snapping_excl, resolution=5))
-
-        # Query crn nodes which intersect each bo node buffer.
-        node_intersects_incl = node_buffers_incl.map(
-            lambda buffer: set(roads_nodes_g.sindex.query(buffer, predicate="intersects")))
-        node_intersects_excl = node_buffers_excl.map(
-            lambda buffer: set(roads_nodes_g.sindex.query(buffer, predicate="intersects")))
-
-        # Filter node intersections to those with identical inclusive and exclusive results and only 1 value.
-        node_intersects = pd.Series(zip(self._crn_bos_nodes_unintegrated, node_intersects_incl, node_intersects_excl))
-        node_intersects.drop_duplicates(keep="first", inplace=True)
-        node_intersects = node_intersects.loc[node_intersects.map(
-            lambda vals: (vals[1] == vals[2]) and (len(vals[1]) == 1))].copy(deep=True)
+        bos_nodes = self.network.nodes[self._crn_bos_nodes_unintegrated]
+        bos_pts = self.network.node_points(self._crn_bos_nodes_unintegrated)
+        roads_pts = self.network.node_points(self._crn_roads_nodes)
+        dist = max(self.suggested_snapping_incl, self.suggested_snapping_excl)
 
-        # Construct suggested snapping LineStrings.
-        if len(node_intersects):
+        # Query crn nodes within the inclusive and exclusive distances of each bo node.
+        boxes = pygeos.box(*(bos_nodes - dist).T, *(bos_nodes + dist).T)
+        pairs = helpers.query_pairs(boxes, tree=roads_pts)
+        dists = pygeos.distance(bos_pts[pairs[:, 0]], roads_pts[pairs[:, 1]])
+        pairs_incl = pairs[dists <= self.suggested_snapping_incl]
+        count_incl = helpers.count_pairs(pairs_incl, n=len(bos_pts))
+        count_excl = helpers.count_pairs(pairs[dists <= self.suggested_snapping_excl], n=len(bos_pts))
 
-            snapping_lines = node_intersects.map(
-                lambda vals: LineString([Point(vals[0]), Point(roads_idx_node_lookup[tuple(vals[1])[0]])]))
+        # Suggested snapping type: nodes.
+        # Filter bo nodes to those with identical inclusive and exclusive results and only 1 value.
+        flag = (count_incl == 1) & (count_excl == 1)
+        pairs_incl = pairs_incl[flag[pairs_incl[:, 0]]]
 
-            # Export snapping LineStrings for reference.
-            self.export[f"{self.source}_suggested_snapping"] = gpd.GeoDataFrame(
-                {"snapping_type": "node", "valid": 0}, index=range(len(snapping_lines)), geometry=list(snapping_lines),
-                crs=self.crn.crs).copy(deep=True)
+        # Construct suggested snapping LineStrings.
+        snapping_lines = {"node": pygeos.linestrings(np.stack([
+            bos_nodes[pairs_incl[:, 0]], self.network.nodes[self._crn_roads_nodes[pairs_incl[:, 1]]]], axis=1))}
 
         # Suggested snapping type: edges.
-        roads_idx_geoms_lookup = dict(zip(range(len(self.crn_roads)), self.crn_roads["geometry"]))
-
-        # Develop inclusive and exclusive bo node buffers.
-        node_buffers_excl = self._crn_bos_nodes_unintegrated.map(
-            lambda node: Point(node).buffer(self.suggested_snapping_excl, resolution=5))
+        # Query crn roads within the inclusive distance of each bo node.
+        roads = self.crn_roads["geometry"].values.data
+        boxes = pygeos.box(*(bos_nodes - self.suggested_snapping_incl).T,
+                           *(bos_nodes + self.suggested_snapping_incl).T)
+        pairs = helpers.query_pairs(boxes, tree=roads)
+        pairs = pairs[pygeos.distance(bos_pts[pairs[:, 0]], roads[pairs[:, 1]]) <= self.suggested_snapping_incl]
 
-        # Query crn roads (inclusive) and crn nodes (exclusive) which intersect each bo node buffer.
-        node_intersects_incl = node_buffers_incl.map(
-            lambda buffer: set(self.crn_roads.sindex.query(buffer, predicate="intersects")))
-        node_intersects_excl = node_buffers_excl.map(
-            lambda buffer: set(roads_nodes_g.sindex.query(buffer, predicate="intersects")))
-
-        # Filter intersections to those with only 1 inclusive result and 0 exclusive results.
-        node_intersects = pd.Series(zip(self._crn_bos_nodes_unintegrated, node_intersects_incl, node_intersects_excl))
-        node_intersects.drop_duplicates(keep="first", inplace=True)
-        node_intersects = node_intersects.loc[node_intersects.map(
-            lambda vals: (len(vals[1]) == 1) and (len(vals[2]) == 0))].copy(deep=True)
+        # Filter bo nodes to those with only 1 inclusive result (crn roads) and 0 exclusive results (crn nodes).
+        flag = (helpers.count_pairs(pairs, n=len(bos_pts)) == 1) & (count_excl == 0)
+        pairs = pairs[flag[pairs[:, 0]]]
 
         # Construct suggested snapping LineStrings.
-        if len(node_intersects):
-
-            node_intersects = node_intersects.map(
-                lambda vals: (Point(vals[0]), roads_idx_geoms_lookup[tuple(vals[1])[0]]))
-            snapping_lines = node_intersects.map(
-                lambda vals: LineString([vals[0], vals[1].interpolate(vals[1].project(vals[0]))]))
+        pts, roads = bos_pts[pairs[:, 0]], roads[pairs[:, 1]]
+        snapping_lines["edge"] = pygeos.linestrings(np.stack([
+            bos_nodes[pairs[:, 0]],
+            pygeos.get_coordinates(pygeos.line_interpolate_point(roads, pygeos.line_locate_point(roads, pts)))
+        ], axis=1))
+
+        # Export snapping LineStrings for reference.
+        dfs = [gpd.GeoDataFrame({"snapping_type": snapping_type, "valid": 0}, index=range(len(lines)),
+                                geometry=gpd.GeoSeries(lines, crs=self.crn.crs))
+               for snapping_type, lines in snapping_lines.items() if len(lines)]
+        if dfs:
+            self.export[f"{self.source}_suggested_snapping"] = pd.concat(dfs).copy(deep=True)
+
+    def _state_version(self) -> str:
+        """
+        Generates the validation state version, a hash of the validation and helpers source code.
 
-            # Export snapping LineStrings for reference.
-            df = gpd.GeoDataFrame({"snapping_type": "edge", "valid": 0}, index=range(len(snapping_lines)),
-                                  geometry=list(snapping_lines), crs=self.crn.crs)
-            df_name = f"{self.source}_suggested_snapping"
+        \b
+        :return str: validation state version.
+        """
 
-            if isinstance(self.export[df_name], pd.DataFrame):
-                self.export[df_name] = pd.concat([self.export[df_name], df]).copy(deep=True)
-            else:
-                self.export[df_name] = df.copy(deep=True)
+        return hashlib.blake2b(filepath.read_bytes() + Path(helpers.__file__).read_bytes(), digest_size=16).hexdigest()
 
     def _validate(self) -> None:
         """Executes validations against the CRN dataset."""
@@ -217,13 +242,28 @@ class CRNMeshblockCreation:
                 logger.info(f"Applying validation {code}: \"{func.__name__}\".")
 
                 # Execute validation and store results.
-                self.errors[code] = deepcopy(func())
+                self.errors[code] = func()
 
         except (KeyError, SyntaxError, ValueError) as e:
             logger.exception("Unable to apply validations.")
             logger.exception(e)
             sys.exit(1)
 
+    def _validation_attributes(self) -> pd.DataFrame:
+        """
+        Compiles the arc attributes which determine the meshblock validation results of each arc, besides the meshblock.
+
+        \b
+        :return pd.DataFrame: DataFrame of validation attributes.
+        """
+
+        return pd.DataFrame({
+            "fingerprint": helpers.hash_geometries(self.crn["geometry"]),
+            "segment_type": self.crn["segment_type"].fillna(-1).values,
+            "bo_new": self.crn["bo_new"].fillna(-1).values,
+            "deadend": self.crn.index.isin(self._deadends.index).astype(np.int8)
+        }, index=self.crn.index)
+
     def _write_errors(self) -> None:
         """Write error flags returned by validations to DataFrame columns."""
 
@@ -253,6 +293,28 @@ class CRNMeshblockCreation:
                          headers=["Meshblock Input Arcs", "Count"], tablefmt="rst", colalign=("left", "right"))
         logger.info("\n" + table)
 
+    def _write_state(self) -> None:
+        """Writes the meshblock and validation state, used for incremental meshblock generation and validation."""
+
+        self._meshblock.write(self.state)
+
+        logger.info(f"Writing validation state: \"{self.state}\".")
+
+        try:
+
+            # Compile state.
+            state = self._validation_attributes()
+            state.insert(0, "version", self._state_version())
+            for col in self._state_flags.columns:
+                state[col] = state.index.isin(self.errors[int(col[1:])]).astype(np.int8)
+
+            # Write state.
+            self.state.mkdir(parents=True, exist_ok=True)
+            state.to_parquet(self.state / "validations.parquet")
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to write validation state: \"{self.state}\". {e}")
+
     def connectivity(self) -> set:
         """
         Validation: All BOs must have nodal connections to other arcs.
@@ -265,23 +327,21 @@ class CRNMeshblockCreation:
 
         errors = set()
 
-        # Extract and explode node collections to allow for individual node validation.
-        self._crn_roads_nodes = self.crn_roads["geometry"].map(
-            lambda g: itemgetter(0, -1)(attrgetter("coords")(g))).explode().copy(deep=True)
-        self._crn_bos_nodes = self.crn_bos["geometry"].map(
-            lambda g: itemgetter(0, -1)(attrgetter("coords")(g))).explode().copy(deep=True)
+        # Generate network.
+        self.network = helpers.Network(self.crn["geometry"])
+        flag_roads = self.crn["segment_type"].values == 1
+        flag_bos = self.crn["segment_type"].values == 2
 
-        # Create bo node - identifier lookup.
-        self._crn_bos_nodes_lookup = dict(pd.DataFrame({"node": self._crn_bos_nodes.values,
-                                                        self.id: self._crn_bos_nodes.index})
-                                          .groupby(by="node", axis=0, as_index=True)[self.id].agg(tuple))
+        # Compile road nodes.
+        self._crn_roads_nodes = np.unique(self.network.edge_nodes[flag_roads])
 
-        # Compile deadend nodes.
-        nodes = pd.concat([self._crn_roads_nodes, self._crn_bos_nodes])
-        self._deadends = nodes.loc[~nodes.duplicated(keep=False)].copy(deep=True)
+        # Compile deadend nodes (nodes of degree 1) and their arc identifiers.
+        edge_idxs, pos = np.nonzero(self.network.degree[self.network.edge_nodes] == 1)
+        nodes = self.network.edge_nodes[edge_idxs, pos]
+        self._deadends = pd.Series(map(tuple, self.network.nodes[nodes]), index=self.crn.index[edge_idxs], dtype=object)
 
         # Compile dead end bo nodes as unintegrated.
-        self._crn_bos_nodes_unintegrated = pd.Series(tuple(set(self._crn_bos_nodes).intersection(set(self._deadends))))
+        self._crn_bos_nodes_unintegrated = np.unique(nodes[flag_bos[edge_idxs]])
 
         # Reference dataset: suggested snapping LineStrings.
         self._gen_suggested_snapping()
@@ -298,14 +358,12 @@ class CRNMeshblockCreation:
 
         errors = set()
 
-        # Compile unintegrated BO nodes.
-        if len(self._crn_bos_nodes_unintegrated):
-
-            # Compile identifiers of arcs for resulting BO nodes.
-            vals = set(chain.from_iterable(self._crn_bos_nodes_unintegrated.map(self._crn_bos_nodes_lookup).values))
+        # Flag BOs with an unintegrated (dead end) node.
+        flag = (self.crn["segment_type"].values == 2) & self.network.deadend_edges()
+        if flag.any():
 
             # Compile error logs.
-            errors.update(vals)
+            errors.update(set(self.crn.index[flag]))
 
         return errors
 
@@ -358,11 +416,14 @@ class CRNMeshblockCreation:
         self._meshblock_input = self.crn.loc[~self.crn.index.isin(self._deadends.index)].copy(deep=True)
 
         # Generate meshblock.
-        self.meshblock_ = gpd.GeoDataFrame(
-            geometry=list(polygonize(unary_union(self._meshblock_input["geometry"].to_list()))),
-            crs=self._meshblock_input.crs)
+        self._meshblock = helpers.Meshblock(self._meshblock_input["geometry"],
+                                            state=self.state if self.incremental else None)
+        self.meshblock_ = gpd.GeoDataFrame(geometry=gpd.GeoSeries(self._meshblock.faces, crs=self._meshblock_input.crs))
         self.export[f"{self.source}_meshblock"] = self.meshblock_.copy(deep=True)
 
+        # Compile arcs affected by meshblock changes.
+        self._compile_affected()
+
         return errors
 
     def meshblock_representation_deadend(self) -> set:
@@ -375,19 +436,23 @@ class CRNMeshblockCreation:
 
         errors = set()
 
-        # Query meshblock polygons which contain each deadend arc.
-        within = self.crn.loc[self.crn.index.isin(self._deadends.index), "geometry"]\
-            .map(lambda g: set(self.meshblock_.sindex.query(g, predicate="within")))
+        # Compile deadend arcs and their previous validation flags.
+        deadends = self.crn.index.isin(self._deadends.index)
+        flag = deadends & (self._state_flags["v201"].values == 1)
+
+        # Query meshblock polygons which contain each affected deadend arc.
+        idxs = np.flatnonzero(deadends & self._affected)
+        within = helpers.query_pairs(self.crn["geometry"].values.data[idxs], tree=self.meshblock_, predicate="within")
 
         # Flag arcs which are not completely within one polygon.
-        flag = within.map(len) != 1
+        flag[idxs] = helpers.count_pairs(within, n=len(idxs)) != 1
 
         # Compile error logs.
-        if sum(flag):
-            errors.update(set(within.loc[flag].index))
+        if flag.any():
+            errors.update(set(self.crn.index[flag]))
 
             # Update invalid count for progress tracker.
-            self.meshblock_progress["Invalid"] += sum(flag)
+            self.meshblock_progress["Invalid"] += int(flag.sum())
 
         return errors
 
@@ -404,37 +469,50 @@ class CRNMeshblockCreation:
         # Extract boundary LineStrings from meshblock Polygons.
         meshblock_boundaries = self.meshblock_.boundary
 
-        # Query meshblock polygons which cover each arc.
-        covered_by = self.crn_bos.loc[self.crn_bos["bo_new"] != 1, "geometry"].map(
-            lambda g: set(meshblock_boundaries.sindex.query(g, predicate="covered_by")))
+        # Compile bos and their previous validation flags.
+        bos = (self.crn["segment_type"].values == 2) & (self.crn["bo_new"].values != 1)
+        flag = bos & (self._state_flags["v202"].values == 1)
+
+        # Query meshblock polygons which cover each affected bo.
+        idxs = np.flatnonzero(bos & self._affected)
+        covered_by = helpers.query_pairs(self.crn["geometry"].values.data[idxs], tree=meshblock_boundaries,
+                                         predicate="covered_by")
 
         # Flag arcs which do not form a polygon.
-        flag = covered_by.map(len) == 0
+        flag[idxs] = helpers.count_pairs(covered_by, n=len(idxs)) == 0
 
         # Compile error logs.
-        if sum(flag):
-            errors.update(set(covered_by.loc[flag].index))
+        if flag.any():
+            errors.update(set(self.crn.index[flag]))
 
             # Update invalid count for progress tracker.
-            self.meshblock_progress["Invalid"] += sum(flag)
+            self.meshblock_progress["Invalid"] += int(flag.sum())
 
         return errors
 
 
 @click.command()
 @click.argument("source", type=click.Choice(helpers.load_yaml("../config.yaml")["sources"], False))
-def main(source: str) -> None:
+@click.option("--cache/--no-cache", default=True, show_default=True,
+              help="Use the cache of standardized source data.")
+@click.option("--incremental", "-i", is_flag=True, default=False, show_default=True,
+              help="Rebuild only the meshblock faces affected by changes since the previous incremental validation and "
+                   "write the meshblock and validation state.")
+def main(source: str, cache: bool = True, incremental: bool = False) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
+    :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+    :param bool incremental: indicates if the meshblock and meshblock validations are to be incrementally rebuilt
+        from the previous validation state, and the state written, default False.
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNMeshblockCreation(source)
+            crn = CRNMeshblockCreation(source, cache, incremental)
             crn()
 
     except KeyboardInterrupt:
@@ -27,13 +27,14 @@ logger.addHandler(handler)
 class CRNRestoreGeometry:
     """Defines the CRN geometry restoration class."""
 
-    def __init__(self, source: str, distance: int = 2) -> None:
+    def __init__(self, source: str, distance: int = 2, cache: bool = True) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
         :param int distance: the radius of the buffer, default = 2.
+        :param bool cache: indicates if the cache of standardized source data is to be used, default True.
         """
 
         self.source = source
@@ -60,13 +61,8 @@ class CRNRestoreGeometry:
         if not self.dst.exists():
             helpers.create_gpkg(self.dst)
 
-        # Load source data.
-        logger.info(f"Loading source data: {self.src}|layer={self.layer}.")
-        self.crn = gpd.read_file(self.src, layer=self.layer)
-        logger.info("Successfully loaded source data.")
-
-        # Standardize data.
-        self.crn = helpers.standardize(self.crn)
+        # Load and standardize source data.
+        self.crn = helpers.load_standardized(self.src, layer=self.layer, cache=cache)
 
         # Load source restoration data.
         logger.info(f"Loading source restoration data: {self.src_restore}|layer={self.layer}.")
@@ -137,19 +133,22 @@ class CRNRestoreGeometry:
 @click.argument("source", type=click.Choice(helpers.load_yaml("config.yaml")["sources"], False))
 @click.option("--distance", "-d", type=click.IntRange(min=1), default=2, show_default=True,
               help="The radius of the buffer.")
-def main(source: str, distance: int = 2) -> None:
+@click.option("--cache/--no-cache", default=True, show_default=True,
+              help="Use the cache of standardized source data.")
+def main(source: str, distance: int = 2, cache: bool = True) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
     :param int distance: the radius of the buffer, default = 2.
+    :param bool cache: indicates if the cache of standardized source data is to be used, default True.
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNRestoreGeometry(source, distance)
+            crn = CRNRestoreGeometry(source, distance, cache)
             crn()
 
     except KeyboardInterrupt:
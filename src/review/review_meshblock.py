@@ -2,8 +2,9 @@ import click
 import fiona
 import geopandas as gpd
 import logging
+import pandas as pd
+import pygeos
 import sys
-from operator import itemgetter
 from pathlib import Path
 from tabulate import tabulate
 
@@ -71,51 +72,74 @@ class CRNMeshblockReview:
         self.compare_neighbours()
         self.output_results()
 
-    def compare_neighbours(self) -> None:
+    def _adjacency(self, df: gpd.GeoDataFrame, noded: bool = True) -> pd.DataFrame:
         """
-        Compiles and identifies any difference in the set of neighbouring bb identifiers for each linked bb between the
-        CRN and NGD meshblock networks.
+        Compiles the pairs of neighbouring identifiers of a meshblock. For a noded meshblock, neighbours are compiled
+        from the boundary vertices shared between polygons, which is equivalent to touching polygons. Otherwise,
+        neighbours are compiled from touching polygons, since a polygon vertex may lie on the edge of a neighbouring
+        polygon without being shared (T-junction).
+
+        \b
+        :param gpd.GeoDataFrame df: meshblock GeoDataFrame.
+        :param bool noded: indicates if the meshblock is noded (neighbouring polygons share all boundary vertices),
+            default True.
+        :return pd.DataFrame: DataFrame of unique (identifier, neighbouring identifier) pairs.
         """
 
-        logger.info("Performing neighbour comparison.")
+        # Compile pairs of identifiers sharing a vertex.
+        if noded:
 
-        # Dissolve crn meshblock based on identifer.
-        meshblock = self.meshblock.dissolve(by=self.id, as_index=False)
+            # Compile the identifier of each unique boundary vertex.
+            coords, idxs = pygeos.get_coordinates(df["geometry"].values.data, return_index=True)
+            vertices = pd.DataFrame({"vertex": pd.factorize(coords[:, 0] + 1j * coords[:, 1])[0],
+                                     self.id: df[self.id].values[idxs]}).drop_duplicates()
 
-        # Create neighbour index-identifier lookup dicts.
-        meshblock_idx_id_lookup = dict(zip(range(len(meshblock)), meshblock[self.id]))
-        meshblock_ngd_idx_id_lookup = dict(zip(range(len(self.meshblock_ngd)), self.meshblock_ngd[self.id]))
+            pairs = vertices.merge(vertices.rename(columns={self.id: "nbr"}), on="vertex", how="inner")
 
-        # Compile neighbouring identifiers as sets.
-        meshblock["nbrs"] = meshblock["geometry"]\
-            .map(lambda g: meshblock.sindex.query(g, predicate="touches"))\
-            .map(lambda idxs: itemgetter(*idxs)(meshblock_idx_id_lookup))\
-            .map(lambda ids: (ids,) if not isinstance(ids, tuple) else ids).map(set)
-        self.meshblock_ngd["nbrs"] = self.meshblock_ngd["geometry"]\
-            .map(lambda g: self.meshblock_ngd.sindex.query(g, predicate="touches"))\
-            .map(lambda idxs: itemgetter(*idxs)(meshblock_ngd_idx_id_lookup))\
-            .map(lambda ids: (ids,) if not isinstance(ids, tuple) else ids).map(set)
+        # Compile pairs of identifiers of touching polygons.
+        else:
+            idxs = helpers.query_pairs(df["geometry"], tree=df, predicate="touches")
+            pairs = pd.DataFrame({self.id: df[self.id].values[idxs[:, 0]], "nbr": df[self.id].values[idxs[:, 1]]})
 
-        # Create ngd identifier-neighbours lookup dict.
-        meshblock_ngd_id_nbrs_lookup = dict(zip(self.meshblock_ngd[self.id], self.meshblock_ngd["nbrs"]))
+        pairs = pairs.loc[pairs[self.id] != pairs["nbr"], [self.id, "nbr"]].drop_duplicates()
 
-        # Compile ngd neighbours for each crn bb.
-        meshblock["nbrs_ngd"] = meshblock[self.id].map(lambda val: itemgetter(val)(meshblock_ngd_id_nbrs_lookup))
+        return pairs.reset_index(drop=True)
+
+    def compare_neighbours(self) -> None:
+        """
+        Compiles and identifies any difference in the set of neighbouring bb identifiers for each linked bb between the
+        CRN and NGD meshblock networks.
+        """
+
+        logger.info("Performing neighbour comparison.")
+
+        # Compile neighbouring identifiers of the crn and ngd meshblocks.
+        # Note: crn polygons are grouped by identifier, equivalent to a dissolve. The crn meshblock is polygonized from
+        #       noded arcs, whereas the ngd meshblock is not guaranteed to be noded.
+        pairs = self._adjacency(self.meshblock)
+        pairs_ngd = self._adjacency(self.meshblock_ngd, noded=False)
+        pairs_ngd = pairs_ngd.loc[pairs_ngd[self.id].isin(self.meshblock[self.id])]
+
+        # Compile extra (crn-only) and missing (ngd-only) neighbouring identifiers.
+        pairs = pairs.merge(pairs_ngd, on=[self.id, "nbr"], how="outer", indicator=True)\
+            .sort_values(by=[self.id, "nbr"])
+        nbrs = dict()
+        for col, side in (("extra", "left_only"), ("missing", "right_only")):
+            vals = pairs.loc[pairs["_merge"] == side]
+            nbrs[col] = vals["nbr"].astype(str).groupby(vals[self.id]).agg(",".join)
+
+        # Dissolve crn meshblock based on identifer, for bbs with different neighbours than their linked ngd bbs.
+        ids = nbrs["extra"].index.union(nbrs["missing"].index)
+        meshblock = self.meshblock.loc[self.meshblock[self.id].isin(ids)].dissolve(by=self.id, as_index=False)
 
         # Flag crn bbs with different neighbours than their linked ngd bbs.
-        self.meshblock_invalid = meshblock.loc[meshblock["nbrs"] != meshblock["nbrs_ngd"]].copy(deep=True)
+        self.meshblock_invalid = meshblock.assign(**{col: meshblock[self.id].map(vals) for col, vals in nbrs.items()})
 
     def output_results(self) -> None:
         """Outputs results."""
 
         logger.info(f"Outputting results.")
 
-        # Compile export attributes (extra and missing values).
-        self.meshblock_invalid["extra"] = (self.meshblock_invalid["nbrs"] - self.meshblock_invalid["nbrs_ngd"])\
-            .map(lambda vals: ",".join(map(str, vals)) if len(vals) else None)
-        self.meshblock_invalid["missing"] = (self.meshblock_invalid["nbrs_ngd"] - self.meshblock_invalid["nbrs"])\
-            .map(lambda vals: ",".join(map(str, vals)) if len(vals) else None)
-
         # Filter attributes.
         self.meshblock_invalid = self.meshblock_invalid[[self.id, "extra", "missing", "geometry"]].copy(deep=True)
 
@@ -2,6 +2,7 @@ import click
 import fiona
 import geopandas as gpd
 import logging
+import numpy as np
 import pandas as pd
 import sys
 from collections import Counter
@@ -26,12 +27,13 @@ logger.addHandler(handler)
 class CRNCrossings:
     """Defines the CRN crossings class."""
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, cache: bool = True) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
+        :param bool cache: indicates if the cache of standardized source data is to be used, default True.
         """
 
         self.source = source
@@ -54,13 +56,8 @@ class CRNCrossings:
         if not self.dst.exists():
             helpers.create_gpkg(self.dst)
 
-        # Load source data.
-        logger.info(f"Loading source data: {self.src}|layer={self.layer}.")
-        self.crn = gpd.read_file(self.src, layer=self.layer)
-        logger.info("Successfully loaded source data.")
-
-        # Standardize data and filter to roads.
-        self.crn = helpers.standardize(self.crn)
+        # Load and standardize source data and filter to roads.
+        self.crn = helpers.load_standardized(self.src, layer=self.layer, cache=cache)
         self.crn_roads = self.crn.loc[self.crn["segment_type"] == 1].copy(deep=True)
 
         # Load existing crossings data, if possible.
@@ -134,34 +131,33 @@ class CRNCrossings:
 
         logger.info("Compiling crossing points.")
 
-        # Extract duplicated nodes.
-        nodes = self.crn_roads["geometry"].map(lambda g: itemgetter(0, -1)(attrgetter("coords")(g))).explode()
-        nodes = nodes.loc[nodes.duplicated(keep=False)].copy(deep=True)
-
-        # Compile counts, filter to threshold.
-        counts = Counter(nodes)
-        counts_df = pd.DataFrame({"count": counts.values(), "geometry": counts.keys()})
-        counts_df = counts_df.loc[counts_df["count"] >= self.min_count].copy(deep=True)
+        # Generate network and compile node degrees (counts), filter to threshold.
+        network = helpers.Network(self.crn_roads["geometry"])
+        nodes = np.flatnonzero(network.degree >= self.min_count)
 
         # Compile crossings as GeoDataFrame.
-        self.crossings = gpd.GeoDataFrame(counts_df, geometry=list(map(Point, counts_df["geometry"])), crs=self.crn.crs)
+        self.crossings = gpd.GeoDataFrame({"count": network.degree[nodes]},
+                                          geometry=gpd.GeoSeries(network.node_points(nodes), crs=self.crn.crs))
         self.crossings["overpass_flag"] = -1
 
 
 @click.command()
 @click.argument("source", type=click.Choice(helpers.load_yaml("../config.yaml")["sources"], False))
-def main(source: str) -> None:
+@click.option("--cache/--no-cache", default=True, show_default=True,
+              help="Use the cache of standardized source data.")
+def main(source: str, cache: bool = True) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
+    :param bool cache: indicates if the cache of standardized source data is to be used, default True.
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNCrossings(source)
+            crn = CRNCrossings(source, cache)
             crn()
 
     except KeyboardInterrupt:
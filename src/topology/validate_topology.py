@@ -1,16 +1,20 @@
 import click
 import fiona
 import geopandas as gpd
+import hashlib
 import logging
-import math
+import multiprocessing as mp
+import numpy as np
 import pandas as pd
+import pygeos
 import sys
-from copy import deepcopy
-from itertools import chain, compress, tee
-from operator import attrgetter, itemgetter
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, repeat
+from multiprocessing import shared_memory
 from pathlib import Path
-from shapely.geometry import MultiPoint, Point
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
 
 filepath = Path(__file__).resolve()
 sys.path.insert(1, str(Path(__file__).resolve().parents[1]))
@@ -25,71 +29,298 @@ handler.setLevel(logging.INFO)
 handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s: %(message)s", "%Y-%m-%d %H:%M:%S"))
 logger.addHandler(handler)
 
+# Validation worker process class instance.
+_crn = None
 
-def ordered_pairs(coords: Tuple[tuple, ...]) -> List[Tuple[tuple, tuple]]:
+
+def _init_worker(arrays: Dict[str, Tuple[str, tuple, str]], crs: str, source: str) -> None:
+    """
+    Initializes a validation worker process with a CRN class instance. Forked processes inherit the instance of the
+    parent process as-is; otherwise, the instance is reconstructed from CRN data read from shared memory, such that
+    each spawned process holds its own copy of the data.
+
+    \b
+    :param Dict[str, Tuple[str, tuple, str]] arrays: name, shape, and dtype of each shared memory array (coordinates,
+        coordinate geometry indexes, and identifiers), empty for forked processes.
+    :param str crs: CRS WKT.
+    :param str source: code for the source region (working area).
+    """
+
+    global _crn
+
+    if _crn is None:
+
+        blocks = {k: shared_memory.SharedMemory(name=name) for k, (name, _, _) in arrays.items()}
+
+        try:
+
+            # Attach shared memory arrays.
+            coords, idxs, ids = (np.ndarray(shape, dtype=dtype, buffer=blocks[k].buf)
+                                 for k, (_, shape, dtype) in arrays.items())
+
+            # Reconstruct CRN data and class instance.
+            crn = gpd.GeoDataFrame({"segment_id": ids.astype(str)},
+                                   geometry=gpd.GeoSeries(pygeos.linestrings(coords, indices=idxs), crs=crs))
+            crn.index = crn["segment_id"]
+            _crn = CRNTopologyValidation.from_arcs(source, crn=crn)
+
+        finally:
+            for block in blocks.values():
+                block.close()
+
+
+def _validate_arcs(source: str, crn: gpd.GeoDataFrame, ids: pd.Index,
+                   workers: int = 1) -> Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]:
     """
-    Creates an ordered sequence of adjacent coordinate pairs, sorted.
+    Executes all validations against a set of arcs, returning only the results for a subset of the arcs.
 
     \b
-    :param Tuple[tuple, ...] coords: tuple of coordinate tuples.
-    :return List[Tuple[tuple, tuple]]: ordered sequence of coordinate pair tuples.
+    :param str source: code for the source region (working area).
+    :param gpd.GeoDataFrame crn: standardized arcs, indexed by identifier.
+    :param pd.Index ids: identifiers of the arcs for which results are returned.
+    :param int workers: number of worker processes used to execute validations, default 1.
+    :return Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]: validation errors and populated export datasets.
     """
 
-    coords_1, coords_2 = tee(coords)
-    next(coords_2, None)
+    # Validate arcs.
+    validation = CRNTopologyValidation.from_arcs(source, crn=crn, workers=workers)
+    validation._validate()
 
-    return sorted(zip(coords_1, coords_2))
+    # Filter results to the subset arcs.
+    ids = set(ids)
+    errors = {code: vals.intersection(ids) for code, vals in validation.errors.items()}
+    export = {name: df.loc[df[validation.id].isin(ids)] for name, df in validation.export.items() if df is not None}
+
+    return errors, export
+
+
+def _validate_tile(src: Path, layers: List[str], source: str, ids: pd.Index, bounds: np.ndarray, halo: float,
+                   crs: str) -> Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]:
+    """
+    Executes all validations against a single tile, streamed from the source GeoPackage. The tile arcs are validated
+    within the context of all arcs within the validation halo distance of the tile extent.
+
+    \b
+    :param Path src: source GeoPackage path, containing standardized arcs.
+    :param List[str] layers: source layer names.
+    :param str source: code for the source region (working area).
+    :param pd.Index ids: identifiers of the arcs within the tile.
+    :param np.ndarray bounds: tile extent (minx, miny, maxx, maxy).
+    :param float halo: validation halo distance.
+    :param str crs: CRS WKT.
+    :return Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]: validation errors and populated export datasets.
+    """
+
+    # Load tile and halo arcs.
+    extent = gpd.GeoSeries(pygeos.box(*bounds[:, None]), crs=crs)
+    crn = pd.concat([helpers.load_extent(src, layer=layer, extent=extent, margin=halo, columns=["segment_id"])
+                     for layer in layers])
+    crn.index = crn["segment_id"]
+
+    return _validate_arcs(source, crn=crn, ids=ids)
+
+
+def _validate_worker(code: int) -> Tuple[set, Dict[str, gpd.GeoDataFrame]]:
+    """
+    Executes a single validation within a worker process.
+
+    \b
+    :param int code: validation code.
+    :return Tuple[set, Dict[str, gpd.GeoDataFrame]]: validation errors and export datasets populated by the
+        validation.
+    """
+
+    # Reset export datasets populated by previous validations of the worker process.
+    _crn.export = dict.fromkeys(_crn.export)
+
+    errors = _crn.validations[code]()
+
+    return errors, {k: v for k, v in _crn.export.items() if v is not None}
 
 
 class CRNTopologyValidation:
     """Defines the CRN topology validation class."""
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, cache: bool = True, workers: int = 1, incremental: bool = False,
+                 tile_size: Union[float, None] = None) -> None:
         """
         Initializes the CRN class.
 
         \b
         :param str source: code for the source region (working area).
+        :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+        :param int workers: number of worker processes used to execute validations, default 1.
+        :param bool incremental: indicates if only arcs affected by changes since the previous incremental validation
+            are to be validated, and the validation state written, default False.
+        :param Union[float, None] tile_size: tile width and height (meters) for tiled validation, default None (no
+            tiling).
         """
 
         self.source = source
+        self.workers = workers
+        self.incremental = incremental
+        self.tile_size = tile_size
         self.layer = f"crn_{source}"
-        self.id = "segment_id"
-        self.src = Path(filepath.parents[2] / "data/crn.gpkg")
+        self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
         self.dst = Path(filepath.parents[2] / "data/crn.gpkg")
-        self.flag_new_gpkg = False
-        self.errors = dict()
-        self.export = {
-            f"{self.source}_cluster_tolerance": None
-        }
+        self.state = Path(filepath.parents[2] / f"data/state/topology_{source}.parquet")
+        self.arcs = None
 
-        # Configure src / dst paths and layer name.
-        if self.dst.exists():
-            if self.layer not in set(fiona.listlayers(self.dst)):
-                self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
-        else:
+        # Configure src / dst paths and layer names.
+        # Note: province-wide sources without a province-wide layer are compiled from all sub-region layers, preferring
+        #       the (edited) sub-region layers of the destination.
+        if not self.dst.exists():
             helpers.create_gpkg(self.dst)
-            self.flag_new_gpkg = True
-            self.src = Path(helpers.load_yaml("../config.yaml")["filepaths"]["crn"])
 
-        # Load source data.
-        logger.info(f"Loading source data: {self.src}|layer={self.layer}.")
-        self.crn = gpd.read_file(self.src, layer=self.layer)
-        logger.info("Successfully loaded source data.")
+        layers = [self.layer]
+        for src in (self.dst, self.src):
+            src_layers = fiona.listlayers(src)
+            if self.layer in src_layers:
+                self.src = src
+                break
+            if self.source in helpers.load_yaml("../config.yaml")["ngd_prov_codes"]:
+                sub_layers = sorted(layer for layer in src_layers if layer.startswith(f"{self.layer}_"))
+                if len(sub_layers):
+                    self.src, layers = src, sub_layers
+                    logger.info(f"Compiling source layer \"{self.layer}\" from sub-region layers: "
+                                f"{', '.join(layers)}.")
+                    break
+
+        # Load and standardize source data.
+        # Note: for tiled validation, each standardized layer is exported and released, retaining only the
+        #       fingerprint and extent of each arc, such that tiles can be streamed from the exported layers.
+        dfs = list()
+        ids = set()
+        for layer in layers:
+            df = helpers.load_standardized(self.src, layer=layer, cache=cache)
+            self.crs = df.crs
+
+            # Resolve identifiers duplicated across sub-region layers.
+            flag = df.index.isin(ids)
+            if flag.any():
+                df.loc[flag, "segment_id"] = [uuid.uuid4().hex for _ in range(flag.sum())]
+                df.index = df["segment_id"]
+
+                logger.warning(f"Resolved {flag.sum()} identifiers for \"segment_id\" of layer \"{layer}\" "
+                               f"duplicated within other sub-region layers.")
+
+            ids.update(df.index)
+
+            if self.tile_size:
+                helpers.export_layers({layer: df}, dst=self.dst)
+                df = self._compile_arcs(df)
+
+            dfs.append(df)
+
+        self.layers = dict(zip(layers, (df.index for df in dfs)))
 
-        # Standardize data.
-        self.crn = helpers.standardize(self.crn)
+        logger.info("Configuring validations.")
 
-        # Create dataframe copy to hold interim attribution.
-        self.crn_ = self.crn.copy(deep=True)
+        # Configure validations.
+        self._configure()
+
+        # Compile identifiers and geometries for validations.
+        if self.tile_size:
+            self.arcs = pd.concat(dfs)
+            self.crn = self.crn_ = None
+        else:
+            self.crn = pd.concat(dfs)
+            self.crn_ = self.crn[[self.id, "geometry"]]
 
         # Generate reusable geometry variables.
-        self._gen_reusable_variables()
+        # Note: for incremental and tiled validation, these are generated for each validated subset only.
+        if not (self.incremental or self.tile_size):
+            self._gen_reusable_variables()
 
-        logger.info("Configuring validations.")
+    @classmethod
+    def from_arcs(cls, source: str, crn: gpd.GeoDataFrame, workers: int = 1) -> "CRNTopologyValidation":
+        """
+        Initializes a lightweight CRN class instance from standardized arcs, without loading or configuring any source
+        or destination data. Used to validate a subset of arcs, such as a tile or within a worker process.
+
+        \b
+        :param str source: code for the source region (working area).
+        :param gpd.GeoDataFrame crn: standardized arcs (identifiers and geometries), indexed by identifier.
+        :param int workers: number of worker processes used to execute validations, default 1.
+        :return CRNTopologyValidation: CRN class instance.
+        """
+
+        validation = cls.__new__(cls)
+        validation.source = source
+        validation.workers = workers
+        validation.incremental = False
+        validation.tile_size = None
+        validation.crn = validation.crn_ = crn
+        validation.crs = crn.crs
+        validation.arcs = None
+
+        validation._configure()
+        validation._gen_reusable_variables()
+
+        return validation
+
+    def __call__(self) -> None:
+        """Executes the CRN class."""
+
+        if self.incremental:
+            self._validate_incremental()
+        else:
+            self._validate()
+        self._write_errors()
+
+        # Export required datasets.
+        # Note: for tiled validation, the source layers are exported when loaded.
+        layers = dict()
+        if self.crn is not None:
+            layers = {layer: self.crn.loc[ids] for layer, ids in self.layers.items()}
+        helpers.export_layers({**layers, **self.export}, dst=self.dst)
+
+        # Write validation state.
+        if self.incremental:
+            self._write_state()
+
+    @staticmethod
+    def _compile_arcs(crn: gpd.GeoDataFrame) -> pd.DataFrame:
+        """
+        Compiles the fingerprint and extent of each arc.
+
+        \b
+        :param gpd.GeoDataFrame crn: arcs, indexed by identifier.
+        :return pd.DataFrame: DataFrame of the fingerprint and extent (minx, miny, maxx, maxy) of each arc, indexed by
+            identifier.
+        """
+
+        arcs = pd.DataFrame({"fingerprint": helpers.hash_geometries(crn["geometry"])}, index=crn.index)
+        arcs[["minx", "miny", "maxx", "maxy"]] = pygeos.bounds(crn["geometry"].values.data)
+
+        return arcs
+
+    def _compile_state(self) -> pd.DataFrame:
+        """
+        Compiles the validation state of each arc, excluding validation flags: a fingerprint and extent.
+
+        \b
+        :return pd.DataFrame: DataFrame of the validation state of each arc, indexed by identifier.
+        """
+
+        state = (self.arcs if self.arcs is not None else self._compile_arcs(self.crn_)).copy(deep=True)
+        state.insert(0, "version", self._state_version())
+
+        return state
+
+    def _configure(self) -> None:
+        """Configures the validations, validation thresholds, and export datasets."""
+
+        self.id = "segment_id"
+        self.errors = dict()
+        self.export = {
+            f"{self.source}_cluster_tolerance": None,
+            f"{self.source}_min_distance": None
+        }
 
         # Define validation.
-        # Note: List validations in order if execution order matters.
+        # Note: List validations in order if execution order matters. Parallel execution (workers > 1) requires
+        #       validations to be independent; results are still compiled in the listed order.
         self.validations = {
             303: self.connectivity_segmentation,
             101: self.construction_simple,
@@ -104,35 +335,102 @@ class CRNTopologyValidation:
         self._min_dist = 5
         self._min_cluster_dist = 0.01
 
-    def __call__(self) -> None:
-        """Executes the CRN class."""
+    @contextmanager
+    def _executor(self, max_workers: int) -> Iterator[ProcessPoolExecutor]:
+        """
+        Creates a process pool of validation workers. Forked worker processes inherit the class instance
+        (copy-on-write); otherwise, the coordinates, coordinate geometry indexes, and identifiers are passed to spawned
+        worker processes via shared memory, from which each worker reconstructs its own copy of the CRN data.
 
-        self._validate()
-        self._write_errors()
+        \b
+        :param int max_workers: maximum number of worker processes.
+        :return Iterator[ProcessPoolExecutor]: process pool executor.
+        """
 
-        # Export required datasets.
-        if not self.flag_new_gpkg:
-            helpers.delete_layers(dst=self.dst, layers=self.export.keys())
-        for layer, df in {self.layer: self.crn, **self.export}.items():
-            if isinstance(df, pd.DataFrame):
-                helpers.export(df, dst=self.dst, name=layer)
+        global _crn
+
+        blocks = dict()
+        arrays = dict()
+
+        try:
+
+            # Configure process start method.
+            if "fork" in mp.get_all_start_methods():
+                context = mp.get_context("fork")
+                _crn = self
+
+            else:
+                context = mp.get_context("spawn")
+
+                # Compile arrays to be shared.
+                coords, idxs = pygeos.get_coordinates(self.crn_["geometry"].values.data, return_index=True)
+                ids = self.crn_.index.values.astype(bytes)
+
+                # Copy arrays to shared memory.
+                for k, vals in {"coords": coords, "idxs": idxs, "ids": ids}.items():
+                    blocks[k] = shared_memory.SharedMemory(create=True, size=max(vals.nbytes, 1))
+                    np.ndarray(vals.shape, dtype=vals.dtype, buffer=blocks[k].buf)[:] = vals
+                    arrays[k] = (blocks[k].name, vals.shape, vals.dtype.str)
+
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(arrays, self.crn_.crs.to_wkt(), self.source)) as executor:
+                yield executor
+
+        finally:
+            _crn = None
+            for block in blocks.values():
+                block.close()
+                block.unlink()
 
     def _gen_reusable_variables(self) -> None:
         """Generates computationally intensive, reusable geometry attributes."""
 
         logger.info("Generating reusable geometry attributes.")
 
-        # Generate computationally intensive geometry attributes as new columns.
-        self.crn_["pts_tuple"] = self.crn_["geometry"].map(attrgetter("coords")).map(tuple)
-        self.crn_["pt_start"] = self.crn_["pts_tuple"].map(itemgetter(0))
-        self.crn_["pt_end"] = self.crn_["pts_tuple"].map(itemgetter(-1))
-        self.crn_["pts_ordered_pairs"] = self.crn_["pts_tuple"].map(ordered_pairs)
+        # Generate network.
+        self.network = helpers.Network(self.crn_["geometry"])
+
+    def _merge_tiles(self, results: Iterator[Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]],
+                     total: int) -> Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]:
+        """
+        Merges the validation errors and export datasets of each tile.
+
+        \b
+        :param Iterator[Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]] results: validation errors and populated
+            export datasets of each tile.
+        :param int total: number of tiles.
+        :return Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]: merged validation errors and populated export
+            datasets.
+        """
+
+        errors = {code: set() for code in self.validations}
+        exports = {name: list() for name in self.export}
+
+        # Iterate tile results.
+        for index, (tile_errors, tile_export) in enumerate(results, start=1):
+
+            for code, vals in tile_errors.items():
+                errors[code].update(vals)
+            for name, df in tile_export.items():
+                if len(df):
+                    exports[name].append(df)
+
+            logger.info(f"Applied validations to tile {index:,d} of {total:,d}.")
+
+        # Compile export datasets.
+        export = {name: pd.concat(dfs, ignore_index=True).copy(deep=True) for name, dfs in exports.items() if dfs}
 
-        # Generate computationally intensive lookups.
-        pts = self.crn_["pts_tuple"].explode()
-        pts_df = pd.DataFrame({"pt": pts.values, self.id: pts.index})
-        self.pts_id_lookup = pts_df.groupby(by="pt", axis=0, as_index=True)[self.id].agg(set).to_dict()
-        self.idx_id_lookup = dict(zip(range(len(self.crn_)), self.crn_.index))
+        return errors, export
+
+    def _state_version(self) -> str:
+        """
+        Generates the validation state version, a hash of the validation and helpers source code.
+
+        \b
+        :return str: validation state version.
+        """
+
+        return hashlib.blake2b(filepath.read_bytes() + Path(helpers.__file__).read_bytes(), digest_size=16).hexdigest()
 
     def _validate(self) -> None:
         """Executes validations against the CRN dataset."""
@@ -141,20 +439,183 @@ class CRNTopologyValidation:
 
         try:
 
+            # Execute validations per tile.
+            if self.tile_size:
+                self.errors, export = self._validate_tiled(self.arcs.index)
+                self.export.update(export)
+                return
+
+            # Execute validations in parallel.
+            if self.workers > 1:
+                self._validate_parallel()
+                return
+
             # Iterate validations.
             for code, func in self.validations.items():
                 logger.info(f"Applying validation {code}: \"{func.__name__}\".")
 
                 # Execute validation and store results.
-                self.errors[code] = deepcopy(func())
+                self.errors[code] = func()
 
         except (KeyError, SyntaxError, ValueError) as e:
             logger.exception(f"Unable to apply validations.")
             logger.exception(e)
             sys.exit(1)
 
+    def _validate_incremental(self) -> None:
+        """
+        Executes validations against only the arcs affected by changes (inserted, deleted, or modified arcs) since the
+        previous validation, merging the results with the previous validation state for all unaffected arcs.
+        Affected arcs are those within the validation halo distance of the current or previous extent of a changed arc.
+        """
+
+        logger.info("Applying validations incrementally.")
+
+        # Load previous validation state.
+        try:
+
+            state = pd.read_parquet(self.state)
+            cols = {"version", "fingerprint", "minx", "miny", "maxx", "maxy",
+                    *(f"v{code}" for code in self.validations)}
+            if not cols.issubset(state.columns) or (len(state) and state["version"].iloc[0] != self._state_version()):
+                raise ValueError("Validation state is incompatible with the current validations.")
+
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to load validation state: \"{self.state}\". Applying full validation. {e}")
+            if not self.tile_size:
+                self._gen_reusable_variables()
+            self._validate()
+            return
+
+        # Compile the fingerprint and extent of each arc.
+        if self.arcs is None:
+            self.arcs = self._compile_arcs(self.crn_)
+        cols_bounds = ["minx", "miny", "maxx", "maxy"]
+
+        # Detect inserted, deleted, and modified arcs.
+        fingerprints = self.arcs["fingerprint"]
+        common = fingerprints.index.intersection(state.index)
+        modified = common[fingerprints.loc[common].values != state.loc[common, "fingerprint"].values]
+        inserted = fingerprints.index.difference(state.index)
+        deleted = state.index.difference(fingerprints.index)
+
+        logger.info(f"Detected {len(inserted):,d} inserted, {len(deleted):,d} deleted, and {len(modified):,d} "
+                    f"modified arcs since the previous validation.")
+
+        # Compile affected arcs (arcs within the halo distance of the current or previous extent of changed arcs).
+        bounds = np.concatenate([self.arcs.loc[inserted.union(modified), cols_bounds].values,
+                                 state.loc[deleted.union(modified), cols_bounds].values])
+        affected = pd.Index([], dtype=object)
+        if len(bounds):
+            boxes = pygeos.box(*(bounds + np.array([-1, -1, 1, 1]) * self._min_dist).T)
+            tree = pygeos.box(*self.arcs[cols_bounds].values.T)
+            affected = self.arcs.index[np.unique(helpers.query_pairs(boxes, tree=tree)[:, 1])]
+
+        logger.info(f"Validating {len(affected):,d} affected arcs.")
+
+        # Validate affected arcs.
+        errors, export = self._validate_subset(affected)
+
+        # Merge results with the previous validation state for unaffected arcs.
+        unaffected = self.arcs.index.difference(affected)
+        for code in self.validations:
+            flag = state.loc[unaffected, f"v{code}"].values == 1
+            self.errors[code] = errors[code] | set(unaffected[flag])
+
+        # Merge export datasets with the previous export datasets for unaffected arcs.
+        layers = set(fiona.listlayers(self.dst))
+        for name in self.export:
+            dfs = [export[name]] if name in export else []
+            if name in layers:
+                df = gpd.read_file(self.dst, layer=name)
+                dfs.append(df.loc[df[self.id].isin(unaffected)])
+            dfs = [df for df in dfs if len(df)]
+            if dfs:
+                self.export[name] = pd.concat(dfs, ignore_index=True).copy(deep=True)
+
+    def _validate_parallel(self) -> None:
+        """Executes validations against the CRN dataset in a process pool."""
+
+        logger.info(f"Applying validations in parallel with {self.workers} workers.")
+
+        with self._executor(max_workers=min(self.workers, len(self.validations))) as executor:
+
+            # Submit validations.
+            futures = {code: executor.submit(_validate_worker, code) for code in self.validations}
+
+            # Store results in the listed validation order.
+            for code, future in futures.items():
+                self.errors[code], export = future.result()
+                self.export.update(export)
+
+                logger.info(f"Applied validation {code}: \"{self.validations[code].__name__}\".")
+
+    def _validate_subset(self, ids: pd.Index) -> Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]:
+        """
+        Executes validations against a subset of arcs within the context of all arcs within the validation halo
+        distance of the subset, per spatial tile or in parallel, if configured. Only results for the subset are
+        returned.
+
+        \b
+        :param pd.Index ids: identifiers of the arcs to be validated.
+        :return Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]: validation errors and populated export datasets.
+        """
+
+        if not len(ids):
+            return {code: set() for code in self.validations}, dict()
+
+        # Execute validations per tile.
+        if self.tile_size:
+            return self._validate_tiled(ids)
+
+        # Compile context arcs (arcs within the halo distance of the subset arcs).
+        bounds = pygeos.bounds(self.crn_.loc[ids, "geometry"].values.data)
+        boxes = pygeos.box(*(bounds + np.array([-1, -1, 1, 1]) * self._min_dist).T)
+        context = self.crn_.index[np.unique(helpers.query_pairs(boxes, tree=self.crn_)[:, 1])]
+
+        return _validate_arcs(self.source, crn=self.crn_.loc[context], ids=ids, workers=self.workers)
+
+    def _validate_tiled(self, ids: pd.Index) -> Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]:
+        """
+        Executes validations against a subset of arcs per spatial tile, optionally in a process pool. Each arc is
+        assigned to the tile containing its bounding box center and each tile is validated within the context of all
+        arcs within the validation halo distance of the tile extent, such that the merged results match those of a
+        whole dataset validation. To bound memory, each tile, with its halo, is streamed from the exported source
+        layers. Only results for the subset are returned.
+
+        \b
+        :param pd.Index ids: identifiers of the arcs to be validated.
+        :return Tuple[Dict[int, set], Dict[str, gpd.GeoDataFrame]]: validation errors and populated export datasets.
+        """
+
+        # Assign arcs to tiles.
+        bounds = self.arcs.loc[ids, ["minx", "miny", "maxx", "maxy"]].values
+        centers = (bounds[:, :2] + bounds[:, 2:]) / 2
+        cells = np.floor((centers - centers.min(axis=0)) / self.tile_size).astype(np.int64)
+        tiles = list(pd.RangeIndex(len(bounds)).groupby(cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1])
+                     .values())
+        tile_ids = [ids[idxs] for idxs in tiles]
+        tile_bounds = [np.concatenate([bounds[idxs, :2].min(axis=0), bounds[idxs, 2:].max(axis=0)]) for idxs in tiles]
+
+        logger.info(f"Applying validations to {len(tiles):,d} tiles of {self.tile_size:,g} meters.")
+
+        args = (repeat(self.dst), repeat(list(self.layers)), repeat(self.source), tile_ids, tile_bounds,
+                repeat(self._min_dist), repeat(self.crs.to_wkt()))
+
+        # Execute validations per tile, in parallel.
+        if self.workers > 1:
+            context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tiles)), mp_context=context) as executor:
+                return self._merge_tiles(executor.map(_validate_tile, *args), total=len(tiles))
+
+        # Execute validations per tile.
+        return self._merge_tiles(map(_validate_tile, *args), total=len(tiles))
+
     def _write_errors(self) -> None:
-        """Write error flags returned by validations to DataFrame columns."""
+        """
+        Write error flags returned by validations to DataFrame columns. For tiled validation, the flags are written
+        directly to the exported source layers.
+        """
 
         logger.info(f"Writing error flags to dataset \"{self.layer}\".")
 
@@ -164,71 +625,95 @@ class CRNTopologyValidation:
         total_unique_records = len(set(identifiers))
 
         # Iterate and write errors to DataFrame.
-        for code, vals in sorted(self.errors.items()):
-            if len(vals):
-                self.crn[f"v{code}"] = self.crn[self.id].isin(vals).astype(int)
+        if self.crn is not None:
+            for code, vals in sorted(self.errors.items()):
+                if len(vals):
+                    self.crn[f"v{code}"] = self.crn[self.id].isin(vals).astype(int)
+
+        # Iterate and write errors to exported source layers.
+        else:
+            flags = {f"v{code}": vals for code, vals in sorted(self.errors.items()) if len(vals)}
+            for layer in self.layers:
+                helpers.write_flags(self.dst, name=layer, flags=flags, key=self.id)
 
         logger.info(f"Total records flagged by validations: {total_records:,d}.")
         logger.info(f"Total unique records flagged by validations: {total_unique_records:,d}.")
 
-    def connectivity_min_distance(self) -> set:
+    def _write_state(self) -> None:
         """
-        Validation: Arcs must be >= 5 meters from each other, excluding connected arcs (i.e. no dangles).
-
-        \b
-        :return set: set containing identifiers of erroneous records.
+        Writes the validation state: a fingerprint, extent, and validation flags per arc, used for incremental
+        validation.
         """
 
-        errors = set()
-
-        # Compile all non-duplicated nodes (dead ends) as a DataFrame.
-        pts = pd.concat([self.crn_["pt_start"], self.crn_["pt_end"]])
-        deadends = pts.loc[~pts.duplicated(keep=False)]
-        deadends = pd.DataFrame({"pt": deadends.values, self.id: deadends.index})
+        logger.info(f"Writing validation state: \"{self.state}\".")
 
-        # Generate simplified node buffers with distance tolerance.
-        deadends["buffer"] = deadends["pt"].map(lambda pt: Point(pt).buffer(self._min_dist, resolution=5))
+        try:
 
-        # Query arcs which intersect each dead end buffer.
-        deadends["intersects"] = deadends["buffer"].map(
-            lambda buffer: set(self.crn_.sindex.query(buffer, predicate="intersects")))
+            # Compile state.
+            state = self._compile_state()
+            for code in self.validations:
+                state[f"v{code}"] = state.index.isin(self.errors[code]).astype(np.int8)
 
-        # Flag dead ends which have buffers with one or more intersecting arcs.
-        deadends = deadends.loc[deadends["intersects"].map(len) > 1]
-        if len(deadends):
+            # Write state.
+            self.state.parent.mkdir(parents=True, exist_ok=True)
+            state.to_parquet(self.state)
 
-            # Aggregate deadends to their source features.
-            # Note: source features will exist twice if both nodes are deadends; these results will be aggregated.
-            deadends_agg = deadends.groupby(by=self.id, axis=0, as_index=True)["intersects"].agg(tuple)\
-                .map(chain.from_iterable).map(set).to_dict()
-            deadends["intersects"] = deadends[self.id].map(deadends_agg)
-            deadends.drop_duplicates(subset=self.id, inplace=True)
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Unable to write validation state: \"{self.state}\". {e}")
 
-            # Compile identifiers corresponding to each 'intersects' index.
-            deadends["intersects"] = deadends["intersects"].map(lambda idxs: set(itemgetter(*idxs)(self.idx_id_lookup)))
+    def connectivity_min_distance(self) -> set:
+        """
+        Validation: Arcs must be >= 5 meters from each other, excluding connected arcs (i.e. no dangles).
 
-            # Compile identifiers containing either of the source geometry nodes.
-            deadends["connected"] = deadends[self.id].map(
-                lambda identifier: set(chain.from_iterable(
-                    itemgetter(node)(self.pts_id_lookup) for node in itemgetter(0, -1)(
-                        itemgetter(identifier)(self.crn_["pts_tuple"]))
-                )))
+        \b
+        :return set: set containing identifiers of erroneous records.
+        """
 
-            # Subtract identifiers of connected features from buffer-intersecting features.
-            deadends["disconnected"] = deadends["intersects"] - deadends["connected"]
+        errors = set()
 
-            # Filter to those results with disconnected arcs.
-            flag = deadends["disconnected"].map(len) > 0
-            if sum(flag):
+        # Compile dead end nodes (nodes of degree 1).
+        deadends = np.flatnonzero(self.network.degree == 1)
+        if len(deadends):
 
-                # Remove duplicated results.
-                deadends = deadends.loc[flag]
-                deadends["ids"] = deadends[[self.id, "disconnected"]].apply(
-                    lambda row: tuple({row[0], *row[1]}), axis=1)
-                deadends.drop_duplicates(subset="ids", keep="first", inplace=True)
+            # Query arcs with bounding boxes within the distance tolerance of each dead end.
+            pts = self.network.node_points(deadends)
+            boxes = pygeos.box(*(self.network.nodes[deadends] - self._min_dist).T,
+                               *(self.network.nodes[deadends] + self._min_dist).T)
+            pairs = helpers.query_pairs(boxes, tree=self.crn_)
+            src_idxs = self.network.node_edges[self.network.node_offsets[deadends]][pairs[:, 0]]
+            tgt_idxs = pairs[:, 1]
+
+            # Filter pairs to arcs within the distance tolerance of the dead end.
+            dists = pygeos.distance(pts[pairs[:, 0]], self.crn_["geometry"].values.data[tgt_idxs])
+            flag = dists < self._min_dist
+
+            # Filter pairs to arcs disconnected from the source arc (not containing either of the source arc nodes).
+            flag[flag] = ~self.network.is_vertex(np.repeat(tgt_idxs[flag], 2),
+                                                 self.network.edge_nodes[src_idxs[flag]].ravel())\
+                .reshape(-1, 2).any(axis=1)
+            if flag.any():
+
+                pts, src_idxs, tgt_idxs, dists = pts[pairs[flag, 0]], src_idxs[flag], tgt_idxs[flag], dists[flag]
+
+                # Deduplicate pairs (source arc - disconnected arc), keeping the minimum distance.
+                order = np.lexsort((dists, tgt_idxs, src_idxs))
+                order = order[np.unique(np.column_stack([src_idxs, tgt_idxs])[order], axis=0, return_index=True)[1]]
+                pts, src_idxs, tgt_idxs, dists = pts[order], src_idxs[order], tgt_idxs[order], dists[order]
+
+                # Export pairs as LineStrings from the dead end to the nearest point of the disconnected arc, with the
+                # distance (cm) as an attribute.
+                tgt_geoms = self.crn_["geometry"].values.data[tgt_idxs]
+                nearest = pygeos.line_interpolate_point(tgt_geoms, pygeos.line_locate_point(tgt_geoms, pts))
+                coords = np.column_stack([pygeos.get_coordinates(pts), pygeos.get_coordinates(nearest)])
+                lines = pygeos.linestrings(coords.reshape(-1, 2), indices=np.repeat(np.arange(len(coords)), 2))
+                self.export[f"{self.source}_min_distance"] = gpd.GeoDataFrame({
+                    self.id: self.crn_.index[src_idxs].values,
+                    f"{self.id}_disconnected": self.crn_.index[tgt_idxs].values,
+                    "distance_cm": np.floor(dists * 100).astype(int)
+                }, geometry=gpd.GeoSeries(lines, crs=self.crn_.crs)).copy(deep=True)
 
                 # Compile errors.
-                errors.update(chain.from_iterable(deadends["ids"]))
+                errors.update(set(self.crn_.index[np.union1d(src_idxs, tgt_idxs)]))
 
         return errors
 
@@ -242,32 +727,24 @@ class CRNTopologyValidation:
 
         errors = set()
 
-        # Compile nodes.
-        nodes = set(pd.concat([self.crn_["pt_start"], self.crn_["pt_end"]]))
-
-        # Compile interior vertices (non-nodes).
-        # Note: only arcs with > 2 vertices are used.
-        non_nodes = set(self.crn_.loc[self.crn_["pts_tuple"].map(len) > 2, "pts_tuple"]
-                        .map(lambda pts: set(pts[1:-1])).explode())
-
-        # Compile invalid vertices.
-        invalid_pts = nodes.intersection(non_nodes)
+        # Flag interior vertices (non-endpoints) which are nodes.
+        interior = np.ones(len(self.network.coords), dtype=bool)
+        interior[self.network.vertex_offsets[:-1]] = False
+        interior[self.network.vertex_offsets[1:] - 1] = False
+        interior &= self.network.vertex_node >= 0
+        if interior.any():
 
-        # Filter invalid vertices to those with multiple connected features.
-        invalid_pts = set(compress(invalid_pts,
-                                   map(lambda pt: len(itemgetter(pt)(self.pts_id_lookup)) > 1, invalid_pts)))
-        if len(invalid_pts):
+            # Compile the number of arcs containing each node as any vertex.
+            flag = self.network.vertex_node >= 0
+            keys = np.unique(self.network.vertex_edge[flag] * len(self.network.nodes) + self.network.vertex_node[flag])
+            counts = np.bincount(keys % len(self.network.nodes), minlength=len(self.network.nodes))
 
-            # Filter arcs to those with an invalid vertex.
-            invalid_ids = set(chain.from_iterable(map(lambda pt: itemgetter(pt)(self.pts_id_lookup), invalid_pts)))
-            crn_ = self.crn_.loc[self.crn_.index.isin(invalid_ids)]
-
-            # Flag invalid arcs where the invalid vertex is a non-node.
-            flag = crn_["pts_tuple"].map(lambda pts: len(set(pts[1:-1]).intersection(invalid_pts))) > 0
-            if sum(flag):
+            # Flag arcs where an interior vertex is a node shared with multiple arcs.
+            flag = counts[self.network.vertex_node[interior]] > 1
+            if flag.any():
 
                 # Compile errors.
-                errors.update(set(crn_.loc[flag].index))
+                errors.update(set(self.crn_.index[np.unique(self.network.vertex_edge[interior][flag])]))
 
         return errors
 
@@ -282,14 +759,14 @@ class CRNTopologyValidation:
         errors = set()
 
         # Query arcs which cross each arc.
-        crosses = self.crn_["geometry"].map(lambda g: set(self.crn_.sindex.query(g, predicate="crosses")))
+        crosses = helpers.query_pairs(self.crn_["geometry"], tree=self.crn_, predicate="crosses")
 
         # Flag arcs which have one or more crossing arcs.
-        flag = crosses.map(len) > 0
-        if sum(flag):
+        flag = helpers.count_pairs(crosses, n=len(self.crn_)) > 0
+        if flag.any():
 
             # Compile errors.
-            errors.update(set(self.crn_.loc[flag].index))
+            errors.update(set(self.crn_.index[flag]))
 
         return errors
 
@@ -303,25 +780,34 @@ class CRNTopologyValidation:
 
         errors = set()
 
-        # Filter arcs to those with > 2 vertices.
-        crn_ = self.crn_.loc[self.crn_["pts_tuple"].map(len) > 2]
-        if len(crn_):
+        # Compile adjacent vertex pairs (start vertex positions) of arcs with > 2 vertices.
+        coords = self.network.coords
+        offsets = self.network.vertex_offsets
+        pos = np.flatnonzero(np.diff(self.network.vertex_edge) == 0)
+        pos = pos[(np.diff(offsets) > 2)[self.network.vertex_edge[pos]]]
+        if len(pos):
 
-            # Explode arc coordinate pairs and calculate distances.
-            coord_pairs = crn_["pts_ordered_pairs"].explode()
-            coord_dist = coord_pairs.map(lambda pair: math.dist(*pair))
+            # Calculate adjacent vertex distances.
+            dists = np.hypot(*(coords[pos + 1] - coords[pos]).T)
 
             # Flag pairs with distances that are too small.
-            flag = coord_dist < self._min_cluster_dist
-            if sum(flag):
+            pos = pos[dists < self._min_cluster_dist]
+            if len(pos):
+
+                # Sort invalid pairs by arc and coordinates.
+                idxs = self.network.vertex_edge[pos]
+                pos = pos[np.lexsort((*coords[pos + 1].T[::-1], *coords[pos].T[::-1], idxs))]
+                idxs = self.network.vertex_edge[pos]
 
                 # Export invalid pairs as MultiPoint geometries.
-                pts = coord_pairs.loc[flag].map(MultiPoint)
-                pts_df = gpd.GeoDataFrame({self.id: pts.index.values}, geometry=[*pts], crs=self.crn_.crs)
+                pts = pygeos.multipoints(pygeos.points(coords[np.column_stack([pos, pos + 1]).ravel()]),
+                                         indices=np.repeat(np.arange(len(pos)), 2))
+                pts_df = gpd.GeoDataFrame({self.id: self.crn_.index[idxs].values},
+                                          geometry=gpd.GeoSeries(pts, crs=self.crn_.crs))
                 self.export[f"{self.source}_cluster_tolerance"] = pts_df.copy(deep=True)
 
                 # Compile errors.
-                errors.update(set(coord_pairs.loc[flag].index))
+                errors.update(set(self.crn_.index[idxs]))
 
         return errors
 
@@ -354,19 +840,49 @@ class CRNTopologyValidation:
 
         errors = set()
 
-        # Filter arcs to those with duplicated lengths.
-        crn_ = self.crn_.loc[self.crn_.length.duplicated(keep=False)]
+        # Note: arcs are not prefiltered by length since the floating point lengths of duplicated arcs may differ
+        #       (e.g. for reversed coordinate sequences or additional collinear vertices).
+        crn_ = self.crn_
         if len(crn_):
 
-            # Filter arcs to those with duplicated nodes.
-            crn_ = crn_.loc[crn_[["pt_start", "pt_end"]].agg(set, axis=1).map(tuple).duplicated(keep=False)]
-
-            # Flag duplicated geometries.
-            dups = crn_.loc[crn_["geometry"].map(lambda g1: crn_["geometry"].map(lambda g2: g1.equals(g2)).sum() > 1)]
-            if len(dups):
+            # Canonicalize coordinate sequences (direction-normalized such that the start node <= end node).
+            coords, idxs = pygeos.get_coordinates(crn_["geometry"].values.data, return_index=True)
+            counts = np.bincount(idxs, minlength=len(crn_))
+            starts = np.r_[0, np.cumsum(counts)[:-1]]
+            ends = starts + counts - 1
+            flag_reverse = (coords[ends, 0] < coords[starts, 0]) | \
+                           ((coords[ends, 0] == coords[starts, 0]) & (coords[ends, 1] < coords[starts, 1]))
+            pos = np.arange(len(coords)) - starts[idxs]
+            coords = coords[np.lexsort((np.where(flag_reverse[idxs], -pos, pos), idxs))]
+
+            # Group arcs by nodes and hash of canonical coordinate sequence.
+            groups = pd.DataFrame({
+                "nodes": np.unique(np.column_stack([coords[starts], coords[ends]]), axis=0, return_inverse=True)[1]
+                .ravel(),
+                "hash": pd.factorize(pygeos.to_wkb(pygeos.linestrings(coords, indices=idxs)))[0]
+            }, index=crn_.index)
+
+            # Flag arcs with an identical canonical coordinate sequence as duplicated.
+            flag = groups["hash"].duplicated(keep=False)
+
+            # Compare the unique geometries (one per hash) sharing nodes with exact equality.
+            reps = groups.loc[groups["nodes"].duplicated(keep=False)].drop_duplicates(subset="hash")
+            reps = reps.loc[reps["nodes"].duplicated(keep=False)]
+            if len(reps):
+
+                pairs = reps.reset_index(drop=True).merge(reps.reset_index(drop=True), on="nodes")
+                pairs = pairs.loc[pairs["hash_x"] < pairs["hash_y"]]
+                geoms = pd.Series(crn_["geometry"].values.data, index=groups["hash"].values)
+                geoms = geoms.loc[~geoms.index.duplicated()]
+                equal = pygeos.equals(geoms.loc[pairs["hash_x"]].values, geoms.loc[pairs["hash_y"]].values)
+
+                # Flag arcs with an equal geometry as duplicated.
+                flag |= groups["hash"].isin(set(pairs.loc[equal, "hash_x"]) | set(pairs.loc[equal, "hash_y"]))
+
+            if flag.any():
 
                 # Compile errors.
-                errors.update(set(dups.index))
+                errors.update(set(groups.index[flag]))
 
         return errors
 
@@ -381,32 +897,48 @@ class CRNTopologyValidation:
         errors = set()
 
         # Query arcs which overlap each arc.
-        overlaps = self.crn_["geometry"].map(lambda g: set(self.crn_.sindex.query(g, predicate="overlaps")))
+        overlaps = helpers.query_pairs(self.crn_["geometry"], tree=self.crn_, predicate="overlaps")
 
         # Flag arcs which have one or more overlapping arcs.
-        flag = overlaps.map(len) > 0
+        flag = helpers.count_pairs(overlaps, n=len(self.crn_)) > 0
 
         # Compile errors.
-        if sum(flag):
-            errors.update(set(overlaps.loc[flag].index))
+        if flag.any():
+            errors.update(set(self.crn_.index[flag]))
 
         return errors
 
 
 @click.command()
-@click.argument("source", type=click.Choice(helpers.load_yaml("../config.yaml")["sources"], False))
-def main(source: str) -> None:
+@click.argument("source", type=click.Choice([*helpers.load_yaml("../config.yaml")["sources"],
+                                             *helpers.load_yaml("../config.yaml")["ngd_prov_codes"]], False))
+@click.option("--cache/--no-cache", default=True, show_default=True,
+              help="Use the cache of standardized source data.")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=1, show_default=True,
+              help="The number of worker processes used to execute validations.")
+@click.option("--incremental", "-i", is_flag=True, default=False, show_default=True,
+              help="Validate only arcs affected by changes since the previous incremental validation and write the "
+                   "validation state.")
+@click.option("--tile-size", "-t", type=click.FloatRange(min=0, min_open=True), default=None, show_default=True,
+              help="Validate the source layer in spatial tiles of this width and height (meters) to bound memory.")
+def main(source: str, cache: bool = True, workers: int = 1, incremental: bool = False,
+         tile_size: Union[float, None] = None) -> None:
     """
     Instantiates and executes the CRN class.
 
     \b
     :param str source: code for the source region (working area).
+    :param bool cache: indicates if the cache of standardized source data is to be used, default True.
+    :param int workers: number of worker processes used to execute validations, default 1.
+    :param bool incremental: indicates if only arcs affected by changes since the previous incremental validation are
+        to be validated, and the validation state written, default False.
+    :param Union[float, None] tile_size: tile width and height (meters) for tiled validation, default None (no tiling).
     """
 
     try:
 
         with helpers.Timer():
-            crn = CRNTopologyValidation(source)
+            crn = CRNTopologyValidation(source, cache, workers, incremental, tile_size)
             crn()
 
     except KeyboardInterrupt:
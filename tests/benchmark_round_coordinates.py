@@ -0,0 +1,66 @@
+import click
+import logging
+import pygeos
+import sys
+import time
+from pathlib import Path
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+import helpers
+from test_helpers import _arcs, _lines, _round_coordinates
+
+
+# Set logger.
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.INFO)
+handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s: %(message)s", "%Y-%m-%d %H:%M:%S"))
+logger.addHandler(handler)
+
+
+@click.command()
+@click.option("--count", "-c", type=click.IntRange(min=1), default=100000, show_default=True,
+              help="The number of LineStrings (averaging 11.5 vertices each) of the synthetic region.")
+@click.option("--precision", "-p", type=click.IntRange(min=0), default=5, show_default=True,
+              help="The decimal precision to round coordinates to.")
+def main(count: int = 100000, precision: int = 5) -> None:
+    """
+    Benchmarks helpers.round_coordinates against the reference implementation (the built-in round() per vertex) on a
+    synthetic region, verifying that the results are identical.
+
+    Measured for the default synthetic region (100,000 LineStrings, 1,149,348 vertices):
+        reference: 8.94 s
+        helpers.round_coordinates: 0.45 s
+
+    \b
+    :param int count: number of LineStrings of the synthetic region, default 100000.
+    :param int precision: decimal precision to round coordinates to, default 5.
+    """
+
+    geoms = _lines(count)
+    logger.info(f"Generated synthetic region: {count:,d} LineStrings, {pygeos.get_num_coordinates(geoms).sum():,d} "
+                f"vertices.")
+
+    # Round coordinates with the reference implementation.
+    start = time.perf_counter()
+    expected = _round_coordinates(geoms, precision=precision)
+    logger.info(f"Reference: {time.perf_counter() - start:.2f} s.")
+
+    # Round coordinates.
+    df = _arcs(geoms)
+    start = time.perf_counter()
+    df = helpers.round_coordinates(df, precision=precision)
+    logger.info(f"helpers.round_coordinates: {time.perf_counter() - start:.2f} s.")
+
+    # Compare results.
+    if not (pygeos.to_wkb(df["geometry"].values.data) == pygeos.to_wkb(expected)).all():
+        logger.error("Results differ from the reference implementation.")
+        sys.exit(1)
+
+    logger.info("Results are identical to the reference implementation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import geopandas as gpd
+import numpy as np
+import os
+import pygeos
+import pytest
+import sys
+from pathlib import Path
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+sys.path.insert(1, str(filepath.parents[1] / "src/conflation"))
+
+# Import conflation module from its directory (the command line interface loads "../config.yaml").
+cwd = os.getcwd()
+os.chdir(filepath.parents[1] / "src/conflation")
+try:
+    import conflate_meshblock
+finally:
+    os.chdir(cwd)
+
+
+def _conflation(geoms_ngd: np.ndarray, workers: int) -> conflate_meshblock.CRNMeshblockConflation:
+    """
+    Generates a lightweight CRN meshblock conflation class instance from ngd meshblock polygons.
+
+    \b
+    :param np.ndarray geoms_ngd: ngd meshblock polygons.
+    :param int workers: number of worker processes used to compute meshblock intersections.
+    :return conflate_meshblock.CRNMeshblockConflation: CRN class instance.
+    """
+
+    conflation = conflate_meshblock.CRNMeshblockConflation.__new__(conflate_meshblock.CRNMeshblockConflation)
+    conflation.workers = workers
+    conflation.batch_size = 7
+    conflation.meshblock_ngd = gpd.GeoDataFrame({"bb_uid": np.arange(len(geoms_ngd))},
+                                                geometry=gpd.GeoSeries(geoms_ngd, crs="EPSG:3347"))
+
+    return conflation
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_intersect(workers: int) -> None:
+    """
+    Tests that the batched, tiled, and parallel meshblock intersections match the per-pair intersection areas,
+    including for polygons spanning multiple tiles whose representative point lies in a different tile than their
+    intersecting ngd polygons.
+    """
+
+    # Generate a meshblock of unit squares and a strip spanning the meshblock extent.
+    xs, ys = np.meshgrid(np.arange(10), np.arange(10))
+    geoms = np.concatenate([pygeos.box(xs.ravel(), ys.ravel(), xs.ravel() + 1, ys.ravel() + 1),
+                            [pygeos.box(0, 10, 10, 10.5)]])
+
+    # Generate an ngd meshblock of offset squares and a square intersecting only the far end of the strip.
+    xs, ys = np.meshgrid(np.arange(0, 10, 2), np.arange(0, 10, 2))
+    geoms_ngd = np.concatenate([pygeos.box(xs.ravel() + 0.3, ys.ravel() + 0.3, xs.ravel() + 2.3, ys.ravel() + 2.3),
+                                [pygeos.box(9.5, 10.2, 11, 12)]])
+
+    # Compile per-pair intersections.
+    expected = [(idx, idx_ngd, pygeos.area(pygeos.intersection(geom, geom_ngd)))
+                for idx, geom in enumerate(geoms) for idx_ngd, geom_ngd in enumerate(geoms_ngd)
+                if pygeos.intersects(geom, geom_ngd)]
+
+    pairs, areas = _conflation(geoms_ngd, workers=workers)._intersect(geoms)
+
+    # Validate test coverage (strip representative point distant from its far end intersection).
+    assert pygeos.get_x(pygeos.point_on_surface(geoms[-1])) < 9
+    assert (len(geoms) - 1, len(geoms_ngd) - 1) in set(map(tuple, pairs))
+
+    assert pairs.tolist() == [[idx, idx_ngd] for idx, idx_ngd, _ in expected]
+    assert areas.tolist() == [area for _, _, area in expected]
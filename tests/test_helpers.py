@@ -0,0 +1,490 @@
+import fiona
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pygeos
+import pytest
+import sqlite3
+import sys
+from itertools import groupby
+from pathlib import Path
+from shapely.geometry import LineString
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+import helpers
+
+
+def _arcs(geoms: np.ndarray) -> gpd.GeoDataFrame:
+    """
+    Generates a GeoDataFrame of CRN arcs with default attribution.
+
+    \b
+    :param np.ndarray geoms: LineString geometries.
+    :return gpd.GeoDataFrame: GeoDataFrame of CRN arcs.
+    """
+
+    return gpd.GeoDataFrame({
+        "bo_new": 0,
+        "boundary": 0,
+        "ngd_uid": -1,
+        "segment_id": [f"{idx:032x}" for idx in range(len(geoms))],
+        "segment_id_orig": "-1",
+        "segment_type": 1,
+        "structure_type": "Unknown"
+    }, geometry=gpd.GeoSeries(geoms, crs="EPSG:3347"))
+
+
+def _grid(size: int) -> gpd.GeoSeries:
+    """
+    Generates a noded grid of unit length LineString arcs, forming size x size square faces.
+
+    \b
+    :param int size: number of faces along each axis.
+    :return gpd.GeoSeries: LineString geometries, indexed by identifier.
+    """
+
+    xs, ys = np.meshgrid(np.arange(size + 1), np.arange(size + 1))
+    starts = np.column_stack([xs.ravel(), ys.ravel()])
+    coords = np.concatenate([np.stack([starts, starts + [1, 0]], axis=1)[starts[:, 0] < size],
+                             np.stack([starts, starts + [0, 1]], axis=1)[starts[:, 1] < size]])
+
+    return gpd.GeoSeries(pygeos.linestrings(coords), index=[f"{idx:032x}" for idx in range(len(coords))],
+                         crs="EPSG:3347")
+
+
+def _lines(count: int, seed: int = 0) -> np.ndarray:
+    """
+    Generates random LineStrings of 3 - 20 vertices, including rounding midpoints, vertices which collapse once rounded,
+    and 3-dimensional geometries.
+
+    \b
+    :param int count: number of LineStrings.
+    :param int seed: random seed, default 0.
+    :return np.ndarray: LineString geometries.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Generate vertices.
+    sizes = rng.integers(3, 21, count)
+    idxs = np.repeat(np.arange(count), sizes)
+    coords = rng.uniform(1e5, 1e7, (len(idxs), 3))
+
+    # Add rounding midpoints and collapsing vertices.
+    flag = rng.random(len(coords)) < 0.1
+    coords[flag, :2] = np.round(coords[flag, :2], 3) + 0.000005
+    flag = rng.random(len(coords)) < 0.1
+    flag[0] = False
+    flag[1:] &= idxs[1:] == idxs[:-1]
+    coords[flag] = coords[np.flatnonzero(flag) - 1] + 0.000001
+
+    geoms = pygeos.linestrings(coords[:, :2], indices=idxs)
+    flag = rng.random(count) < 0.1
+    geoms[flag] = pygeos.linestrings(coords, indices=idxs)[flag]
+
+    return geoms
+
+
+def _round_coordinates(geoms: np.ndarray, precision: int = 5) -> np.ndarray:
+    """
+    Reference implementation of helpers.round_coordinates: rounds each vertex with the built-in round() and removes
+    duplicated adjacent vertices (only for geometries with >= 2 unique vertices).
+
+    \b
+    :param np.ndarray geoms: LineString geometries.
+    :param int precision: decimal precision to round coordinates to.
+    :return np.ndarray: LineString geometries.
+    """
+
+    results = list()
+    for geom in gpd.GeoSeries(geoms):
+        coords = tuple((round(pt[0], precision), round(pt[1], precision)) for pt in geom.coords)
+        if len(set(coords)) >= 2:
+            coords = tuple(pt for pt, _ in groupby(coords))
+        results.append(LineString(coords))
+
+    return gpd.GeoSeries(results).values.data
+
+
+def test_enforce_suggested_snapping() -> None:
+    """
+    Tests suggested snapping: bo nodes are replaced with the snapping points, roads are split at edge snapping points,
+    and edge snapping points without a road within the tolerance leave the roads unchanged.
+    """
+
+    df = _arcs(pygeos.linestrings([
+        # crn roads.
+        [[0, 0], [10, 0]],
+        [[0, 10], [10, 10]],
+        [[50, 50], [60, 50]],
+        # bos.
+        [[5, 5], [10, 5]],
+        [[0.5, 8], [-5, 5]],
+        [[5.2, 12], [6, 20]],
+        [[70, 70], [80, 80]]
+    ]))
+    df.loc[3:, "segment_type"] = 2
+    df_snapping = gpd.GeoDataFrame({"snapping_type": ["edge", "node", "edge", "edge"]}, geometry=gpd.GeoSeries(
+        pygeos.linestrings([
+            [[5, 5], [5, 0]],
+            [[0.5, 8], [0, 10]],
+            [[5.2, 12], [5.2, 10]],
+            # edge snapping point without a road within the tolerance.
+            [[70, 70], [70, 60]]
+        ]), crs=df.crs))
+
+    result = helpers.enforce_suggested_snapping(df.copy(deep=True), df_snapping)
+
+    expected = np.array([
+        pygeos.multilinestrings([[[0, 0], [5, 0]], [[5, 0], [10, 0]]]),
+        pygeos.multilinestrings([[[0, 10], [5.2, 10]], [[5.2, 10], [10, 10]]]),
+        *pygeos.linestrings([
+            [[50, 50], [60, 50]],
+            [[5, 0], [10, 5]],
+            [[0, 10], [-5, 5]],
+            [[5.2, 10], [6, 20]],
+            [[70, 60], [80, 80]]
+        ])
+    ])
+
+    assert pygeos.equals_exact(result["geometry"].values.data, expected, tolerance=0).all()
+
+
+def test_export_layers(tmp_path: Path) -> None:
+    """
+    Tests that exported layers are read back unchanged: points, lines, and polygons, empty and Null geometries, and
+    attributes (integers, booleans, and strings with quotes and Nulls), as well as non-spatial tables and layer names
+    requiring quotation.
+    """
+
+    dst = tmp_path / "test.gpkg"
+    helpers.create_gpkg(dst)
+
+    # Compile layers.
+    attrs = {"int": [1, -2, 3, 4], "bool": [True, False, True, False], "str": ["it's", "'quoted'", None, 'a"b,c)']}
+    layers = {
+        "points": gpd.GeoDataFrame(attrs, geometry=gpd.GeoSeries(
+            [pygeos.points(0, 0), pygeos.points(1.5, -2), pygeos.Geometry("POINT EMPTY"), None], crs="EPSG:3347")),
+        "lines-all order": gpd.GeoDataFrame(attrs, geometry=gpd.GeoSeries(
+            [pygeos.linestrings([[0, 0], [1, 1]]), None, pygeos.Geometry("LINESTRING EMPTY"),
+             pygeos.linestrings([[2, 2], [3.25, 5], [4, 4]])], crs="EPSG:3347")),
+        "polygons": gpd.GeoDataFrame(attrs, geometry=gpd.GeoSeries(
+            [pygeos.box(0, 0, 1, 1), pygeos.Geometry("POLYGON EMPTY"), None,
+             pygeos.polygons([[0, 0], [4, 0], [4, 4], [0, 0]], holes=[[[1, 0.5], [3, 0.5], [3, 2.5], [1, 0.5]]])],
+            crs="EPSG:3347")),
+        "table": pd.DataFrame(attrs)
+    }
+
+    helpers.export_layers({name: df.copy(deep=True) for name, df in layers.items()}, dst=dst)
+
+    for name, df in layers.items():
+        result = gpd.read_file(dst, layer=name)
+
+        # Compare attributes.
+        pd.testing.assert_frame_equal(pd.DataFrame(result[list(attrs)]), pd.DataFrame(df[list(attrs)]))
+
+        # Compare geometries.
+        if isinstance(df, gpd.GeoDataFrame):
+            geoms, geoms_result = df["geometry"].values.data, result["geometry"].values.data
+            assert (pygeos.is_missing(geoms_result) == pygeos.is_missing(geoms)).all()
+            assert (pygeos.is_empty(geoms_result) == pygeos.is_empty(geoms)).all()
+            flag = ~pygeos.is_missing(geoms) & ~pygeos.is_empty(geoms)
+            assert pygeos.equals_exact(geoms_result[flag], geoms[flag], tolerance=0).all()
+
+
+def test_export_layers_rollback(tmp_path: Path) -> None:
+    """
+    Tests that a failed export is rolled back (existing layers are retained and no new layers are written) and that
+    the journal mode is unchanged, without write-ahead log files.
+    """
+
+    dst = tmp_path / "test.gpkg"
+    helpers.create_gpkg(dst)
+
+    df = _arcs(pygeos.linestrings([[[0, 0], [1, 1]], [[1, 1], [2, 0]]]))
+    helpers.export_layers({"arcs": df.copy(deep=True)}, dst=dst)
+
+    # Export layers, including an unsupported (datetime) attribute.
+    with pytest.raises(SystemExit):
+        helpers.export_layers({"arcs": df.iloc[:1].copy(deep=True), "new": df.copy(deep=True),
+                               "invalid": df.assign(date=pd.Timestamp("2020-01-01"))}, dst=dst)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["test.gpkg"]
+    with sqlite3.connect(dst) as con:
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert fiona.listlayers(dst) == ["arcs"]
+    assert len(gpd.read_file(dst, layer="arcs")) == len(df)
+
+
+def test_write_flags(tmp_path: Path) -> None:
+    """
+    Tests that flags are written in place and that a failed write, or a write to a missing layer, is rolled back
+    (existing flags are retained).
+    """
+
+    dst = tmp_path / "test.gpkg"
+    helpers.create_gpkg(dst)
+
+    df = _arcs(pygeos.linestrings([[[0, 0], [1, 1]], [[1, 1], [2, 0]], [[2, 0], [3, 0]]]))
+    helpers.export_layers({"arcs": df.copy(deep=True)}, dst=dst)
+
+    ids = df["segment_id"].tolist()
+    helpers.write_flags(dst, name="arcs", flags={"v101": {ids[0], ids[2]}, "v102": set()}, key="segment_id")
+
+    # Write flags to a missing layer and by a missing key attribute.
+    with pytest.raises(SystemExit):
+        helpers.write_flags(dst, name="missing", flags={"v101": {ids[1]}}, key="segment_id")
+    with pytest.raises(SystemExit):
+        helpers.write_flags(dst, name="arcs", flags={"v101": {ids[1]}}, key="missing")
+
+    result = gpd.read_file(dst, layer="arcs")
+    assert result["v101"].tolist() == [1, 0, 1]
+    assert result["v102"].tolist() == [0, 0, 0]
+
+
+def test_load_extent(tmp_path: Path) -> None:
+    """Tests that the spatial index covers the exported features and that extent loads return intersecting features."""
+
+    dst = tmp_path / "test.gpkg"
+    helpers.create_gpkg(dst)
+
+    # Export a grid of horizontal and vertical lines.
+    xs, ys = np.meshgrid(np.arange(0, 100, 10), np.arange(0, 100, 10))
+    starts = np.column_stack([xs.ravel(), ys.ravel()])
+    geoms = pygeos.linestrings(np.stack([np.concatenate([starts, starts]),
+                                         np.concatenate([starts + [5, 0], starts + [0, 5]])], axis=1))
+    df = _arcs(geoms)
+    helpers.export_layers({"arcs": df.copy(deep=True)}, dst=dst)
+
+    # Validate spatial index.
+    with sqlite3.connect(dst) as con:
+        rtree = np.array(con.execute("SELECT id, minx, miny, maxx, maxy FROM rtree_arcs_geom ORDER BY id").fetchall())
+    assert (rtree[:, 0] == np.arange(1, len(df) + 1)).all()
+    assert (rtree[:, 1:] == pygeos.bounds(geoms)).all()
+
+    # Validate extent loads.
+    extent = gpd.GeoSeries([pygeos.points(22, 37), pygeos.points(48, 51)], crs="EPSG:3347")
+    for margin in (0, 3, 10):
+        result = helpers.load_extent(dst, layer="arcs", extent=extent, margin=margin, columns=["segment_id"])
+        expected = df.loc[pygeos.intersects(geoms, pygeos.box(22 - margin, 37 - margin, 48 + margin, 51 + margin)),
+                          "segment_id"]
+        assert sorted(result["segment_id"]) == sorted(expected)
+        assert list(result.columns) == ["segment_id", "geometry"]
+
+
+def test_meshblock_incremental(tmp_path: Path) -> None:
+    """
+    Tests that incrementally rebuilding a meshblock after inserting, deleting, and modifying arcs produces the same
+    faces and arc-face adjacency as a full build, re-polygonizing only the affected faces.
+    """
+
+    arcs = _grid(10)
+    meshblock_state = helpers.Meshblock(arcs)
+    meshblock_state.write(tmp_path / "state")
+
+    # Insert, delete, and modify arcs.
+    geoms = arcs.values.data.copy()
+    geoms[pygeos.to_wkt(geoms) == "LINESTRING (6 6, 7 6)"] = pygeos.linestrings([[6, 6], [6.5, 6.2], [7, 6]])
+    flag = pygeos.to_wkt(geoms) != "LINESTRING (3 3, 4 3)"
+    arcs = gpd.GeoSeries(np.concatenate([geoms[flag], pygeos.linestrings([[[1, 1], [2, 2]], [[20, 20], [21, 21]]])]),
+                         index=[*arcs.index[flag], "inserted_0", "inserted_1"], crs=arcs.crs)
+
+    meshblock = helpers.Meshblock(arcs, state=tmp_path / "state")
+    meshblock_full = helpers.Meshblock(arcs)
+
+    assert meshblock.incremental and not meshblock_full.incremental
+    assert meshblock_full.adjacency is None
+
+    # Compare faces.
+    faces, faces_full = (pygeos.to_wkb(pygeos.normalize(mb.faces)) for mb in (meshblock, meshblock_full))
+    assert len(faces) == len(faces_full) == 100
+    assert sorted(faces) == sorted(faces_full)
+
+    # Validate generated faces (only affected faces) and reused faces (only unchanged faces).
+    faces_state = set(pygeos.to_wkb(pygeos.normalize(meshblock_state.faces)))
+    assert meshblock.new.sum() < 20
+    assert set(faces) - faces_state <= set(faces[meshblock.new])
+    assert set(faces[~meshblock.new]) <= faces_state
+
+    # Compare adjacency.
+    meshblock_full.write(tmp_path / "state_full")
+    adjacency, adjacency_full = ({(mb.ids[arc_idx], faces_[face_idx]) for arc_idx, face_idx in mb.adjacency}
+                                 for mb, faces_ in ((meshblock, faces), (meshblock_full, faces_full)))
+    assert adjacency == adjacency_full
+
+
+def test_meshblock_incremental_not_noded(tmp_path: Path) -> None:
+    """Tests that incrementally rebuilding a meshblock from arcs which are not noded falls back to a full build."""
+
+    arcs = _grid(4)
+    helpers.Meshblock(arcs).write(tmp_path)
+
+    # Insert an arc crossing an existing arc.
+    arcs = pd.concat([arcs, gpd.GeoSeries(pygeos.linestrings([[[0.5, 0.5], [1.5, 0.5]]]), index=["inserted"],
+                                          crs=arcs.crs)])
+
+    meshblock = helpers.Meshblock(arcs, state=tmp_path)
+    meshblock_full = helpers.Meshblock(arcs)
+
+    assert not meshblock.incremental
+    assert meshblock.new.all()
+    assert sorted(pygeos.to_wkb(pygeos.normalize(meshblock.faces))) == \
+           sorted(pygeos.to_wkb(pygeos.normalize(meshblock_full.faces)))
+
+
+def test_meshblock_incremental_corrupted(tmp_path: Path) -> None:
+    """Tests that incrementally rebuilding a meshblock from a corrupted state falls back to a full build."""
+
+    arcs = _grid(4)
+    helpers.Meshblock(arcs).write(tmp_path)
+
+    # Corrupt the faces of the state.
+    pd.DataFrame({"geometry": [b"corrupted"] * 16}).to_parquet(tmp_path / "faces.parquet")
+
+    meshblock = helpers.Meshblock(arcs, state=tmp_path)
+    meshblock_full = helpers.Meshblock(arcs)
+
+    assert not meshblock.incremental
+    assert meshblock.new.all()
+    assert sorted(pygeos.to_wkb(pygeos.normalize(meshblock.faces))) == \
+           sorted(pygeos.to_wkb(pygeos.normalize(meshblock_full.faces)))
+
+
+def test_round() -> None:
+    """Tests that rounding matches the built-in round(), including rounding midpoints."""
+
+    rng = np.random.default_rng(0)
+    vals = np.concatenate([rng.uniform(-1e7, 1e7, 100000), np.arange(-10000, 10000) / 1000 + 0.0005,
+                           np.round(rng.uniform(0, 1e7, 100000), 5) + 0.000005, [0.0, -0.0, 2.0 ** 53]])
+
+    for precision in range(8):
+        assert helpers._round(vals, precision=precision).tolist() == [round(val, precision) for val in vals.tolist()]
+
+
+def test_round_coordinates() -> None:
+    """Tests that rounding coordinates matches the reference implementation, byte for byte."""
+
+    geoms = _lines(2000)
+    df = helpers.round_coordinates(_arcs(geoms))
+
+    assert (pygeos.to_wkb(df["geometry"].values.data) == pygeos.to_wkb(_round_coordinates(geoms))).all()
+
+
+def test_snap_nodes() -> None:
+    """
+    Tests node snapping: ngd nodes are snapped to the nearest nrn node within the (exact) distance tolerance, the
+    boundary tolerance applies to boundary arcs, and all arcs sharing a snapped node are updated.
+    """
+
+    df = _arcs(pygeos.linestrings([
+        # nrn arcs.
+        [[0, 0], [0, -10]],
+        [[0, 0.15], [-10, 0.15]],
+        [[96, 96], [96, 80]],
+        [[200, 200], [200, 190]],
+        [[96.05, 80], [120, 80]],
+        # ngd arcs: nearest nrn node within tolerance (2 arcs sharing the snapped node).
+        [[0, 0.09], [5, 5]],
+        [[-5, 5], [0, 0.09]],
+        # ngd arcs: exactly at and beyond the tolerance (5/64 = 0.078125) of a nrn node.
+        [[96.046875, 96.0625], [110, 110]],
+        [[96.08, 96], [110, 90]],
+        # ngd boundary arcs: within and beyond the boundary tolerance.
+        [[200.005, 200], [210, 210]],
+        [[200, 200.05], [190, 210]],
+        # ngd arc connected to a nrn node within the tolerance of another nrn node.
+        [[96, 80], [90, 70]]
+    ]))
+    df.loc[:4, "segment_id_orig"] = df.loc[:4, "segment_id"]
+    df.loc[9:10, "boundary"] = 1
+
+    result = helpers.snap_nodes(df.copy(deep=True), prox=0.078125, prox_boundary=0.01)
+
+    expected = df["geometry"].values.data.copy()
+    expected[[5, 6, 7, 9]] = pygeos.linestrings([
+        [[0, 0.15], [5, 5]],
+        [[-5, 5], [0, 0.15]],
+        [[96, 96], [110, 110]],
+        [[200, 200], [210, 210]]
+    ])
+
+    assert pygeos.equals_exact(result["geometry"].values.data, expected, tolerance=0).all()
+
+
+def test_split_lines() -> None:
+    """
+    Tests line splitting: split points at interior positions, at vertices, at the start of a LineString and duplicated
+    split points, with LineStrings without split points returned as-is.
+    """
+
+    lines = np.array([pygeos.linestrings(coords) for coords in (
+        [[0, 0], [10, 0], [10, 10]],
+        [[0, 20], [10, 20]],
+        [[0, 30], [10, 30]]
+    )])
+    pts = pygeos.points([[5, 0], [10, 0], [0, 0], [5, 0], [8, 20], [2, 20]])
+
+    parts, part_idxs = helpers.split_lines(lines, pts=pts, line_idxs=np.array([0, 0, 0, 0, 1, 1]))
+
+    expected = pygeos.linestrings([
+        [[0, 0], [5, 0]],
+        [[5, 0], [10, 0]],
+        [[10, 0], [10, 10]],
+        [[0, 20], [2, 20]],
+        [[2, 20], [8, 20]],
+        [[8, 20], [10, 20]],
+        [[0, 30], [10, 30]]
+    ])
+
+    assert len(parts) == len(expected)
+    assert pygeos.equals_exact(parts, expected, tolerance=0).all()
+    assert part_idxs.tolist() == [0, 0, 0, 1, 1, 1, 2]
+
+
+def test_standardize_null_coordinates() -> None:
+    """Tests the removal of null coordinates: updated geometries with >= 2 valid vertices, dropped otherwise."""
+
+    df = _arcs(np.array([pygeos.linestrings(coords) for coords in (
+        [[0, 0], [1, 0], [2, 0]],
+        [[0, 1], [np.nan, np.nan], [1, 1], [2, 1]],
+        [[0, 2], [np.nan, 5], [np.nan, np.nan]],
+        [[np.nan, 3], [1, np.nan], [2, np.nan]]
+    )]))
+
+    df = helpers.standardize(df)
+
+    assert list(df.index) == [f"{idx:032x}" for idx in (0, 1)]
+    assert pygeos.equals(df["geometry"].values.data, pygeos.linestrings([[[0, 0], [1, 0], [2, 0]],
+                                                                         [[0, 1], [1, 1], [2, 1]]])).all()
+
+
+def test_standardize_attributes() -> None:
+    """
+    Tests the enforcement of attribute domains and dtypes: domain values are mapped, Nulls and values not within the
+    domain or uncastable to the dtype are set to the default value, and attribute-specific rules are applied.
+    """
+
+    df = _arcs(pygeos.linestrings([[[idx, 0], [idx, 1]] for idx in range(4)])).assign(
+        bo_new=["1", 1.0, "x", None],
+        boundary=[0.0, 1.0, 2.0, np.nan],
+        ngd_uid=[5, "7", "abc", None],
+        segment_id_orig=[None, "-1", -1, "-1"],
+        segment_type=["2", 1, 3, None],
+        structure_type=[5, "Bridge", "-1.0", "invalid"],
+        v101=1
+    )
+
+    df = helpers.standardize(df)
+
+    expected = pd.DataFrame({
+        "bo_new": [1, 1, 0, 0],
+        "boundary": [0, 1, 0, 0],
+        "ngd_uid": [5, 7, -1, -1],
+        "segment_id_orig": ["-1"] * 4,
+        "segment_type": [2, 2, 1, 1],
+        "structure_type": ["Tunnel", "Bridge", "Unknown", "Unknown"]
+    }, index=pd.Index([f"{idx:032x}" for idx in range(4)], name="segment_id"))
+
+    pd.testing.assert_frame_equal(pd.DataFrame(df[expected.columns]), expected)
+    assert "v101" not in df.columns
@@ -0,0 +1,130 @@
+import fiona
+import geopandas as gpd
+import os
+import pandas as pd
+import pygeos
+import pytest
+import sqlite3
+import sys
+from pathlib import Path
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+sys.path.insert(1, str(filepath.parents[1] / "src/linkage"))
+import helpers
+
+# Import linkage module from its directory (the command line interface loads "../config.yaml").
+cwd = os.getcwd()
+os.chdir(filepath.parents[1] / "src/linkage")
+try:
+    import link_arcs
+finally:
+    os.chdir(cwd)
+
+
+def _linkage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, normalized: bool = False) -> link_arcs.CRNArcLinkage:
+    """
+    Generates a CRN arc linkage class instance from source and ngd GeoPackages of:
+    1) a meshblock of 3 polygons, linked to ngd meshblocks 100 and 200 or unlinked (-1);
+    2) arcs covered by the boundary of 1 or 2 polygons, within a polygon, or disjoint from all polygons;
+    3) ngd arcs bounding ngd meshblock 100, which extends > 1 km beyond the meshblock, and other ngd meshblocks.
+
+    \b
+    :param Path tmp_path: temporary directory, used as the project directory.
+    :param pytest.MonkeyPatch monkeypatch: pytest monkeypatch fixture.
+    :param bool normalized: indicates if the linkage is to be output as a normalized table, default False.
+    :return link_arcs.CRNArcLinkage: CRN class instance.
+    """
+
+    # Configure project and ngd paths.
+    monkeypatch.setattr(link_arcs, "filepath", tmp_path / "src/linkage/link_arcs.py")
+    monkeypatch.setattr(link_arcs.helpers, "load_yaml", lambda path: {"filepaths": {"ngd": tmp_path / "ngd.gpkg"}})
+    (tmp_path / "data").mkdir()
+
+    # Export source data.
+    helpers.create_gpkg(tmp_path / "data/crn.gpkg")
+    helpers.export_layers({
+        "crn_nb_test": gpd.GeoDataFrame(
+            {"segment_id": [f"{idx:032x}" for idx in range(5)]},
+            geometry=gpd.GeoSeries(pygeos.linestrings([[[0, 0], [10, 0]], [[10, 0], [10, 10]], [[0, 10], [10, 10]],
+                                                       [[12, 2], [15, 5]], [[50, 50], [60, 60]]]), crs="EPSG:3347")),
+        "meshblock_nb_test": gpd.GeoDataFrame(
+            {"bb_uid": [100, -1, 200]},
+            geometry=gpd.GeoSeries(pygeos.box([0, 10, 0], [0, 0, 10], [10, 20, 10], [10, 10, 20]), crs="EPSG:3347"))
+    }, dst=tmp_path / "data/crn.gpkg")
+
+    # Export ngd data.
+    helpers.create_gpkg(tmp_path / "ngd.gpkg")
+    helpers.export_layers({
+        "ngd_al_nb": gpd.GeoDataFrame(
+            {"ngd_uid": [1, 2, 3, 4, 5], "bb_uid_l": [100, 100, 100, -1, 300], "bb_uid_r": [-1, 300, 200, 400, 400]},
+            geometry=gpd.GeoSeries(pygeos.linestrings([[[0, 0], [10, 0]], [[5000, 0], [5000, 5000]],
+                                                       [[0, 10], [10, 10]], [[10, 0], [20, 0]],
+                                                       [[9000, 9000], [9100, 9000]]]), crs="EPSG:3347"))
+    }, dst=tmp_path / "ngd.gpkg")
+
+    return link_arcs.CRNArcLinkage("nb_test", normalized=normalized)
+
+
+def test_load_arcs_ngd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests that all ngd arcs bounding linked ngd meshblocks are loaded, including those beyond the meshblock extent,
+    whereas ngd arcs bounding only other or unlinked (-1) ngd meshblocks are not.
+    """
+
+    linkage = _linkage(tmp_path, monkeypatch)
+
+    assert sorted(linkage.arcs_ngd["ngd_uid"]) == [1, 2, 3]
+
+    linkage.linkage()
+
+    assert 2 in set(linkage.arc_linkage["ngd_uid"])
+
+
+def test_linkage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests the linked ngd meshblock and arc identifiers of arcs covered by the boundary of 1 or 2 meshblock polygons,
+    within a polygon, or disjoint from all polygons, output as sorted, de-duplicated comma-delimited arc attributes.
+    Unlinked arcs and arcs linked to unlinked (-1) polygons are linked to -1 only.
+    """
+
+    linkage = _linkage(tmp_path, monkeypatch)
+    linkage()
+
+    arcs = gpd.read_file(tmp_path / "data/crn.gpkg", layer="crn_nb_test")
+
+    assert arcs[["segment_id", "bb_uid_linked", "ngd_uid_linked"]].values.tolist() == [
+        [f"{0:032x}", "100", "1,2,3"],
+        [f"{1:032x}", "-1,100", "-1,1,2,3"],
+        [f"{2:032x}", "100,200", "1,2,3"],
+        [f"{3:032x}", "-1", "-1"],
+        [f"{4:032x}", "-1", "-1"]
+    ]
+    assert "linkage_nb_test" not in fiona.listlayers(tmp_path / "data/crn.gpkg")
+
+
+def test_linkage_normalized(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests the normalized linkage table: one record per arc, ngd meshblock, and ngd arc identifier linkage, indexed on
+    each identifier, with unlinked arcs linked to -1 only and without linked identifier arc attributes.
+    """
+
+    linkage = _linkage(tmp_path, monkeypatch, normalized=True)
+    linkage()
+
+    dst = tmp_path / "data/crn.gpkg"
+    arcs = gpd.read_file(dst, layer="crn_nb_test")
+    with sqlite3.connect(dst) as con:
+        table = pd.read_sql_query("SELECT segment_id, bb_uid, ngd_uid FROM linkage_nb_test", con)
+        indexes = {con.execute(f"PRAGMA index_info(\"{name}\")").fetchone()[2]
+                   for _, name, *_ in con.execute("PRAGMA index_list(linkage_nb_test)")}
+
+    assert not {"bb_uid_linked", "ngd_uid_linked"} & set(arcs.columns)
+    assert table.values.tolist() == [
+        [f"{0:032x}", 100, 1], [f"{0:032x}", 100, 2], [f"{0:032x}", 100, 3],
+        [f"{1:032x}", -1, -1], [f"{1:032x}", 100, 1], [f"{1:032x}", 100, 2], [f"{1:032x}", 100, 3],
+        [f"{2:032x}", 100, 1], [f"{2:032x}", 100, 2], [f"{2:032x}", 100, 3], [f"{2:032x}", 200, 3],
+        [f"{3:032x}", -1, -1],
+        [f"{4:032x}", -1, -1]
+    ]
+    assert indexes == {"segment_id", "bb_uid", "ngd_uid"}
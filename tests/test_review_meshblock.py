@@ -0,0 +1,83 @@
+import geopandas as gpd
+import numpy as np
+import os
+import sys
+from pathlib import Path
+from shapely.geometry import box, Polygon
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+sys.path.insert(1, str(filepath.parents[1] / "src/review"))
+
+# Import review module from its directory (the command line interface loads "../config.yaml").
+cwd = os.getcwd()
+os.chdir(filepath.parents[1] / "src/review")
+try:
+    import review_meshblock
+finally:
+    os.chdir(cwd)
+
+
+def _neighbours(df: gpd.GeoDataFrame) -> dict:
+    """
+    Compiles the neighbouring identifiers of each identifier from touching polygons (reference implementation).
+
+    \b
+    :param gpd.GeoDataFrame df: meshblock GeoDataFrame.
+    :return dict: dictionary of identifiers and their set of neighbouring identifiers.
+    """
+
+    nbrs = {bb_uid: set() for bb_uid in df["bb_uid"]}
+    for bb_uid, geom in zip(df["bb_uid"], df["geometry"]):
+        nbrs[bb_uid].update(set(df["bb_uid"].iloc[df.sindex.query(geom, predicate="touches")]) - {bb_uid})
+
+    return nbrs
+
+
+def test_compare_neighbours() -> None:
+    """
+    Tests that the neighbour comparison matches a touches-based comparison of a meshblock with unlinked (-1) and
+    isolated blocks against an ngd meshblock which is not noded (a vertex lies on the edge of a neighbour).
+    """
+
+    # Generate crn (noded) and ngd meshblocks.
+    # Note: crn meshblock 4 has 2 polygons and crn meshblock 8 touches the vertex shared by them. Ngd meshblock 4 is
+    #       a single polygon, whose edge is touched by a vertex of ngd meshblock 8 (T-junction).
+    triangle = Polygon([(1, 2), (1.5, 3), (0.5, 3)])
+    meshblock = gpd.GeoDataFrame({
+        "bb_uid": [1, 2, 4, 4, 8, -1, 10, 12],
+        "geometry": [box(0, 0, 1, 1), box(1, 0, 2, 1), box(0, 1, 1, 2), box(1, 1, 2, 2), triangle, box(2, 0, 3, 2),
+                     box(10, 10, 11, 11), box(20, 20, 21, 21)]}, crs="EPSG:3347")
+    meshblock_ngd = gpd.GeoDataFrame({
+        "bb_uid": [1, 2, 3, 4, 8, 10, 11, 12],
+        "geometry": [box(0, 0, 1, 1), box(1, 0, 2, 1), box(2, 0, 3, 1), box(0, 1, 2, 2), triangle,
+                     box(10, 10, 11, 11), box(11, 10, 12, 11), box(20, 20, 21, 21)]}, crs="EPSG:3347")
+
+    review = review_meshblock.CRNMeshblockReview.__new__(review_meshblock.CRNMeshblockReview)
+    review.id = "bb_uid"
+    review.meshblock = meshblock
+    review.meshblock_ngd = meshblock_ngd
+    review.meshblock_invalid = None
+    review.compare_neighbours()
+
+    # Compile expected extra and missing neighbours from touching polygons.
+    nbrs = _neighbours(meshblock.dissolve(by="bb_uid", as_index=False))
+    nbrs_ngd = _neighbours(meshblock_ngd)
+    expected = dict()
+    for bb_uid in sorted(nbrs):
+        extra = sorted(nbrs[bb_uid] - nbrs_ngd.get(bb_uid, set()))
+        missing = sorted(nbrs_ngd.get(bb_uid, set()) - nbrs[bb_uid])
+        if extra or missing:
+            expected[bb_uid] = (",".join(map(str, extra)) or None, ",".join(map(str, missing)) or None)
+
+    result = {bb_uid: (extra if isinstance(extra, str) else None, missing if isinstance(missing, str) else None)
+              for bb_uid, extra, missing in review.meshblock_invalid[["bb_uid", "extra", "missing"]].itertuples(
+                  index=False)}
+
+    assert result == expected
+    assert 4 in nbrs_ngd[8] and 8 not in result
+    assert result[-1] == ("2,4", None)
+    assert result[2] == ("-1", "3")
+    assert result[10] == (None, "11")
+    assert 12 not in result
+    assert np.array_equal(review.meshblock_invalid["bb_uid"], sorted(expected))
@@ -0,0 +1,212 @@
+import geopandas as gpd
+import numpy as np
+import os
+import pandas as pd
+import pygeos
+import pytest
+import sys
+from pathlib import Path
+from typing import List, Union
+
+filepath = Path(__file__).resolve()
+sys.path.insert(1, str(filepath.parents[1] / "src"))
+sys.path.insert(1, str(filepath.parents[1] / "src/topology"))
+import helpers
+
+# Import validation module from its directory (the command line interface loads "../config.yaml").
+cwd = os.getcwd()
+os.chdir(filepath.parents[1] / "src/topology")
+try:
+    import validate_topology
+finally:
+    os.chdir(cwd)
+
+
+def _network(count: int, seed: int = 0) -> np.ndarray:
+    """
+    Generates a random network of short LineStrings of 3 vertices, including connected, crossing, duplicated,
+    overlapping, and nearby arcs, arcs connected at interior vertices, and vertices within the cluster tolerance.
+
+    \b
+    :param int count: number of LineStrings.
+    :param int seed: random seed, default 0.
+    :return np.ndarray: LineString geometries.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Generate vertices on a 1 meter grid, offsetting some start vertices.
+    coords = np.round(rng.uniform(0, 30 * np.sqrt(count), (count, 1, 2))).repeat(3, axis=1)
+    coords[:, 2] += rng.integers(1, 9, (count, 2)) * rng.choice([-1, 1], (count, 2))
+    coords[rng.random(count) < 0.2, 0] += rng.uniform(0, 1, 2).round(2)
+    coords[:, 1] = (coords[:, 0] + coords[:, 2]) / 2 + rng.integers(-2, 3, (count, 2)) * 0.5
+
+    # Generate vertices within the cluster tolerance.
+    flag = rng.random(count) < 0.05
+    coords[flag, 1] = coords[flag, 0] + 0.005
+
+    # Generate duplicated, overlapping, and interior vertex-connected arcs from other arcs.
+    src, dup, overlap, interior = rng.choice(count, (4, count // 20), replace=False)
+    coords[dup] = coords[src]
+    coords[overlap] = np.stack([coords[src, 0], coords[src, 1], 2 * coords[src, 1] - coords[src, 0]], axis=1)
+    coords[interior] = np.stack([coords[src, 0] + [1, 2], coords[src, 0], coords[src, 0] + [2, -1]], axis=1)
+
+    return pygeos.linestrings(coords)
+
+
+def _validation(geoms: np.ndarray, ids: Union[List[str], None] = None,
+                workers: int = 1) -> validate_topology.CRNTopologyValidation:
+    """
+    Generates a CRN topology validation class instance from arcs.
+
+    \b
+    :param np.ndarray geoms: LineString geometries.
+    :param Union[List[str], None] ids: identifiers, default None (positional 32 digit hexadecimal identifiers).
+    :param int workers: number of worker processes used to execute validations, default 1.
+    :return validate_topology.CRNTopologyValidation: CRN class instance.
+    """
+
+    crn = gpd.GeoDataFrame({"segment_id": ids or [f"{idx:032x}" for idx in range(len(geoms))]},
+                           geometry=gpd.GeoSeries(geoms, crs="EPSG:3347"))
+    crn.index = crn["segment_id"]
+
+    return validate_topology.CRNTopologyValidation.from_arcs("nb", crn=crn, workers=workers)
+
+
+def test_connectivity_min_distance() -> None:
+    """
+    Tests the minimum distance between arcs: dead ends < 5 meters from a disconnected arc are flagged and exported
+    with the distance (cm), whereas dead ends at exactly 5 meters or near a connected arc are not.
+    """
+
+    validation = _validation(np.array([pygeos.linestrings(coords) for coords in (
+        [[0, 0], [100, 0]],
+        # dead end 4.95 meters from arc 0.
+        [[10, 4.95], [10, 50]],
+        # dead end 5 meters from arc 0.
+        [[30, 5], [30, 50]],
+        # dead end 3 meters from connected arc 0.
+        [[100, 0], [100, 3]]
+    )]))
+
+    errors = validation.connectivity_min_distance()
+
+    assert errors == {f"{idx:032x}" for idx in (0, 1)}
+
+    export = validation.export["nb_min_distance"]
+    assert export[["segment_id", "segment_id_disconnected", "distance_cm"]].values.tolist() == \
+           [[f"{1:032x}", f"{0:032x}", 495]]
+    assert pygeos.equals_exact(export["geometry"].values.data, pygeos.linestrings([[10, 4.95], [10, 0]]),
+                               tolerance=0).all()
+
+
+def test_duplication_duplicated() -> None:
+    """
+    Tests duplicated arcs: exact, reversed, and additional collinear vertex duplicates are flagged, including those
+    with floating point lengths which differ, whereas distinct arcs sharing nodes are not.
+    """
+
+    geoms = np.array([pygeos.linestrings(coords) for coords in (
+        # exact duplicates.
+        [[0, 0], [10, 0], [10, 10]],
+        [[0, 0], [10, 0], [10, 10]],
+        # reversed duplicates (floating point lengths differ).
+        [[13, 40], [20, 26], [75, 28], [49, 98]],
+        [[49, 98], [75, 28], [20, 26], [13, 40]],
+        # additional collinear vertex duplicates (floating point lengths differ).
+        [[0, 0], [1, 1]],
+        [[0, 0], [0.1, 0.1], [1, 1]],
+        # distinct arcs sharing nodes.
+        [[200, 0], [210, 0]],
+        [[200, 0], [205, 1], [210, 0]],
+        [[210, 0], [205, -1], [200, 0]]
+    )])
+
+    assert pygeos.length(geoms[2]) != pygeos.length(geoms[3])
+    assert pygeos.length(geoms[4]) != pygeos.length(geoms[5])
+
+    errors = _validation(geoms).duplication_duplicated()
+
+    assert errors == {f"{idx:032x}" for idx in range(6)}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_incremental(tmp_path: Path, workers: int) -> None:
+    """
+    Tests incremental validation: after inserting, deleting, and modifying arcs, the validation errors of the affected
+    arcs, merged with the validation state of the unaffected arcs, match those of a whole dataset validation, including
+    when the affected arcs are validated in parallel.
+    """
+
+    geoms = _network(2000)
+    ids = [f"{idx:032x}" for idx in range(len(geoms))]
+
+    # Validate whole dataset and write validation state.
+    validation = _validation(geoms)
+    validation.state = tmp_path / "state.parquet"
+    validation._validate()
+    validation._write_state()
+
+    # Insert, delete, and modify arcs.
+    geoms_new = geoms.copy()
+    geoms_new[:50] = pygeos.apply(geoms_new[:50], lambda coords: coords + [0.5, 0.25])
+    geoms_new = np.concatenate([geoms_new[:-50], _network(50, seed=1)])
+    ids_new = [*ids[:-50], *(f"{idx:032x}" for idx in range(len(geoms), len(geoms) + 50))]
+
+    # Validate whole dataset.
+    validation = _validation(geoms_new, ids=ids_new)
+    validation._validate()
+
+    # Validate incrementally.
+    incremental = _validation(geoms_new, ids=ids_new, workers=workers)
+    incremental.state = tmp_path / "state.parquet"
+    incremental.dst = tmp_path / "crn.gpkg"
+    helpers.create_gpkg(incremental.dst)
+    incremental._validate_incremental()
+
+    assert all(len(errors) for errors in validation.errors.values())
+    assert incremental.errors == validation.errors
+
+
+def test_validate_tiled(tmp_path: Path) -> None:
+    """
+    Tests tiled validation: the merged validation errors and export datasets of all tiles, validated within the halo
+    distance of each tile extent, match those of a whole dataset validation, including for arcs crossing tile edges.
+    """
+
+    geoms = _network(2000)
+    tile_size = 100
+
+    # Validate whole dataset.
+    validation = _validation(geoms)
+    validation._validate()
+
+    # Validate tiles, streamed from the exported source layer.
+    tiled = _validation(geoms)
+    tiled.dst = tmp_path / "crn.gpkg"
+    tiled.layers = {"crn_nb": tiled.crn.index}
+    tiled.tile_size = tile_size
+    helpers.create_gpkg(tiled.dst)
+    helpers.export_layers({"crn_nb": tiled.crn.copy(deep=True)}, dst=tiled.dst)
+    tiled.arcs = tiled._compile_arcs(tiled.crn)
+    tiled.crn = tiled.crn_ = None
+    tiled._validate()
+
+    # Validate test coverage (multiple tiles, arcs crossing tile edges, and errors for each validation).
+    bounds = pygeos.bounds(geoms)
+    cells = np.floor((bounds - np.tile(((bounds[:, :2] + bounds[:, 2:]) / 2).min(axis=0), 2)) / tile_size)
+    assert len(np.unique(cells[:, :2], axis=0)) > 10
+    assert ((cells[:, :2] != cells[:, 2:]).any(axis=1)).sum() > 100
+    assert all(len(errors) for errors in validation.errors.values())
+
+    # Compare errors.
+    assert tiled.errors == validation.errors
+
+    # Compare export datasets.
+    for name, df in validation.export.items():
+        assert df is not None and len(df)
+        cols = [col for col in df.columns if col != "geometry"]
+        df, df_tiled = (pd.DataFrame({**{col: df_[col] for col in cols},
+                                      "wkb": pygeos.to_wkb(df_["geometry"].values.data)})
+                        .sort_values([*cols, "wkb"]).reset_index(drop=True) for df_ in (df, tiled.export[name]))
+        pd.testing.assert_frame_equal(df_tiled, df)